@@ -7,6 +7,15 @@ import click_completion
 click_completion.init()
 
 from .root import cmd_root
-from .install import cmd_install
+from .install import cmd_install, cmd_install_folder
 from .list import cmd_list
 from .show import cmd_show
+from .reindex import cmd_reindex
+from .verify import cmd_verify
+from .repair import cmd_repair
+from .mirror import cmd_mirror
+from .bundle import cmd_export, cmd_import
+from .diff import cmd_diff
+from .which import cmd_which
+from .coverage import cmd_coverage
+from .cutoffs import cmd_cutoffs
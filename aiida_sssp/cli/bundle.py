@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Commands to export and import an `SsspFamily` as a single compact bundle."""
+import os
+
+import click
+
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+from .utils import attempt
+
+
+@cmd_root.command('export')
+@click.argument('sssp_family', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@click.argument('filepath', type=click.Path(dir_okay=False))
+@click.option('-f', '--force', is_flag=True, help='Overwrite the file if it already exists.')
+@click.option('-t', '--traceback', is_flag=True, help='Include the stacktrace if an exception is encountered.')
+@decorators.with_dbenv()
+def cmd_export(sssp_family, filepath, force, traceback):
+    """Export SSSP_FAMILY to a single bundle file FILEPATH that can be imported with `aiida-sssp import`."""
+    if os.path.exists(filepath) and not force:
+        echo.echo_critical('`{}` already exists: use `--force` to overwrite it.'.format(filepath))
+
+    with attempt('exporting `{}`... '.format(sssp_family.label), include_traceback=traceback):
+        sssp_family.export_bundle(os.path.abspath(filepath))
+
+    echo.echo_success('exported `{}` to `{}`'.format(sssp_family.label, filepath))
+
+
+@cmd_root.command('import')
+@click.argument('filepath', type=click.Path(exists=True, dir_okay=False))
+@click.option('-L', '--label', help='Label for the family, by default the label of the exported family.')
+@click.option('-t', '--traceback', is_flag=True, help='Include the stacktrace if an exception is encountered.')
+@decorators.with_dbenv()
+def cmd_import(filepath, label, traceback):
+    """Import a family from the bundle file FILEPATH written by `aiida-sssp export`.
+
+    Pseudos that are already stored in the profile with the same filename and md5 checksum are reused.
+    """
+    import time
+
+    from aiida_sssp.groups import SsspFamily
+
+    start = time.time()
+
+    with attempt('importing the bundle `{}`... '.format(filepath), include_traceback=traceback):
+        family = SsspFamily.import_bundle(os.path.abspath(filepath), label=label)
+
+    args = (family.label, family.count(), time.time() - start)
+    echo.echo_success('imported `{}` containing {} pseudo potentials in {:.2f} s'.format(*args))
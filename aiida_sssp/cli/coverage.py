@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Command to check whether an `SsspFamily` covers all the elements of a group of structures."""
+import click
+
+from aiida.cmdline.params import options as options_core
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+
+@cmd_root.command('coverage')
+@click.argument('sssp_family', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@options_core.GROUP(required=True, help='The group of structures to check.')
+@options_core.RAW()
+@decorators.with_dbenv()
+def cmd_coverage(sssp_family, group, raw):
+    """List the structures of a group that contain elements for which SSSP_FAMILY does not provide a pseudo."""
+    from tabulate import tabulate
+
+    uncovered = sssp_family.check_coverage(group)
+
+    if not uncovered:
+        echo.echo_success('all structures of `{}` are covered by `{}`'.format(group.label, sssp_family.label))
+        return
+
+    rows = [[pk, ', '.join(elements)] for pk, elements in sorted(uncovered.items())]
+
+    if raw:
+        echo.echo(tabulate(rows, disable_numparse=True, tablefmt='plain'))
+    else:
+        echo.echo(tabulate(rows, headers=['PK', 'Missing elements'], disable_numparse=True))
+
+    args = (len(rows), group.label, sssp_family.label)
+    echo.echo_critical('{} structures of `{}` are not covered by `{}`'.format(*args))
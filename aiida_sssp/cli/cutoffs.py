@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Command to compute the recommended cutoffs of an `SsspFamily` for a group of structures."""
+import click
+
+from aiida.cmdline.params import options as options_core
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+
+@cmd_root.command('cutoffs')
+@click.argument('sssp_family', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@options_core.GROUP(required=True, help='The group of structures for which to compute the cutoffs.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='File to write the cutoffs to.')
+@click.option(
+    '-f',
+    '--format',
+    'fmt',
+    type=click.Choice(['csv', 'npy']),
+    help='Output format, by default determined by the extension of the output file and CSV otherwise.'
+)
+@decorators.with_dbenv()
+def cmd_cutoffs(sssp_family, group, output, fmt):
+    """Compute the recommended cutoffs of SSSP_FAMILY for each structure of a group.
+
+    The result contains a row with the PK, the wavefunction cutoff and the density cutoff of each structure. The CSV
+    format is written to stdout if no output file is specified. The NPY format stores a two-dimensional array with the
+    same three columns, in the output file as given, even if it lacks the `.npy` extension. The cutoffs of structures
+    with elements that are not defined by the family are NaN, which is reported by a warning on stderr.
+    """
+    import numpy
+
+    from aiida.common import exceptions
+
+    if fmt is None:
+        fmt = 'npy' if output is not None and output.endswith('.npy') else 'csv'
+
+    if fmt == 'npy' and output is None:
+        echo.echo_critical('the `npy` format requires an output file to be specified with `--output`.')
+
+    try:
+        pks, cutoffs = sssp_family.get_cutoffs_for_group(group)
+    except exceptions.NotExistent:
+        echo.echo_critical('{} does not have an associated `SsspParameters` node'.format(sssp_family))
+
+    undefined = int(numpy.isnan(cutoffs).any(axis=1).sum())
+
+    if undefined:
+        message = '{} structures contain elements that are not defined by `{}`'.format(undefined, sssp_family)
+        echo.echo_warning(message, err=True)
+
+    if fmt == 'npy':
+        # Write through a file handle, since `numpy.save` appends the `.npy` extension to a filepath that lacks it.
+        with open(output, 'wb') as handle:
+            numpy.save(handle, numpy.column_stack([pks, cutoffs]))
+    else:
+        lines = ['pk,cutoff_wfc,cutoff_rho']
+        lines.extend('{},{},{}'.format(pk, wfc, rho) for pk, (wfc, rho) in zip(pks.tolist(), cutoffs.tolist()))
+
+        if output is None:
+            echo.echo('\n'.join(lines))
+            return
+
+        with open(output, 'w') as handle:
+            handle.write('\n'.join(lines) + '\n')
+
+    echo.echo_success('wrote the cutoffs of {} structures to `{}`'.format(len(pks), output))
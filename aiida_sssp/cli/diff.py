@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Command to compare the pseudos and recommended cutoffs of two `SsspFamily` instances."""
+import click
+
+from aiida.cmdline.params import options as options_core
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+
+@cmd_root.command('diff')
+@click.argument('family_a', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@click.argument('family_b', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@options_core.RAW()
+@decorators.with_dbenv()
+def cmd_diff(family_a, family_b, raw):
+    """Show the elements whose pseudo or recommended cutoffs differ in FAMILY_B with respect to FAMILY_A.
+
+    Pseudos are compared through their md5 checksum. The cutoff differences are those of FAMILY_B minus FAMILY_A.
+    """
+    from tabulate import tabulate
+
+    diff = family_a.diff(family_b)
+    rows = []
+
+    for element in diff.added:
+        rows.append([element, 'added', None, None])
+
+    for element in diff.removed:
+        rows.append([element, 'removed', None, None])
+
+    for element in sorted(set(diff.changed).union(diff.cutoffs)):
+        status = 'changed' if element in diff.changed else 'unchanged'
+        rows.append([element, status] + list(diff.cutoffs.get(element, (0.0, 0.0))))
+
+    if not rows:
+        echo.echo_success('`{}` and `{}` are identical'.format(family_a.label, family_b.label))
+        return
+
+    headers = ['Element', 'Pseudo', 'Delta cutoff wfc', 'Delta cutoff rho']
+
+    if raw:
+        echo.echo(tabulate(sorted(rows), tablefmt='plain'))
+    else:
+        echo.echo(tabulate(sorted(rows), headers=headers))
@@ -24,13 +24,45 @@ URL_MAPPING = {
 @options.VERSION(type=click.Choice(['1.0', '1.1']), default='1.1')
 @options.FUNCTIONAL(type=click.Choice(['PBE', 'PBEsol']), default='PBE')
 @options.PROTOCOL(type=click.Choice(['efficiency', 'precision']), default='efficiency')
+@click.option(
+    '-a',
+    '--archive',
+    type=click.Path(exists=True, dir_okay=False),
+    help='Install the pseudos from this local archive instead of downloading it.'
+)
+@click.option(
+    '-m',
+    '--metadata',
+    type=click.Path(exists=True, dir_okay=False),
+    help='Local JSON file with the metadata of the pseudos of `--archive`.'
+)
+@click.option(
+    '-M',
+    '--mirror',
+    type=click.Path(exists=True, file_okay=False),
+    help='Install the archive and metadata from this directory populated by `aiida-sssp mirror`.'
+)
+@click.option(
+    '-D',
+    '--deduplicate',
+    is_flag=True,
+    help='Reuse stored pseudos with the same filename and md5 checksum instead of creating new nodes.'
+)
+@click.option(
+    '--dry-run',
+    is_flag=True,
+    help='Only estimate the resources that the installation would consume, without writing to the profile.'
+)
 @click.option('-t', '--traceback', is_flag=True, help='Include the stacktrace if an exception is encountered.')
 @decorators.with_dbenv()
-def cmd_install(version, functional, protocol, traceback):
-    """Install a configuration of the SSSP."""
-    # pylint: disable=too-many-locals
-    import requests
-    import tempfile
+def cmd_install(version, functional, protocol, archive, metadata, mirror, deduplicate, dry_run, traceback):
+    """Install a configuration of the SSSP.
+
+    Unless a local archive or mirror is specified, the archive and metadata of the configuration are downloaded to the
+    local cache of `aiida-sssp`, from where they are reused by subsequent invocations.
+    """
+    # pylint: disable=too-many-locals,too-many-arguments,too-many-branches,too-many-statements
+    import time
 
     from aiida.common import exceptions
     from aiida.common.files import md5_file
@@ -39,6 +71,14 @@ def cmd_install(version, functional, protocol, traceback):
     from aiida_sssp import __version__
     from aiida_sssp.groups import SsspFamily
 
+    from .utils import estimate_family_from_archive, get_cached_download, get_download_size, get_mirrored_files
+
+    if metadata is not None and archive is None:
+        echo.echo_critical('the `--metadata` option can only be used in combination with `--archive`.')
+
+    if mirror is not None and archive is not None:
+        echo.echo_critical('the `--mirror` and `--archive` options are mutually exclusive.')
+
     label = '{}/{}/{}/{}'.format('SSSP', version, functional, protocol)
     description = 'SSSP v{} {} {} installed with aiida-sssp v{}'.format(version, functional, protocol, __version__)
 
@@ -54,32 +94,102 @@ def cmd_install(version, functional, protocol, traceback):
     except KeyError:
         echo.echo_critical('No SSSP available for {} {} {}'.format(version, functional, protocol))
 
-    with tempfile.TemporaryDirectory() as dirpath:
+    if mirror is not None:
+        try:
+            archive, metadata = get_mirrored_files(os.path.abspath(mirror), version, functional, protocol)
+        except ValueError as exception:
+            echo.echo_critical(str(exception))
 
-        url_archive = url_base + '.tar.gz'
-        url_metadata = url_base + '.json'
+        if dry_run:
+            echo.echo_info('download size: 0.00 MB (mirror)')
 
-        filepath_archive = os.path.join(dirpath, 'archive.tar.gz')
-        filepath_metadata = os.path.join(dirpath, 'metadata.json')
+    elif archive is None:
+        urls = (url_base + '.tar.gz', url_base + '.json')
+
+        if dry_run:
+            with attempt('determining download size... ', include_traceback=traceback):
+                sizes = [get_download_size(url) for url in urls]
+
+            if any(size is None for size, _ in sizes):
+                echo.echo_info('download size: unknown')
+            else:
+                cached = ' (cached)' if all(cached for _, cached in sizes) else ''
+                echo.echo_info('download size: {:.2f} MB{}'.format(sum(size for size, _ in sizes) / 1024**2, cached))
 
         with attempt('downloading selected pseudo potentials archive... ', include_traceback=traceback):
-            response = requests.get(url_archive)
-            response.raise_for_status()
-            with open(filepath_archive, 'wb') as handle:
-                handle.write(response.content)
-                handle.flush()
-                description += '\nArchive pseudos md5: {}'.format(md5_file(filepath_archive))
+            archive = get_cached_download(urls[0])
 
         with attempt('downloading selected pseudo potentials metadata... ', include_traceback=traceback):
-            response = requests.get(url_metadata)
-            response.raise_for_status()
-            with open(filepath_metadata, 'wb') as handle:
-                handle.write(response.content)
-                handle.flush()
-                description += '\nPseudo metadata md5: {}'.format(md5_file(filepath_metadata))
-
-        with attempt('unpacking archive and parsing pseudos... ', include_traceback=traceback):
-            family = create_family_from_archive(label, filepath_archive, filepath_metadata)
-
-        family.description = description
-        echo.echo_success('installed `{}` containing {} pseudo potentials'.format(label, family.count()))
+            metadata = get_cached_download(urls[1])
+
+    elif dry_run:
+        echo.echo_info('download size: 0.00 MB (local archive)')
+
+    if dry_run:
+        with attempt('unpacking archive and scanning pseudos... ', include_traceback=traceback):
+            estimate = estimate_family_from_archive(archive, metadata, deduplicate=deduplicate)
+
+        echo.echo_info('pseudos: {pseudos} ({new} new, {reused} reused)'.format(**estimate))
+        echo.echo_info('repository bytes added: {:.2f} MB'.format(estimate['repository_bytes'] / 1024**2))
+        echo.echo_info('database rows added: {}'.format(estimate['database_rows']))
+        echo.echo_success('dry run of installing `{}` completed: nothing was written to the profile'.format(label))
+        return
+
+    description += '\nArchive pseudos md5: {}'.format(md5_file(archive))
+
+    if metadata is not None:
+        description += '\nPseudo metadata md5: {}'.format(md5_file(metadata))
+
+    start = time.time()
+
+    with attempt('unpacking archive and parsing pseudos... ', include_traceback=traceback):
+        family = create_family_from_archive(label, archive, metadata, deduplicate=deduplicate)
+
+    elapsed = time.time() - start
+    size = os.path.getsize(archive) / 1024**2
+
+    family.description = description
+    family.save_snapshot()
+    echo.echo_info('ingested {:.2f} MB in {:.2f} s ({:.2f} MB/s)'.format(size, elapsed, size / max(elapsed, 1E-6)))
+    echo.echo_success('installed `{}` containing {} pseudo potentials'.format(label, family.count()))
+
+
+@cmd_root.command('install-folder')
+@click.argument('directories', nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option('-P', '--prefix', default='', help='Prefix for the family labels, which are the directory names.')
+@click.option(
+    '-n',
+    '--max-workers',
+    type=click.INT,
+    help='Maximum number of threads used to scan and validate the directories. The UPF files are parsed serially.'
+)
+@decorators.with_dbenv()
+def cmd_install_folder(directories, prefix, max_workers):
+    """Install a family for each of the DIRECTORIES of UPF files.
+
+    The label of each family is the name of its directory, prepended with the optional prefix. If a JSON file with the
+    same name as the directory exists next to it, for example `SSSP_1.1_PBE_efficiency.json` next to the directory
+    `SSSP_1.1_PBE_efficiency`, it is used as the metadata for the `SsspParameters` of the family.
+    """
+    from aiida_sssp.groups import SsspFamily
+
+    folders = []
+
+    for dirpath in directories:
+        dirpath = os.path.abspath(dirpath)
+        filepath_metadata = dirpath.rstrip(os.sep) + '.json'
+        label = prefix + os.path.basename(dirpath.rstrip(os.sep))
+        folders.append((dirpath, label, filepath_metadata if os.path.isfile(filepath_metadata) else None))
+
+    families, errors = SsspFamily.create_from_folders(folders, max_workers=max_workers)
+
+    for dirpath, label, _ in folders:
+        if dirpath in errors:
+            echo.echo_error('failed to install `{}` from `{}`: {}'.format(label, dirpath, errors[dirpath]))
+        else:
+            family = families[label]
+            family.save_snapshot()
+            echo.echo_success('installed `{}` containing {} pseudo potentials'.format(label, family.count()))
+
+    if errors:
+        echo.echo_critical('failed to install {} of {} families'.format(len(errors), len(folders)))
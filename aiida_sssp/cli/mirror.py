@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Command to mirror the archives of all SSSP configurations to a local directory."""
+import os
+
+import click
+
+from aiida.cmdline.utils import echo
+
+from .install import URL_BASE, URL_MAPPING
+from .root import cmd_root
+from .utils import download, read_mirror_index, write_mirror_index
+
+
+@cmd_root.command('mirror')
+@click.argument('dirpath', type=click.Path(file_okay=False))
+@click.option('-u', '--url-base', default=URL_BASE, show_default=True, help='Base URL to download the files from.')
+@click.option('-n', '--max-workers', type=click.INT, default=4, show_default=True, help='Maximum concurrent downloads.')
+def cmd_mirror(dirpath, url_base, max_workers):
+    """Download the archive and metadata of every SSSP configuration to the directory DIRPATH.
+
+    The files are downloaded concurrently. Files that are already present and whose md5 checksum matches the index of a
+    previous invocation are not downloaded again. The index is written to `index.json` in DIRPATH, which allows to
+    install configurations without network access with `aiida-sssp install --mirror DIRPATH`.
+    """
+    dirpath = os.path.abspath(dirpath)
+    os.makedirs(dirpath, exist_ok=True)
+
+    try:
+        checksums = read_mirror_index(dirpath)['files']
+    except ValueError as exception:
+        echo.echo_warning('ignoring the existing index: {}'.format(exception))
+        checksums = {}
+
+    configurations = sorted(URL_MAPPING.items())
+    filenames = [name + extension for _, name in configurations for extension in ('.tar.gz', '.json')]
+    files, errors = _fetch_files(dirpath, url_base, filenames, checksums, max_workers)
+
+    mirrored = []
+
+    for configuration, name in configurations:
+        archive, metadata = name + '.tar.gz', name + '.json'
+        if archive in files and metadata in files:
+            mirrored.append(
+                dict(zip(('version', 'functional', 'protocol'), configuration), archive=archive, metadata=metadata)
+            )
+
+    write_mirror_index(dirpath, files, mirrored, url_base)
+
+    if errors:
+        echo.echo_critical('failed to mirror {} of {} files'.format(len(errors), len(filenames)))
+
+    echo.echo_success('mirrored {} configurations to `{}`'.format(len(mirrored), dirpath))
+
+
+def _fetch_files(dirpath, url_base, filenames, checksums, max_workers=None):
+    """Download the given files concurrently to a directory, unless they are present and match their checksum.
+
+    :param dirpath: absolute path to the directory to download the files to.
+    :param url_base: base URL to download the files from.
+    :param filenames: list of filenames to download.
+    :param checksums: dictionary of filename onto the md5 checksum of the files that were previously downloaded.
+    :param max_workers: maximum number of concurrent downloads.
+    :return: tuple of two dictionaries, one of filename onto md5 checksum of each file that is present and one of
+        filename onto the exception that prevented it from being downloaded.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from aiida.common.files import md5_file
+
+    def fetch(filename):
+        """Download the given file unless it is present and valid, returning its md5 and whether it was downloaded."""
+        filepath = os.path.join(dirpath, filename)
+
+        if os.path.isfile(filepath) and checksums.get(filename, None) == md5_file(filepath):
+            return checksums[filename], False
+
+        download(os.path.join(url_base, filename), filepath)
+
+        return md5_file(filepath), True
+
+    files = {}
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {filename: executor.submit(fetch, filename) for filename in filenames}
+
+        for filename in filenames:
+            try:
+                files[filename], downloaded = futures[filename].result()
+            except Exception as exception:  # pylint: disable=broad-except
+                errors[filename] = exception
+                echo.echo_error('failed to download `{}`: {}'.format(filename, exception))
+            else:
+                if downloaded:
+                    echo.echo_success('downloaded `{}`'.format(filename))
+                else:
+                    echo.echo_info('`{}` is already up to date'.format(filename))
+
+    return files, errors
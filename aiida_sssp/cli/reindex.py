@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Commands to rebuild the element index and snapshot of `SsspFamily` instances."""
+import click
+
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+
+@cmd_root.command('reindex')
+@click.argument('sssp_families', nargs=-1, type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@decorators.with_dbenv()
+def cmd_reindex(sssp_families):
+    """Rebuild the element index and parameters reference of SSSP_FAMILIES, or of all families if none are given.
+
+    The snapshot of the lookup tables of each family is rewritten as well, such that new processes can start warm.
+    """
+    from aiida.orm import QueryBuilder
+    from aiida_sssp.groups import SsspFamily
+
+    if not sssp_families:
+        sssp_families = QueryBuilder().append(SsspFamily).all(flat=True)
+
+    if not sssp_families:
+        echo.echo_info('SSSP has not yet been installed: use `aiida-sssp install` to install it.')
+        return
+
+    for family in sssp_families:
+        index = family.rebuild_index()
+        family.save_snapshot()
+        echo.echo_success('rebuilt the index of `{}` containing {} pseudo potentials'.format(family.label, len(index)))
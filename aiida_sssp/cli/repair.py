@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Commands to repair the pseudos of an installed `SsspFamily`."""
+import os
+
+import click
+
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+from .utils import attempt
+
+
+@cmd_root.command('repair')
+@click.argument('sssp_family', type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@click.option(
+    '-a',
+    '--archive',
+    type=click.Path(exists=True, dir_okay=False),
+    help='Archive with the pseudos to re-ingest, by default the cached or downloaded SSSP archive of the family.'
+)
+@click.option('-t', '--traceback', is_flag=True, help='Include the stacktrace if an exception is encountered.')
+@decorators.with_dbenv()
+def cmd_repair(sssp_family, archive, traceback):
+    """Replace the pseudos of SSSP_FAMILY whose stored files no longer match their md5 metadata."""
+    # pylint: disable=too-many-locals
+    import shutil
+    import tempfile
+
+    from .install import URL_BASE, URL_MAPPING
+    from .utils import get_cached_download
+
+    with attempt('verifying the pseudos of `{}`... '.format(sssp_family.label), include_traceback=traceback):
+        mismatches = sssp_family.verify()
+
+    elements = sorted({mismatch.element for mismatch in mismatches if mismatch.expected is not None})
+
+    for element in sorted({mismatch.element for mismatch in mismatches if mismatch.expected is None}):
+        echo.echo_warning('element `{}` is not defined in the metadata and cannot be repaired'.format(element))
+
+    if not elements:
+        echo.echo_success('`{}` does not contain any corrupt pseudo potentials'.format(sssp_family.label))
+        return
+
+    if archive is None:
+        try:
+            _, version, functional, protocol = sssp_family.label.split('/')
+            url_archive = os.path.join(URL_BASE, URL_MAPPING[(version, functional, protocol)]) + '.tar.gz'
+        except (KeyError, ValueError):
+            echo.echo_critical('`{}` is not an official SSSP configuration: use `--archive`.'.format(sssp_family.label))
+
+        with attempt('fetching the selected pseudo potentials archive... ', include_traceback=traceback):
+            archive = get_cached_download(url_archive)
+
+    with tempfile.TemporaryDirectory() as dirpath:
+
+        message = 're-ingesting pseudos for elements {}... '.format(', '.join(elements))
+
+        with attempt(message, include_traceback=traceback):
+            shutil.unpack_archive(archive, dirpath)
+            repaired = sssp_family.repair(dirpath, elements)
+
+    echo.echo_success('repaired {} pseudo potentials of `{}`'.format(len(repaired), sssp_family.label))
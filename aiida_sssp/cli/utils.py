@@ -3,7 +3,14 @@
 from contextlib import contextmanager
 from aiida.cmdline.utils import echo
 
-__all__ = ('attempt', 'create_family_from_archive')
+__all__ = (
+    'attempt', 'create_family_from_archive', 'estimate_family_from_archive', 'download', 'get_cached_download',
+    'get_cached_download_async', 'get_download_size', 'get_mirrored_files', 'read_mirror_index', 'write_mirror_index'
+)
+
+CACHE_ENTRY_SUFFIX = '.entry.json'
+MIRROR_INDEX = 'index.json'
+MIRROR_INDEX_VERSION = 1
 
 
 @contextmanager
@@ -30,7 +37,7 @@ def attempt(message, exception_types=Exception, include_traceback=False):
         echo.echo_highlight(' [OK]', color='success', bold=True)
 
 
-def create_family_from_archive(label, filepath_archive, filepath_metadata=None, fmt=None):
+def create_family_from_archive(label, filepath_archive, filepath_metadata=None, fmt=None, deduplicate=False):
     """Construct a new `SsspFamily` instance from a tar.gz archive.
 
     .. warning:: the archive should not contain any subdirectories, but just the pseudos in UPF format.
@@ -39,6 +46,7 @@ def create_family_from_archive(label, filepath_archive, filepath_metadata=None,
     :param filepath: absolute filepath to the .tar.gz archive containing the pseudo potentials.
     :param filepath: optional absolute filepath to the .json file containing the pseudo potentials metadata.
     :param fmt: the format of the archive, if not specified will attempt to guess based on extension of `filepath`
+    :param deduplicate: if True, reuse stored `UpfData` nodes with the same filename and md5 checksum as a pseudo.
     :return: newly created `SsspFamily`
     :raises OSError: if the archive could not be unpacked or pseudos in it could not be parsed into a `SsspFamily`
     """
@@ -55,8 +63,357 @@ def create_family_from_archive(label, filepath_archive, filepath_metadata=None,
             raise OSError('failed to unpack the archive `{}`: {}'.format(filepath_archive, exception))
 
         try:
-            family = SsspFamily.create_from_folder(dirpath, label, filepath_parameters=filepath_metadata)
+            family = SsspFamily.create_from_folder(
+                dirpath, label, filepath_parameters=filepath_metadata, deduplicate=deduplicate
+            )
         except ValueError as exception:
             raise OSError('failed to parse pseudos from `{}`: {}'.format(dirpath, exception))
 
     return family
+
+
+def estimate_family_from_archive(filepath_archive, filepath_metadata=None, fmt=None, deduplicate=False):
+    """Estimate the resources that `create_family_from_archive` would consume, without writing to the database.
+
+    The archive is unpacked in a temporary directory, where only the headers of the pseudos are scanned and their md5
+    checksums are computed, which are validated against the metadata if specified. The estimate of the database rows
+    counts a row for each new `UpfData`, for the family, for each of its memberships and for the `SsspParameters`.
+
+    :param filepath_archive: absolute filepath to the .tar.gz archive containing the pseudo potentials.
+    :param filepath_metadata: optional absolute filepath to the .json file containing the pseudo potentials metadata.
+    :param fmt: the format of the archive, if not specified will attempt to guess based on extension of `filepath`
+    :param deduplicate: if True, count stored `UpfData` nodes with the same filename and md5 checksum as reused.
+    :return: dictionary with the number of `pseudos`, `new` and `reused` nodes, the `repository_bytes` that would be
+        written to the file repository and the `database_rows` that would be inserted.
+    :raises OSError: if the archive could not be unpacked or pseudos in it could not be validated.
+    """
+    # pylint: disable=too-many-locals
+    import os
+    import shutil
+    import tempfile
+
+    from aiida.common.files import md5_file
+    from aiida_sssp.data import SsspParameters
+    from aiida_sssp.groups import SsspFamily
+
+    with tempfile.TemporaryDirectory() as dirpath:
+
+        try:
+            shutil.unpack_archive(filepath_archive, dirpath, format=fmt)
+        except shutil.ReadError as exception:
+            raise OSError('failed to unpack the archive `{}`: {}'.format(filepath_archive, exception))
+
+        try:
+            headers = SsspFamily.scan_pseudos_from_directory(dirpath)
+            if filepath_metadata is not None:
+                SsspFamily.prevalidate_directory(dirpath, SsspParameters.load_metadata(filepath_metadata))
+        except ValueError as exception:
+            raise OSError('failed to parse pseudos from `{}`: {}'.format(dirpath, exception))
+
+        sizes = {filename: os.path.getsize(os.path.join(dirpath, filename)) for filename in headers}
+        checksums = {filename: md5_file(os.path.join(dirpath, filename)) for filename in headers}
+
+    reused = SsspFamily.find_pseudos(checksums) if deduplicate else {}
+    new = [filename for filename in headers if filename not in reused]
+
+    return {
+        'pseudos': len(headers),
+        'new': len(new),
+        'reused': len(reused),
+        'repository_bytes': sum(sizes[filename] for filename in new),
+        'database_rows': len(new) + 1 + len(headers) + (1 if filepath_metadata is not None else 0),
+    }
+
+
+def download(url, filepath, chunk_size=1024 * 1024):
+    """Stream the content at the given URL to a file.
+
+    The content is written to a temporary file in the same directory, which is only moved to `filepath` once the
+    download has completed, such that an interrupted download never leaves a partial file behind.
+
+    :param url: the URL to download.
+    :param filepath: absolute filepath to write the content to.
+    :param chunk_size: the number of bytes to read from the response at once.
+    :return: the number of bytes written.
+    :raises `requests.exceptions.RequestException`: if the request failed.
+    """
+    import os
+    import tempfile
+    import requests
+
+    written = 0
+    response = requests.get(url, stream=True)
+    response.raise_for_status()
+
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filepath), delete=False) as handle:
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                handle.write(chunk)
+                written += len(chunk)
+        except Exception:
+            os.remove(handle.name)
+            raise
+        finally:
+            response.close()
+
+    os.replace(handle.name, filepath)
+
+    return written
+
+
+def get_cached_download(url, md5=None):
+    """Return the filepath of the content at the given URL in the local cache, downloading it if necessary.
+
+    The cache is keyed on the full URL. With each file, the md5 checksum of its content and the `ETag` and
+    `Last-Modified` validators of the server are recorded. A cached file is only reused if its content still matches
+    its checksum and, if the server can be reached, the validators of the server did not change. If the server cannot
+    be reached, a cached file that matches its checksum is used as is.
+
+    :param url: the URL of the file.
+    :param md5: optional md5 checksum that the content should have, in which case a cached file with another checksum
+        is downloaded again and a downloaded file with another checksum raises.
+    :return: absolute filepath of the file in the `downloads` directory of the local cache.
+    :raises `requests.exceptions.RequestException`: if the file had to be downloaded and the request failed.
+    :raises ValueError: if the downloaded content does not match the given md5 checksum.
+    """
+    import json
+    import os
+    from aiida.common.files import md5_file
+
+    filepath = _get_cache_filepath(url)
+    cached, validators = _check_cached_download(url, filepath, md5)
+
+    if cached:
+        return filepath
+
+    if validators is None:
+        validators = _get_validators(url)
+
+    download(url, filepath)
+    checksum = md5_file(filepath)
+
+    if md5 is not None and checksum != md5:
+        os.remove(filepath)
+        raise ValueError('the content downloaded from `{}` does not match the md5 checksum `{}`'.format(url, md5))
+
+    with open(filepath + CACHE_ENTRY_SUFFIX, 'w') as handle:
+        json.dump({'url': url, 'md5': checksum, 'validators': validators}, handle)
+
+    return filepath
+
+
+async def get_cached_download_async(url, md5=None):
+    """Coroutine equivalent of `get_cached_download` that does not block the event loop.
+
+    The file is downloaded on the executor returned by `aiida_sssp.common.get_executor`, which bounds the number of
+    concurrent downloads. Concurrent requests for the same URL share a single download.
+
+    :param url: the URL of the file.
+    :param md5: optional md5 checksum that the content should have, see `get_cached_download`.
+    :return: absolute filepath of the file in the `downloads` directory of the local cache.
+    :raises `requests.exceptions.RequestException`: if the file had to be downloaded and the request failed.
+    :raises ValueError: if the downloaded content does not match the given md5 checksum.
+    """
+    from aiida_sssp.common import run_coalesced
+
+    return await run_coalesced(('download', url, md5), get_cached_download, url, md5)
+
+
+def get_download_size(url):
+    """Return the number of bytes that would have to be downloaded to obtain the content at the given URL.
+
+    If the file is already in the download cache and would be reused by `get_cached_download`, nothing needs to be
+    downloaded. Otherwise, the size is determined through a `HEAD` request, without downloading the content itself.
+
+    :param url: the URL of the file.
+    :return: tuple of the size in bytes, or `None` if the server does not report it, and a boolean that is True if the
+        file is already cached.
+    :raises `requests.exceptions.RequestException`: if the request failed.
+    """
+    import requests
+
+    if _check_cached_download(url, _get_cache_filepath(url))[0]:
+        return 0, True
+
+    response = requests.head(url, allow_redirects=True)
+    response.raise_for_status()
+    size = response.headers.get('Content-Length', None)
+
+    return int(size) if size is not None else None, False
+
+
+def read_mirror_index(dirpath):
+    """Return the index of a directory populated by `aiida-sssp mirror`.
+
+    :param dirpath: absolute path to the mirror directory.
+    :return: dictionary with the `files`, mapping the filename of each mirrored file onto its md5 checksum, and the
+        `configurations`, a list of dictionaries with the `version`, `functional`, `protocol`, `archive` and `metadata`
+        of each mirrored configuration. If the index does not exist, both are empty.
+    :raises ValueError: if the index exists but is not a valid index.
+    """
+    import json
+    import os
+
+    filepath = os.path.join(dirpath, MIRROR_INDEX)
+
+    if not os.path.isfile(filepath):
+        return {'files': {}, 'configurations': []}
+
+    try:
+        with open(filepath) as handle:
+            index = json.load(handle)
+    except ValueError as exception:
+        raise ValueError('the mirror index `{}` is corrupt: {}'.format(filepath, exception))
+
+    if not isinstance(index, dict) or index.get('version', None) != MIRROR_INDEX_VERSION:
+        raise ValueError('the mirror index `{}` has an unsupported version'.format(filepath))
+
+    return index
+
+
+def write_mirror_index(dirpath, files, configurations, url_base=None):
+    """Write the index of a mirror directory, replacing the previous version atomically.
+
+    :param dirpath: absolute path to the mirror directory.
+    :param files: dictionary of filename onto md5 checksum of each mirrored file.
+    :param configurations: list of dictionaries with the `version`, `functional`, `protocol`, `archive` and
+        `metadata` of each mirrored configuration.
+    :param url_base: optional base URL from which the files were downloaded.
+    """
+    import json
+    import os
+    import tempfile
+
+    content = {
+        'version': MIRROR_INDEX_VERSION,
+        'url_base': url_base,
+        'files': files,
+        'configurations': configurations,
+    }
+
+    with tempfile.NamedTemporaryFile('w', dir=dirpath, delete=False) as handle:
+        json.dump(content, handle, indent=2, sort_keys=True)
+
+    os.replace(handle.name, os.path.join(dirpath, MIRROR_INDEX))
+
+
+def get_mirrored_files(dirpath, version, functional, protocol):
+    """Return the filepaths of the archive and metadata of a configuration in a directory populated by `mirror`.
+
+    :param dirpath: absolute path to the mirror directory.
+    :param version: the version of the SSSP configuration.
+    :param functional: the functional of the SSSP configuration.
+    :param protocol: the protocol of the SSSP configuration.
+    :return: tuple of the absolute filepaths of the archive and the metadata.
+    :raises ValueError: if the configuration is not part of the mirror or its files no longer match their md5 checksum.
+    """
+    import os
+    from aiida.common.files import md5_file
+
+    index = read_mirror_index(dirpath)
+
+    for configuration in index['configurations']:
+        if [configuration[key] for key in ('version', 'functional', 'protocol')] == [version, functional, protocol]:
+            break
+    else:
+        args = (version, functional, protocol, dirpath)
+        raise ValueError('SSSP {} {} {} is not available in the mirror `{}`'.format(*args))
+
+    filepaths = []
+
+    for filename in (configuration['archive'], configuration['metadata']):
+        filepath = os.path.join(dirpath, filename)
+
+        if not os.path.isfile(filepath) or md5_file(filepath) != index['files'].get(filename, None):
+            raise ValueError('the mirrored file `{}` is missing or corrupt: run `aiida-sssp mirror`'.format(filepath))
+
+        filepaths.append(filepath)
+
+    return tuple(filepaths)
+
+
+def _get_cache_filepath(url):
+    """Return the filepath of the content at the given URL in the `downloads` directory of the local cache.
+
+    The filename is prefixed with a hash of the full URL, such that files with the same name at different URLs do not
+    share a cache entry.
+
+    :param url: the URL of the file.
+    :return: absolute filepath, which may not exist.
+    """
+    import hashlib
+    import os
+    from aiida_sssp.common import get_cache_directory
+
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    filename = url.rstrip('/').rsplit('/', 1)[-1]
+
+    return os.path.join(get_cache_directory('downloads'), '{}-{}'.format(key, filename))
+
+
+def _read_cache_entry(filepath):
+    """Return the entry recorded for a file in the download cache.
+
+    :param filepath: absolute filepath of the cached file.
+    :return: dictionary with the `url`, `md5` checksum and `validators` of the file or `None` if the file or its entry
+        does not exist or the entry is corrupt.
+    """
+    import json
+    import os
+
+    if not os.path.isfile(filepath):
+        return None
+
+    try:
+        with open(filepath + CACHE_ENTRY_SUFFIX) as handle:
+            entry = json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or not all(key in entry for key in ('url', 'md5', 'validators')):
+        return None
+
+    return entry
+
+
+def _check_cached_download(url, filepath, md5=None):
+    """Return whether the cached file of the given URL can be reused instead of downloading the content again.
+
+    The cached file can be reused if its content still matches the checksum of its entry and, if the server can be
+    reached, the validators of the server did not change.
+
+    :param url: the URL of the file.
+    :param filepath: absolute filepath of the file in the download cache.
+    :param md5: optional md5 checksum that the content should have.
+    :return: tuple of a boolean that is True if the cached file can be reused and the current validators of the server,
+        which are `None` if they were not retrieved.
+    """
+    import requests
+    from aiida.common.files import md5_file
+
+    entry = _read_cache_entry(filepath)
+
+    if entry is None or md5 not in (None, entry['md5']) or md5_file(filepath) != entry['md5']:
+        return False, None
+
+    try:
+        validators = _get_validators(url)
+    except requests.exceptions.RequestException:
+        return True, None
+
+    return not any(validators.values()) or validators == entry['validators'], validators
+
+
+def _get_validators(url):
+    """Return the validators with which the server identifies the current version of the content at the given URL.
+
+    :param url: the URL of the file.
+    :return: dictionary with the `etag` and `last_modified` headers of the response, which are `None` if not set.
+    :raises `requests.exceptions.RequestException`: if the request failed.
+    """
+    import requests
+
+    response = requests.head(url, allow_redirects=True)
+    response.raise_for_status()
+
+    return {'etag': response.headers.get('ETag', None), 'last_modified': response.headers.get('Last-Modified', None)}
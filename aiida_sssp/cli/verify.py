@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Commands to verify the integrity of `SsspFamily` instances."""
+import click
+
+from aiida.cmdline.params import types
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+
+@cmd_root.command('verify')
+@click.argument('sssp_families', nargs=-1, type=types.GroupParamType(sub_classes=('aiida.groups:sssp.family',)))
+@click.option('-a', '--all', 'all_families', is_flag=True, help='Verify all installed SSSP families.')
+@click.option('-n', '--max-workers', type=click.INT, help='Maximum number of threads used to compute the checksums.')
+@decorators.with_dbenv()
+def cmd_verify(sssp_families, all_families, max_workers):
+    """Verify that the stored pseudos of SSSP_FAMILIES match the filenames and md5 checksums of their metadata."""
+    from concurrent.futures import ThreadPoolExecutor
+    from aiida.orm import QueryBuilder
+    from aiida_sssp.groups import SsspFamily
+
+    if all_families:
+        sssp_families = QueryBuilder().append(SsspFamily).all(flat=True)
+    elif not sssp_families:
+        echo.echo_critical('specify at least one SSSP_FAMILY or use `--all`.')
+
+    failed = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for family in sssp_families:
+
+            mismatches = family.verify(executor=executor)
+
+            if not mismatches:
+                echo.echo_success('`{}`: all {} pseudo potentials are intact'.format(family.label, family.count()))
+                continue
+
+            failed.append(family)
+            echo.echo_error('`{}`: {} mismatches'.format(family.label, len(mismatches)))
+
+            for mismatch in mismatches:
+                echo.echo('    {}: inconsistent `{}`: expected {} but got {}'.format(*mismatch))
+
+    if failed:
+        echo.echo_critical('verification failed for {} of {} families'.format(len(failed), len(sssp_families)))
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Command to find the `SsspFamily` instances that contain a given pseudo."""
+import re
+
+import click
+
+from aiida.cmdline.params import options as options_core
+from aiida.cmdline.utils import decorators, echo
+
+from .root import cmd_root
+
+REGEX_MD5 = re.compile(r'^[0-9a-f]{32}$')
+
+
+@cmd_root.command('which')
+@click.argument('pseudo', type=click.STRING)
+@options_core.RAW()
+@decorators.with_dbenv()
+def cmd_which(pseudo, raw):
+    """List the SSSP families that contain PSEUDO, which is either the identifier of a `UpfData` or a md5 checksum."""
+    from tabulate import tabulate
+
+    from aiida.common import exceptions
+    from aiida.orm import load_node
+    from aiida.plugins import DataFactory
+
+    from aiida_sssp.groups import SsspFamily
+
+    UpfData = DataFactory('upf')  # pylint: disable=invalid-name
+
+    if not REGEX_MD5.match(pseudo.lower()):
+        try:
+            pseudo = load_node(pseudo)
+        except (exceptions.NotExistent, exceptions.MultipleObjectsError) as exception:
+            echo.echo_critical('`{}` is neither a md5 checksum nor a node identifier: {}'.format(pseudo, exception))
+
+        if not isinstance(pseudo, UpfData):
+            echo.echo_critical('{} is not a `UpfData` node'.format(pseudo))
+    else:
+        pseudo = pseudo.lower()
+
+    families = SsspFamily.find_families(pseudo)
+
+    if not families:
+        echo.echo_info('no SSSP family contains the pseudo `{}`'.format(pseudo))
+        return
+
+    rows = [[family.pk, family.label] for family in families]
+
+    if raw:
+        echo.echo(tabulate(rows, disable_numparse=True, tablefmt='plain'))
+    else:
+        echo.echo(tabulate(rows, headers=['PK', 'Label'], disable_numparse=True))
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=undefined-variable
+"""Common utilities that are used throughout the package."""
+from .aio import *
+from .cache import *
+from .files import *
+from .manifest import *
+from .snapshot import *
+from .upf import *
+
+__all__ = aio.__all__ + cache.__all__ + files.__all__ + manifest.__all__ + snapshot.__all__ + upf.__all__
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Utilities to call blocking functions from coroutines without blocking the event loop."""
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+
+__all__ = ('get_executor', 'run_coalesced')
+
+ENV_ASYNC_WORKERS = 'AIIDA_SSSP_ASYNC_WORKERS'
+DEFAULT_ASYNC_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = {}
+
+
+def get_executor():
+    """Return the executor on which the blocking calls of the asynchronous API are run, creating it if necessary.
+
+    The executor is shared by all event loops and its number of workers, which bounds the number of concurrent database
+    queries and downloads, is defined by the `AIIDA_SSSP_ASYNC_WORKERS` environment variable if set and 4 otherwise.
+
+    :return: `concurrent.futures.ThreadPoolExecutor` instance
+    """
+    global _executor  # pylint: disable=global-statement
+
+    with _executor_lock:
+        if _executor is None:
+            max_workers = int(os.environ.get(ENV_ASYNC_WORKERS, DEFAULT_ASYNC_WORKERS))
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    return _executor
+
+
+async def run_coalesced(key, func, *args, **kwargs):
+    """Run a blocking function on the executor and return its result, sharing a single call between identical requests.
+
+    As long as the call for a key is in flight, any request with the same key on the same event loop awaits the result
+    of that call instead of scheduling a new one. The result is not retained once the call has completed, so caching is
+    left to the function itself. Cancelling a request does not cancel the call that is shared with other requests.
+
+    :param key: hashable that identifies identical requests.
+    :param func: the blocking callable, which is called with the given positional and keyword arguments.
+    :return: the return value of the callable.
+    :raises: any exception raised by the callable.
+    """
+    loop = asyncio.get_event_loop()
+    pending_key = (loop, key)
+    future = _pending.get(pending_key, None)
+
+    if future is None:
+        future = loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+        future.add_done_callback(lambda _: _pending.pop(pending_key, None))
+        _pending[pending_key] = future
+
+    return await asyncio.shield(future)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Bounded in-memory cache with hit and miss statistics."""
+import collections
+import threading
+
+__all__ = ('CacheInfo', 'LruCache')
+
+CacheInfo = collections.namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+_MISSING = object()
+
+
+class LruCache:
+    """Bounded mapping that evicts the least recently used entry once it exceeds its maximum size.
+
+    The cache can be shared between threads. Lookups do not acquire a lock: they rely on the individual operations of
+    the underlying `OrderedDict` being atomic, such that the hot path is not serialized. Only the operations that insert
+    or remove entries are serialized with a lock. The hit and miss statistics are not synchronized and so may slightly
+    undercount under heavy contention.
+    """
+
+    def __init__(self, maxsize=1024):
+        """Construct a new empty cache.
+
+        :param maxsize: the maximum number of entries that the cache will hold.
+        """
+        if maxsize < 1:
+            raise ValueError('`maxsize` should be a positive integer, got: {}'.format(maxsize))
+
+        self._maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        """Return the number of entries in the cache."""
+        return len(self._data)
+
+    def __contains__(self, key):
+        """Return whether the cache contains an entry for the given key, without counting it as a hit or miss."""
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the value for the given key and record a hit, or return the default and record a miss.
+
+        :param key: the key to look up
+        :param default: the value to return if the key is not in the cache
+        :return: the cached value or the default
+        """
+        value = self._data.get(key, _MISSING)
+
+        if value is _MISSING:
+            self._misses += 1
+            return default
+
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            # The entry was evicted by another thread after it was retrieved, which does not invalidate the value.
+            pass
+
+        self._hits += 1
+
+        return value
+
+    def set(self, key, value):
+        """Set the value for the given key, evicting the least recently used entries if the cache is full.
+
+        :param key: the key
+        :param value: the value
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, predicate):
+        """Remove all entries whose key satisfies the predicate.
+
+        :param predicate: callable that takes a key and returns `True` if the corresponding entry should be removed
+        """
+        with self._lock:
+            # Copying the keys is atomic, whereas iterating over the dictionary fails if a concurrent lookup moves an
+            # entry to the end.
+            for key in [key for key in list(self._data) if predicate(key)]:
+                self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        """Return the statistics of the cache.
+
+        :return: `CacheInfo` named tuple with the number of hits, misses, the maximum and the current size
+        """
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
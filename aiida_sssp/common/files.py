@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Utilities to manage files in the local cache directory of `aiida-sssp`."""
+import hashlib
+import os
+import shutil
+import tempfile
+
+__all__ = ('get_cache_directory', 'store_content_addressed', 'link_or_copy', 'LINK_METHODS')
+
+ENV_CACHE_DIRECTORY = 'AIIDA_SSSP_CACHE_DIR'
+LINK_METHODS = ('hardlink', 'symlink', 'copy')
+
+
+def get_cache_directory(*subdirectories):
+    """Return the absolute path to a directory in the local cache of `aiida-sssp`, creating it if necessary.
+
+    The cache is located in the directory defined by the `AIIDA_SSSP_CACHE_DIR` environment variable if set, and
+    otherwise in the `aiida-sssp` folder of the user cache directory.
+
+    :param subdirectories: optional names of nested subdirectories within the cache directory
+    :return: absolute path to the directory
+    """
+    dirpath = os.environ.get(ENV_CACHE_DIRECTORY, None)
+
+    if dirpath is None:
+        dirpath = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'aiida-sssp')
+
+    dirpath = os.path.abspath(os.path.join(dirpath, *subdirectories))
+    os.makedirs(dirpath, exist_ok=True)
+
+    return dirpath
+
+
+def store_content_addressed(handle, md5, dirpath):
+    """Write the content of a binary file handle to a content addressed store, unless it is already present.
+
+    The file is written to a temporary file that is only moved in place once its md5 has been verified, such that the
+    store never contains partial or corrupt files. Files in the store are made read-only since they can be hard linked.
+
+    :param handle: a filelike object opened in binary mode, that will only be read if the content is not yet stored
+    :param md5: the md5 checksum of the content, which is used as its key in the store
+    :param dirpath: absolute path to the root directory of the store
+    :return: absolute filepath of the content in the store
+    :raises ValueError: if the md5 of the content that is read does not match `md5`
+    """
+    dirpath_shard = os.path.join(dirpath, md5[:2])
+    filepath = os.path.join(dirpath_shard, md5)
+
+    if os.path.isfile(filepath):
+        return filepath
+
+    os.makedirs(dirpath_shard, exist_ok=True)
+    md5sum = hashlib.md5()
+
+    with tempfile.NamedTemporaryFile(dir=dirpath_shard, delete=False) as target:
+        try:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                md5sum.update(chunk)
+                target.write(chunk)
+        except Exception:
+            os.remove(target.name)
+            raise
+
+    if md5sum.hexdigest() != md5:
+        os.remove(target.name)
+        raise ValueError('content has md5 `{}` which does not match the expected `{}`'.format(md5sum.hexdigest(), md5))
+
+    os.chmod(target.name, 0o444)
+    os.replace(target.name, filepath)
+
+    return filepath
+
+
+def link_or_copy(source, target, method='hardlink'):
+    """Make the file `source` available at `target` through a hard link, a symbolic link or a copy.
+
+    If the link cannot be created, for example because the paths are on different file systems or because the file
+    system does not support links, the file is copied instead. An existing file at `target` is replaced.
+
+    :param source: absolute filepath of the source file
+    :param target: absolute filepath of the target
+    :param method: one of `LINK_METHODS`
+    :return: the method that was actually used
+    :raises ValueError: if `method` is not one of `LINK_METHODS`
+    """
+    if method not in LINK_METHODS:
+        raise ValueError('invalid method `{}`, should be one of {}'.format(method, LINK_METHODS))
+
+    if os.path.lexists(target):
+        os.remove(target)
+
+    if method == 'hardlink':
+        try:
+            os.link(source, target)
+        except OSError:
+            method = 'copy'
+    elif method == 'symlink':
+        try:
+            os.symlink(source, target)
+        except OSError:
+            method = 'copy'
+
+    if method == 'copy':
+        shutil.copyfile(source, target)
+
+    return method
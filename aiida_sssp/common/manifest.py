@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Manifest of the files in a directory, used to detect which files changed between subsequent reads."""
+import hashlib
+import json
+import os
+import tempfile
+
+from .files import get_cache_directory
+
+__all__ = ('DirectoryManifest',)
+
+
+class DirectoryManifest:
+    """Record of the size, modification time, md5 checksum and node UUID of each file in a directory.
+
+    The manifest is stored as a JSON file in the `manifests` directory of the local cache, keyed on the real path of the
+    directory and an optional namespace, for example the name of the AiiDA profile to which the node UUIDs refer.
+    """
+
+    VERSION = 1
+
+    def __init__(self, dirpath, namespace=None, filepath=None):
+        """Construct the manifest for the given directory, loading the stored manifest if it exists and is valid.
+
+        :param dirpath: path to the directory.
+        :param namespace: optional namespace for the manifest, by default the manifest is shared.
+        :param filepath: optional filepath of the manifest file, by default determined from `dirpath` and `namespace`.
+        """
+        self.dirpath = os.path.realpath(dirpath)
+
+        if filepath is None:
+            key = hashlib.sha1(self.dirpath.encode('utf-8')).hexdigest()
+            filepath = os.path.join(get_cache_directory('manifests', namespace or ''), '{}.json'.format(key))
+
+        self.filepath = filepath
+        self.entries = self._load()
+
+    def _load(self):
+        """Load the entries from the manifest file, ignoring it if it does not exist or cannot be parsed.
+
+        :return: dictionary of filename onto its entry
+        """
+        try:
+            with open(self.filepath) as handle:
+                content = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(content, dict) or content.get('version') != self.VERSION:
+            return {}
+
+        if content.get('dirpath') != self.dirpath:
+            return {}
+
+        return content.get('files', {})
+
+    def get_md5(self, filename, stat):
+        """Return the md5 checksum of a file, only reading it if its size or modification time changed.
+
+        :param filename: the name of the file within the directory.
+        :param stat: the `os.stat_result` of the file.
+        :return: the md5 checksum of the file.
+        """
+        from aiida.common.files import md5_file
+
+        entry = self.entries.get(filename, None)
+
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['md5']
+
+        return md5_file(os.path.join(self.dirpath, filename))
+
+    def get_uuid(self, filename, md5):
+        """Return the UUID of the node that was recorded for the given file, if its content did not change.
+
+        :param filename: the name of the file within the directory.
+        :param md5: the current md5 checksum of the file.
+        :return: the recorded UUID or `None` if the file is unknown or its content changed.
+        """
+        entry = self.entries.get(filename, None)
+
+        if entry is None or entry['md5'] != md5:
+            return None
+
+        return entry['uuid']
+
+    def update(self, filename, stat, md5, uuid):
+        """Record the state of a file and the UUID of the node that corresponds to it.
+
+        .. note:: the manifest is only written to disk by calling `save`.
+
+        :param filename: the name of the file within the directory.
+        :param stat: the `os.stat_result` of the file.
+        :param md5: the md5 checksum of the file.
+        :param uuid: the UUID of the node that corresponds to the file.
+        """
+        self.entries[filename] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'md5': md5, 'uuid': str(uuid)}
+
+    def prune(self, filenames):
+        """Remove the entries of all files that are not in the given list of filenames.
+
+        :param filenames: iterable of names of the files that are currently in the directory.
+        """
+        filenames = set(filenames)
+        self.entries = {filename: entry for filename, entry in self.entries.items() if filename in filenames}
+
+    def save(self):
+        """Write the manifest to disk, replacing the previous version atomically."""
+        content = {'version': self.VERSION, 'dirpath': self.dirpath, 'files': self.entries}
+
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(self.filepath), delete=False) as handle:
+            json.dump(content, handle)
+
+        os.replace(handle.name, self.filepath)
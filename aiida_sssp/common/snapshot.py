@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Utilities to persist snapshots of lookup tables in the local cache directory of `aiida-sssp`."""
+import json
+import os
+import tempfile
+
+__all__ = ('read_snapshot', 'write_snapshot')
+
+SNAPSHOT_VERSION = 1
+
+
+def read_snapshot(filepath, stamp):
+    """Return the content of the snapshot at the given filepath if it is valid for the given stamp.
+
+    :param filepath: absolute filepath of the snapshot.
+    :param stamp: string that identifies the state from which the snapshot should have been created.
+    :return: the content of the snapshot or `None` if it does not exist, is corrupt, was written by an incompatible
+        version or for a different stamp.
+    """
+    try:
+        with open(filepath) as handle:
+            snapshot = json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+
+    if snapshot.get('version', None) != SNAPSHOT_VERSION or snapshot.get('stamp', None) != stamp:
+        return None
+
+    return snapshot.get('content', None)
+
+
+def write_snapshot(filepath, stamp, content):
+    """Write a snapshot to the given filepath, replacing any existing snapshot atomically.
+
+    :param filepath: absolute filepath of the snapshot, its directory should exist.
+    :param stamp: string that identifies the state from which the snapshot is created.
+    :param content: the content of the snapshot, which should be serializable to JSON.
+    """
+    snapshot = {'version': SNAPSHOT_VERSION, 'stamp': stamp, 'content': content}
+
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(filepath), delete=False) as handle:
+        json.dump(snapshot, handle)
+
+    os.replace(handle.name, filepath)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Utilities to inspect pseudo potential files in UPF format without parsing them entirely."""
+import collections
+import re
+
+__all__ = ('UpfHeader', 'scan_upf_header')
+
+UpfHeader = collections.namedtuple('UpfHeader', ('version', 'element', 'pseudo_type', 'functional', 'z_valence'))
+UpfHeader.__doc__ = """Subset of the `PP_HEADER` section of a UPF file, fields that are not defined are `None`."""
+
+REGEX_UPF_VERSION = re.compile(r'<UPF\s+version\s*=\s*"([^"]*)"', re.IGNORECASE)
+REGEX_ATTRIBUTE = re.compile(r'(\w+)\s*=\s*"([^"]*)"')
+
+
+def scan_upf_header(source):
+    """Return the `PP_HEADER` of a UPF file, reading the file only up to the end of that section.
+
+    Both the version 1 format, where the header is a block of lines of which the first token is the value, and the
+    version 2 format, where the header is defined through the attributes of the `PP_HEADER` tag, are supported. Since
+    the header precedes the mesh and all the projectors, typically only the first few kilobytes of a file are read.
+
+    :param source: a filelike object opened in binary or text mode, or an absolute filepath.
+    :return: `UpfHeader` named tuple.
+    :raises ValueError: if the source does not contain a `PP_HEADER` section or the section does not define an element.
+    """
+    if hasattr(source, 'read'):
+        lines = _read_header_lines(source)
+    else:
+        with open(source, 'rb') as handle:
+            lines = _read_header_lines(handle)
+
+    if lines is None:
+        raise ValueError('`{}` does not contain a `PP_HEADER` section'.format(getattr(source, 'name', source)))
+
+    version, header = lines
+    text = ' '.join(header)
+    attributes = dict(REGEX_ATTRIBUTE.findall(text))
+
+    if attributes:
+        element = attributes.get('element', None)
+        pseudo_type = attributes.get('pseudo_type', None)
+        functional = attributes.get('functional', None)
+        z_valence = attributes.get('z_valence', None)
+    else:
+        # Version 1: the lines between the opening and closing tags each start with a value followed by a description.
+        values = [line.split('>', 1)[-1] if line.lstrip().startswith('<') else line for line in header]
+        values = [line for line in values if line.strip()]
+        element = _get_token(values, 1)
+        pseudo_type = _get_token(values, 2)
+        functional = values[4].split('Exchange', 1)[0].strip() if len(values) > 4 else None
+        z_valence = _get_token(values, 5)
+
+    if not element:
+        raise ValueError('the `PP_HEADER` of `{}` does not define an element'.format(getattr(source, 'name', source)))
+
+    try:
+        z_valence = float(z_valence) if z_valence is not None else None
+    except ValueError:
+        z_valence = None
+
+    return UpfHeader(version, element.strip().capitalize(), pseudo_type, functional, z_valence)
+
+
+def _read_header_lines(handle):
+    """Read the lines of the `PP_HEADER` section from a file handle, stopping as soon as the section is closed.
+
+    :param handle: a filelike object opened in binary or text mode.
+    :return: tuple of the UPF version and the list of lines of the section, or `None` if the section was not found.
+    """
+    version = '1'
+    header = None
+
+    for line in handle:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+
+        if header is None:
+            match = REGEX_UPF_VERSION.search(line)
+            if match:
+                version = match.group(1)
+
+            index = line.find('<PP_HEADER')
+            if index == -1:
+                continue
+
+            line = line[index:]
+            header = []
+
+        header.append(line.strip())
+
+        if '</PP_HEADER>' in line or line.rstrip().endswith('/>'):
+            return version, header
+
+    return None
+
+
+def _get_token(lines, index):
+    """Return the first whitespace separated token of the line with the given index, or `None` if it does not exist.
+
+    :param lines: list of lines.
+    :param index: the index of the line.
+    """
+    try:
+        return lines[index].split()[0]
+    except IndexError:
+        return None
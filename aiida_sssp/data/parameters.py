@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 """Subclass of `Data` to represent metadata parameters for a specific `SsspFamily`."""
+import collections
+import sys
+import types
 from uuid import UUID
 
 from aiida import orm
 from aiida.common.lang import type_check
 
-__all__ = ('SsspParameters',)
+from aiida_sssp.common import LruCache
+
+__all__ = ('ElementMetadata', 'SsspParameters')
+
+ElementMetadata = collections.namedtuple('ElementMetadata', ('filename', 'md5', 'cutoff_wfc', 'cutoff_rho'))
+ElementMetadata.__doc__ = """Immutable record with the metadata of a single element of `SsspParameters`."""
+
+# Compact views of the metadata of stored `SsspParameters` nodes, which are immutable, indexed on their UUID.
+_RECORDS = LruCache(maxsize=128)
 
 
 class SsspParameters(orm.Data):
@@ -21,6 +32,17 @@ class SsspParameters(orm.Data):
         :param uuid: the UUID of the `SsspFamily` to which it should be coupled.
         :return: instance of `SsspParameters`.
         """
+        return cls(cls.load_metadata(source), uuid)
+
+    @classmethod
+    def load_metadata(cls, source):
+        """Load and validate the metadata parameters from a file without constructing a node.
+
+        :param source: a filelike handle or absolute filepath.
+        :return: dictionary of elements onto their metadata, see the constructor for the expected format.
+        :raises TypeError: if the content of the file is not a dictionary.
+        :raises ValueError: if the content of the file is not valid JSON or not valid metadata.
+        """
         import json
 
         try:
@@ -31,7 +53,26 @@ class SsspParameters(orm.Data):
         else:
             parameters = json.loads(content)
 
-        return cls(parameters, uuid)
+        type_check(parameters, dict)
+        cls.validate_metadata(parameters)
+
+        return parameters
+
+    @staticmethod
+    def validate_metadata(parameters):
+        """Validate that the metadata of each element is complete and of the correct type.
+
+        :param parameters: dictionary of elements onto their metadata, see the constructor for the expected format.
+        :raises ValueError: if the metadata of any element is incomplete or of the wrong type.
+        """
+        for element, values in parameters.items():
+            for key, valid_types in [('filename', str), ('md5', str), ('cutoff_wfc', float), ('cutoff_rho', float)]:
+                try:
+                    type_check(values[key], valid_types)
+                except KeyError:
+                    raise ValueError('entry for element `{}` is missing the `{}` key'.format(element, key))
+                except TypeError:
+                    raise ValueError('`{}` for element `{}` is not of type {}'.format(key, element, valid_types))
 
     def __init__(self, parameters, uuid, **kwargs):
         """Construct a new instance of metadata parameters for an `SsspFamily`.
@@ -52,15 +93,7 @@ class SsspParameters(orm.Data):
         type_check(parameters, dict)
         type_check(uuid, (str, UUID))
 
-        for element, values in parameters.items():
-            for key, valid_types in [('filename', str), ('md5', str), ('cutoff_wfc', float), ('cutoff_rho', float)]:
-                try:
-                    type_check(values[key], valid_types)
-                except KeyError:
-                    raise ValueError('entry for element `{}` is missing the `{}` key'.format(element, key))
-                except TypeError:
-                    raise ValueError('`{}` for element `{}` is not of type {}'.format(key, element, valid_types))
-
+        self.validate_metadata(parameters)
         self.set_attribute_many(parameters)
         self.family_uuid = uuid
 
@@ -113,3 +146,57 @@ class SsspParameters(orm.Data):
             return self.get_attribute(element)
         except AttributeError:
             raise KeyError('element `{}` is not defined for `{}`'.format(element, self))
+
+    @property
+    def records(self):
+        """Return a compact and immutable view of the metadata of all elements.
+
+        The view maps each element onto an `ElementMetadata` named tuple, whose string fields are interned. Since stored
+        nodes are immutable, their view is cached and shared by all instances of the same node. The cache only retains
+        the views of the most recently used nodes.
+
+        :return: read-only mapping of element onto `ElementMetadata`
+        """
+        if self.is_stored:
+            records = _RECORDS.get(self.uuid)
+
+            if records is not None:
+                return records
+
+        records = types.MappingProxyType({
+            sys.intern(element): ElementMetadata(
+                sys.intern(values['filename']),
+                sys.intern(values['md5']),
+                values['cutoff_wfc'],
+                values['cutoff_rho'],
+            ) for element, values in self.get_metadata().items()
+        })
+
+        if self.is_stored:
+            _RECORDS.set(self.uuid, records)
+
+        return records
+
+    @classmethod
+    def query_metadata(cls, uuid, elements):
+        """Return the metadata for the given elements of a stored instance without loading the entire node.
+
+        Only the attributes of the requested elements are projected in the query, such that the amount of data that is
+        retrieved from the database is independent of the total number of elements defined by the node.
+
+        :param uuid: the UUID of the stored `SsspParameters` node.
+        :param elements: iterable of elements
+        :return: dictionary of element mapping its metadata, elements that are not defined for the node are omitted
+        :raises `~aiida.common.exceptions.NotExistent`: if no `SsspParameters` node with the given UUID exists
+        """
+        from aiida.orm import QueryBuilder
+
+        elements = sorted(set(elements))
+
+        if not elements:
+            return {}
+
+        projections = ['attributes.{}'.format(element) for element in elements]
+        builder = QueryBuilder().append(cls, filters={'uuid': str(uuid)}, project=projections)
+
+        return {element: values for element, values in zip(elements, builder.one()) if isinstance(values, dict)}
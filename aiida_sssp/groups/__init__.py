@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=undefined-variable
 from .family import *
+from .handles import *
 
-__all__ = (family.__all__,)
+__all__ = family.__all__ + handles.__all__
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` with coroutines that do not block the event loop on querying the database."""
+from aiida.common import exceptions
+from aiida.orm import QueryBuilder
+from aiida.plugins import DataFactory
+
+from .handles import HandlesMixin, PseudoHandle
+
+__all__ = ('AsyncMixin',)
+
+SsspParameters = DataFactory('sssp.parameters')
+
+
+class AsyncMixin(HandlesMixin):
+    """Mixin to look up the pseudos, parameters and cutoffs of a family from a coroutine.
+
+    The queries that are run on the executor returned by `aiida_sssp.common.get_executor` only project plain values,
+    and any ORM entity is constructed on the thread of the event loop. The mixin is meant for a `Group` subclass that
+    provides the attributes that are declared below and that sets a reentrant lock as the `_lock` attribute of each
+    instance, which guards the `_pseudos` and `_parameters_node` caches.
+    """
+
+    KEY_PARAMETERS_UUID = None
+
+    _parameters_node = None
+    _parameters = None
+    _cutoffs_cache = None
+
+    @staticmethod
+    def _get_kinds(structure):
+        """Return the list of tuples of kind name and element symbol of the given structure."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _query_parameters_uuid(family_uuid, reference=None):
+        """Return the UUID of the `SsspParameters` node of a family through a projection that does not load the node."""
+        raise NotImplementedError
+
+    def _get_parameters_uuid(self):
+        """Return the UUID of the associated `SsspParameters` node or `None` if it is not referenced."""
+        raise NotImplementedError
+
+    @classmethod
+    def _get_cutoffs_symbols(cls, elements, structure):
+        """Return the set of elements for which to compute the cutoffs, as defined by the arguments of `get_cutoffs`."""
+        raise NotImplementedError
+
+    def get_cutoffs(self, elements=None, structure=None):
+        """Return the tuple of recommended cutoff and dual for either the given elements or `StructureData`."""
+        raise NotImplementedError
+
+    async def get_pseudos_async(self, structure, lazy=False):
+        """Coroutine equivalent of `get_pseudos` that does not block the event loop on querying the database.
+
+        The pseudos that are not yet cached on the family are queried through a projection on the executor returned by
+        `aiida_sssp.common.get_executor`, which only returns plain values and so does not construct any ORM entity on
+        the threads of the executor. Concurrent requests for the same family and set of elements share a single query.
+        Unless `lazy` is True, the `UpfData` nodes are then loaded in a single query on the thread of the event loop and
+        cached on the family. If all pseudos are already cached, the executor is not involved at all.
+
+        :param structure: the structure for which to return the corresponding `UpfData` mapping, see `get_pseudos`.
+        :param lazy: if True, return a `PseudoHandle` instead of the `UpfData` for each kind.
+        :return: dictionary of kind name mapping `UpfData`
+        :raises TypeError: if the type of the structure is not supported.
+        :raises ValueError: if the family does not contain a `UpfData` for any of the elements of the given structure.
+        """
+        from aiida_sssp.common import run_coalesced
+
+        kinds = self._get_kinds(structure)
+        elements = frozenset(symbol for _, symbol in kinds)
+        pseudos = self._pseudos or {}
+        missing = elements.difference(pseudos)
+        handles = {}
+
+        if missing:
+            handles = await run_coalesced((self.uuid, 'handles', missing), self._query_handles, self.pk, missing)
+            self._check_elements(elements, set(pseudos).union(handles))
+
+        if lazy:
+            pseudos = {element: PseudoHandle.from_node(pseudos[element]) for element in elements.difference(missing)}
+            pseudos.update(handles)
+        elif handles:
+            pseudos = dict(pseudos, **self._load_handle_nodes(handles))
+
+        return {name: pseudos[symbol] for name, symbol in kinds}
+
+    def _load_handle_nodes(self, handles):
+        """Load the `UpfData` nodes of the given handles in a single query and cache them on the instance.
+
+        :param handles: dictionary of element symbol mapping `PseudoHandle`
+        :return: dictionary of element symbol mapping the loaded `UpfData`
+        """
+        pks = {handle.pk: element for element, handle in handles.items()}
+        builder = QueryBuilder().append(self._node_types, filters={'id': {'in': list(pks)}})
+        loaded = {pks[upf.pk]: upf for [upf] in builder.iterall()}
+
+        with self._lock:
+            self._pseudos = dict(self._pseudos or {}, **loaded)
+
+        return loaded
+
+    async def get_parameters_node_async(self):
+        """Coroutine equivalent of `get_parameters_node` that does not block the event loop on looking up the node.
+
+        Unless the node is already cached on the family, its UUID is resolved through a projection on the executor
+        returned by `aiida_sssp.common.get_executor`, which does not construct any ORM entity on the threads of the
+        executor. Concurrent requests for the same family share a single lookup. The node itself is then loaded, and
+        the reference in the extras of the family updated if necessary, on the thread of the event loop.
+
+        :return: the associated `SsspParameters` node containing information like recommended cutoffs
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
+        from aiida.orm import load_node
+        from aiida_sssp.common import run_coalesced
+
+        node = self._parameters_node
+
+        if node is None:
+            reference = self.get_extra(self.KEY_PARAMETERS_UUID, None)
+            key = (self.uuid, 'parameters_uuid', reference)
+            uuid = await run_coalesced(key, self._query_parameters_uuid, self.uuid, reference)
+
+            with self._lock:
+                if self._parameters_node is None:
+                    node = load_node(uuid)
+                    if uuid != reference:
+                        self.set_extra(self.KEY_PARAMETERS_UUID, uuid)
+                    self._parameters = node.attributes
+                    self._parameters_node = node
+                node = self._parameters_node
+
+        return node
+
+    async def get_cutoffs_async(self, elements=None, structure=None):
+        """Coroutine equivalent of `get_cutoffs` that does not block the event loop on querying the database.
+
+        Unless the cutoffs are already cached or the parameters of the family are already loaded, the metadata of the
+        elements is projected from the associated `SsspParameters` node and reduced to the cutoffs on the executor
+        returned by `aiida_sssp.common.get_executor`, which does not construct any ORM entity on the threads of the
+        executor. Concurrent requests for the same family and set of elements share a single computation.
+
+        :param elements: single or tuple of elements
+        :param structure: a `StructureData` node, ASE `Atoms`, pymatgen structure or sequence of element symbols
+        :return: tuple of recommended wavefunction and density cutoff
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
+        from aiida_sssp.common import run_coalesced
+
+        symbols = self._get_cutoffs_symbols(elements, structure)
+        uuid = self._get_parameters_uuid()
+        cutoffs = self._cutoffs_cache.get((self.uuid, uuid, symbols))
+
+        if cutoffs is not None:
+            return cutoffs
+
+        values = None
+
+        if uuid is not None and self._parameters_node is None:
+            try:
+                values = await run_coalesced((self.uuid, 'cutoffs', uuid, symbols), self._query_cutoffs, uuid, symbols)
+            except exceptions.NotExistent:
+                pass
+
+        if values is None:
+            # The parameters node is loaded or has to be resolved first, for example because the reference is stale
+            await self.get_parameters_node_async()
+            return self.get_cutoffs(elements=tuple(symbols))
+
+        missing = symbols.difference(values)
+
+        if missing:
+            element = sorted(missing)[0]
+            raise KeyError('family `{}` does not contain the element `{}`'.format(self.label, element))
+
+        cutoffs = (max(wfc for wfc, _ in values.values()), max(rho for _, rho in values.values()))
+        self._cutoffs_cache.set((self.uuid, uuid, symbols), cutoffs)
+
+        return cutoffs
+
+    @staticmethod
+    def _query_cutoffs(uuid, elements):
+        """Return the cutoffs of the given elements through a projection on a `SsspParameters` node.
+
+        Only plain values are passed to and returned from this method, such that it can be called on a thread other
+        than the one that loaded the family.
+
+        :param uuid: the UUID of the `SsspParameters` node
+        :param elements: iterable of elements
+        :return: dictionary of element mapping its wavefunction and density cutoff, which omits undefined elements
+        :raises: `aiida.common.exceptions.NotExistent` if no `SsspParameters` node with the given UUID exists
+        """
+        metadata = SsspParameters.query_metadata(uuid, elements)
+        return {element: (values['cutoff_wfc'], values['cutoff_rho']) for element, values in metadata.items()}
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to export a family to and import it from a single bundle file."""
+import os
+import shutil
+
+from aiida.common import exceptions
+from aiida.plugins import DataFactory
+
+__all__ = ('BundleMixin',)
+
+SsspParameters = DataFactory('sssp.parameters')
+
+
+class BundleMixin:
+    """Mixin to export a family with its pseudos and parameters to a compact bundle and to import it from one.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    BUNDLE_VERSION = 1
+
+    @property
+    def pseudos(self):
+        """Return the dictionary of element mapping the `UpfData` of each pseudo of the family."""
+        raise NotImplementedError
+
+    def get_parameters_node(self):
+        """Return the associated `SsspParameters` node."""
+        raise NotImplementedError
+
+    @classmethod
+    def _parse_folder(  # pylint: disable=too-many-arguments
+        cls, dirpath, uuid, metadata=None, incremental=False, deduplicate=False, prevalidate=True
+    ):
+        """Parse the pseudos in a directory and construct the optional parameters without storing anything."""
+        raise NotImplementedError
+
+    @classmethod
+    def _store_family(cls, family, pseudos, parameters=None, manifest=None):
+        """Store a new family with its pseudos and optional parameters, as returned by `_parse_folder`."""
+        raise NotImplementedError
+
+    def export_bundle(self, filepath):
+        """Export this family to a single compact bundle that can be imported in another profile with `import_bundle`.
+
+        The bundle is a zip file that contains a `manifest.json` with the label, description and the filename and md5
+        checksum of the pseudo of each element, a `parameters.json` with the metadata of the associated `SsspParameters`
+        if the family has any, and the UPF files themselves in the `pseudos` folder.
+
+        :param filepath: absolute filepath to write the bundle to, an existing file is replaced.
+        """
+        import json
+        import tempfile
+        import zipfile
+
+        pseudos = self.pseudos
+        entries = {element: {'filename': upf.filename, 'md5': upf.md5sum} for element, upf in pseudos.items()}
+        manifest = {
+            'version': self.BUNDLE_VERSION,
+            'label': self.label,
+            'description': self.description,
+            'pseudos': entries,
+        }
+
+        try:
+            metadata = self.get_parameters_node().get_metadata()
+        except exceptions.NotExistent:
+            metadata = None
+
+        dirpath = os.path.dirname(os.path.abspath(filepath))
+
+        with tempfile.NamedTemporaryFile(dir=dirpath, suffix='.zip', delete=False) as handle:
+            try:
+                with zipfile.ZipFile(handle, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+                    bundle.writestr('manifest.json', json.dumps(manifest, indent=2, sort_keys=True))
+
+                    if metadata is not None:
+                        bundle.writestr('parameters.json', json.dumps(metadata, indent=2, sort_keys=True))
+
+                    for element in sorted(pseudos):
+                        upf = pseudos[element]
+                        with upf.open(upf.filename, mode='rb') as source:
+                            bundle.writestr('pseudos/{}'.format(upf.filename), source.read())
+            except Exception:
+                os.remove(handle.name)
+                raise
+
+        os.replace(handle.name, filepath)
+
+    @classmethod
+    def import_bundle(cls, filepath, label=None):
+        """Create a new `SsspFamily` from a bundle written by `export_bundle`.
+
+        Pseudos for which a `UpfData` with the same filename and md5 checksum is already stored are reused instead of
+        parsed. All files are validated against the manifest before anything is stored. If storing fails, no family is
+        left behind, see `_store_family` for details.
+
+        :param filepath: absolute filepath of the bundle.
+        :param label: optional label for the new family, by default the label stored in the bundle.
+        :return: new stored instance of `SsspFamily`
+        :raises ValueError: if the bundle is invalid or a `SsspFamily` already exists with the label
+        """
+        # pylint: disable=too-many-locals
+        import json
+        import tempfile
+        import zipfile
+
+        from aiida.common.files import md5_file
+
+        try:
+            with zipfile.ZipFile(filepath) as bundle, tempfile.TemporaryDirectory() as dirpath:
+                manifest = json.loads(bundle.read('manifest.json').decode('utf-8'))
+
+                if manifest.get('version', None) != cls.BUNDLE_VERSION:
+                    raise ValueError('bundle `{}` has an unsupported version'.format(filepath))
+
+                label = label or manifest['label']
+
+                try:
+                    cls.objects.get(label=label)
+                except exceptions.NotExistent:
+                    family = cls(label=label, description=manifest.get('description', None) or '')
+                else:
+                    raise ValueError('the SsspFamily `{}` already exists'.format(label))
+
+                # Only extract the files listed in the manifest and only by their basename, such that the archive can
+                # never write outside of the temporary directory.
+                dirpath_pseudos = os.path.join(dirpath, 'pseudos')
+                os.makedirs(dirpath_pseudos)
+
+                for element, entry in manifest['pseudos'].items():
+                    filename = os.path.basename(entry['filename'])
+                    filepath_pseudo = os.path.join(dirpath_pseudos, filename)
+
+                    with bundle.open('pseudos/{}'.format(filename)) as source, open(filepath_pseudo, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+
+                    if md5_file(filepath_pseudo) != entry['md5']:
+                        raise ValueError('the pseudo `{}` for element `{}` is corrupt'.format(filename, element))
+
+                metadata = None
+
+                if 'parameters.json' in bundle.namelist():
+                    filepath_parameters = os.path.join(dirpath, 'parameters.json')
+                    with bundle.open('parameters.json') as source, open(filepath_parameters, 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    metadata = SsspParameters.load_metadata(filepath_parameters)
+
+                pseudos, parameters, _ = cls._parse_folder(dirpath_pseudos, family.uuid, metadata, deduplicate=True)
+
+                if {pseudo.element for pseudo in pseudos} != set(manifest['pseudos']):
+                    raise ValueError('the pseudos of bundle `{}` do not match its manifest'.format(filepath))
+
+                cls._store_family(family, pseudos, parameters)
+
+        except (KeyError, zipfile.BadZipFile) as exception:
+            raise ValueError('bundle `{}` is invalid: {}'.format(filepath, exception))
+
+        return family
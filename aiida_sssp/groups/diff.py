@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to compare the pseudos and recommended cutoffs of families."""
+import collections
+import itertools
+
+from aiida.common import exceptions
+from aiida.common.lang import type_check
+from aiida.orm import QueryBuilder
+from aiida.plugins import DataFactory, GroupFactory
+
+from .snapshot import SnapshotMixin
+
+__all__ = ('DiffMixin',)
+
+SsspParameters = DataFactory('sssp.parameters')
+
+FamilyDiff = collections.namedtuple('FamilyDiff', ('added', 'removed', 'changed', 'cutoffs'))
+FamilyDiff.__doc__ = """Differences in the pseudos and cutoffs of one `SsspFamily` with respect to another."""
+
+
+class DiffMixin(SnapshotMixin):
+    """Mixin to compare the pseudos and recommended cutoffs of a family to those of other families.
+
+    The lookup tables that are compared are taken from the snapshots of the families where possible, which is why this
+    mixin builds on the `SnapshotMixin`. The mixin is meant for a `Group` subclass that provides the attributes that
+    are declared below and by the `SnapshotMixin`.
+    """
+
+    _parameters = None
+
+    def _query_element_parameters(self, elements):
+        """Return the parameters of the given elements through a projection on the associated `SsspParameters`."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _query_parameters_uuid(family_uuid, reference=None):
+        """Return the UUID of the `SsspParameters` node of a family through a projection that does not load it."""
+        raise NotImplementedError
+
+    def get_lookup_table(self):
+        """Return the md5 checksum and recommended cutoffs of the pseudo of each element of this family.
+
+        This is the compact summary of the family on which `diff` and `diff_many` operate.
+
+        The md5 checksums are taken from the snapshot of the family if one has been saved, see `save_snapshot`, and are
+        otherwise retrieved through a projection on the group membership. The cutoffs are taken from the parameters if
+        these are already loaded on the instance or else from the snapshot if it is current. Otherwise, only the
+        attributes of the elements of the family are projected from the associated `SsspParameters` node, which is
+        never loaded as a whole.
+
+        :return: dictionary of element onto a tuple of md5, wavefunction cutoff and density cutoff, where the cutoffs
+            are `None` if they are not defined.
+        """
+        snapshot = self._get_snapshot()
+
+        if snapshot is not None:
+            checksums = {element: values[2] for element, values in snapshot['pseudos'].items()}
+        else:
+            builder = QueryBuilder().append(
+                type(self), filters={'id': self.pk}, tag='group').append(
+                self._node_types, with_group='group', project=['attributes.element', 'attributes.md5'])  # yapf:disable
+            checksums = dict(builder.iterall())
+
+        parameters = self._parameters
+
+        if parameters is None and self._is_snapshot_current(snapshot):
+            parameters = snapshot['parameters']
+
+        if parameters is None:
+            parameters = self._query_element_parameters(set(checksums))
+
+        if parameters is None:
+            # The family does not reference its parameters node or the reference is stale, so look up the node first
+            try:
+                parameters = SsspParameters.query_metadata(self._query_parameters_uuid(self.uuid), checksums)
+            except exceptions.NotExistent:
+                parameters = {}
+
+        table = {}
+
+        for element, md5 in checksums.items():
+            values = parameters.get(element, None)
+
+            if isinstance(values, dict):
+                table[element] = (md5, values['cutoff_wfc'], values['cutoff_rho'])
+            else:
+                table[element] = (md5, None, None)
+
+        return table
+
+    def diff(self, other):
+        """Return the differences of the pseudos and recommended cutoffs of another family with respect to this one.
+
+        :param other: the `SsspFamily` to compare to.
+        :return: `FamilyDiff` named tuple with the sorted lists of elements that are `added` to and `removed` from
+            `other` and of the elements of which the pseudo `changed`, based on its md5 checksum. The `cutoffs` map each
+            element that is defined by both families with different cutoffs onto a tuple of the differences in the
+            wavefunction and density cutoff of `other` with respect to this family.
+        """
+        type_check(other, GroupFactory('sssp.family'))
+        return self._diff_tables(self.get_lookup_table(), other.get_lookup_table())
+
+    @classmethod
+    def diff_many(cls, families):
+        """Return the differences between each pair of the given families.
+
+        The lookup table of each family is only retrieved once, regardless of the number of pairs it is part of.
+
+        :param families: iterable of `SsspFamily`.
+        :return: dictionary of tuple of labels onto the `FamilyDiff` of the second with respect to the first family,
+            for each pair in the order in which the families were given.
+        """
+        families = list(families)
+        tables = [family.get_lookup_table() for family in families]
+        pairs = itertools.combinations(zip(families, tables), 2)
+
+        return {(first.label, second.label): cls._diff_tables(a, b) for (first, a), (second, b) in pairs}
+
+    @staticmethod
+    def _diff_tables(table_a, table_b):
+        """Return the differences of the second lookup table with respect to the first one.
+
+        :param table_a: lookup table as returned by `get_lookup_table`.
+        :param table_b: lookup table as returned by `get_lookup_table`.
+        :return: `FamilyDiff` named tuple.
+        """
+        common = set(table_a).intersection(table_b)
+        cutoffs = {}
+
+        for element in common:
+            _, wfc_a, rho_a = table_a[element]
+            _, wfc_b, rho_b = table_b[element]
+
+            if None not in (wfc_a, rho_a, wfc_b, rho_b) and (wfc_a, rho_a) != (wfc_b, rho_b):
+                cutoffs[element] = (wfc_b - wfc_a, rho_b - rho_a)
+
+        return FamilyDiff(
+            sorted(set(table_b).difference(table_a)),
+            sorted(set(table_a).difference(table_b)),
+            sorted(element for element in common if table_a[element][0] != table_b[element][0]),
+            cutoffs,
+        )
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to read directories of UPF files without parsing every file in them."""
+import os
+
+from aiida.common.lang import type_check
+from aiida.orm import QueryBuilder
+from aiida.plugins import DataFactory
+
+__all__ = ('DirectoryMixin',)
+
+SsspParameters = DataFactory('sssp.parameters')
+UpfData = DataFactory('upf')
+
+
+class DirectoryMixin:
+    """Mixin with the class methods that read a directory of UPF files while avoiding to parse each of its files.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    @staticmethod
+    def _parse_upf(filepath):
+        """Parse the given UPF file into a new `UpfData` node."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _list_directory(dirpath):
+        """Return the sorted absolute filepaths of the files in the given directory.
+
+        :param dirpath: absolute path to a directory.
+        :raises ValueError: if `dirpath` is not a directory or contains anything other than files
+        """
+        if not os.path.isdir(dirpath):
+            raise ValueError('`{}` is not a directory'.format(dirpath))
+
+        filepaths = [os.path.join(dirpath, filename) for filename in sorted(os.listdir(dirpath))]
+
+        if not all(os.path.isfile(filepath) for filepath in filepaths):
+            raise ValueError('dirpath `{}` contains at least one entry that is not a file'.format(dirpath))
+
+        return filepaths
+
+    @classmethod
+    def parse_pseudos_from_directory_incremental(cls, dirpath):
+        """Parse the UPF files in the given directory, reusing the `UpfData` nodes of files that did not change.
+
+        A manifest with the size, modification time, md5 checksum and `UpfData` UUID of each file is kept per directory
+        and profile in the local cache. Files whose size and modification time did not change are not read at all and
+        files whose md5 checksum did not change reuse the stored `UpfData` of the previous call. Only new or changed
+        files are parsed into new `UpfData` nodes.
+
+        .. note:: the returned manifest is not yet saved: that is up to the caller once the new nodes are stored.
+
+        :param dirpath: absolute path to a directory containing pseudo potentials in UPF format.
+        :return: tuple of the list of `UpfData` nodes, where reused nodes are stored and new nodes are not, and the
+            updated `DirectoryManifest`
+        :raises ValueError: if `dirpath` is not a directory or contains anything other than files with .UPF format
+        :raises ValueError: if `dirpath` contains multiple pseudo potentials for the same element
+        """
+        from aiida.manage.configuration import get_profile
+        from aiida_sssp.common import DirectoryManifest
+
+        stats = {os.path.basename(filepath): os.stat(filepath) for filepath in cls._list_directory(dirpath)}
+        manifest = DirectoryManifest(dirpath, namespace=get_profile().name)
+        files = {filename: (stat, manifest.get_md5(filename, stat)) for filename, stat in stats.items()}
+        uuids = {manifest.get_uuid(filename, md5) for filename, (_, md5) in files.items()} - {None}
+        existing = {}
+
+        if uuids:
+            builder = QueryBuilder().append(UpfData, filters={'uuid': {'in': list(uuids)}})
+            existing = {upf.uuid: upf for [upf] in builder.iterall()}
+
+        pseudos = []
+
+        for filename, (stat, md5) in files.items():
+            upf = existing.get(manifest.get_uuid(filename, md5), None)
+
+            if upf is None or upf.md5sum != md5 or upf.filename != filename:
+                upf = cls._parse_upf(os.path.join(dirpath, filename))
+
+            manifest.update(filename, stat, md5, upf.uuid)
+            pseudos.append(upf)
+
+        manifest.prune(files.keys())
+
+        if len(pseudos) != len(set(pseudo.element for pseudo in pseudos)):
+            raise ValueError('directory `{}` contains pseudo potentials with duplicate elements'.format(dirpath))
+
+        return pseudos, manifest
+
+    @classmethod
+    def prevalidate_directory(cls, dirpath, parameters, max_workers=None):
+        """Validate the files in the given directory against the metadata of the parameters without parsing them.
+
+        This is a cheap check that is meant to be run before the files are parsed into `UpfData` nodes, which is the
+        expensive step. Files are matched to the metadata by their filename. Each file is streamed through md5 and only
+        its `PP_HEADER` is scanned to check its element, concurrently on a pool of threads.
+
+        :param dirpath: absolute path to a directory containing pseudo potentials in UPF format.
+        :param parameters: an instance of `SsspParameters` or a dictionary of metadata as returned by
+            `SsspParameters.load_metadata`, which allows to validate the directory without constructing a node.
+        :param max_workers: maximum number of threads, by default determined by `concurrent.futures`.
+        :raises ValueError: if `dirpath` is not a directory or contains anything other than files
+        :raises ValueError: if the `SsspParameters` are not compatible with the files in the directory
+        """
+        # pylint: disable=too-many-locals
+        from concurrent.futures import ThreadPoolExecutor
+        from aiida.common.files import md5_file
+        from aiida_sssp.common import scan_upf_header
+        from aiida_sssp.data import ElementMetadata
+
+        type_check(parameters, (SsspParameters, dict))
+
+        if isinstance(parameters, dict):
+            metadata = {
+                element: ElementMetadata(values['filename'], values['md5'], values['cutoff_wfc'], values['cutoff_rho'])
+                for element, values in parameters.items()
+            }
+            parameters = 'metadata'
+        else:
+            metadata = parameters.records
+
+        records = {record.filename: (element, record) for element, record in metadata.items()}
+        filepaths = cls._list_directory(dirpath)
+
+        for filepath in filepaths:
+            if os.path.basename(filepath) not in records:
+                raise ValueError('{} does not contain the file `{}`'.format(parameters, os.path.basename(filepath)))
+
+        def inspect(filepath):
+            return md5_file(filepath), scan_upf_header(filepath)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for filepath, (md5, header) in zip(filepaths, executor.map(inspect, filepaths)):
+                element, record = records[os.path.basename(filepath)]
+
+                if header.element != element:
+                    args = [parameters, 'element', record.filename, element, header.element]
+                    raise ValueError('{} inconsistent `{}` for file `{}`: {} != {}'.format(*args))
+
+                if record.md5 != md5:
+                    args = [parameters, 'md5', element, record.md5, md5]
+                    raise ValueError('{} inconsistent `{}` for element `{}`: {} != {}'.format(*args))
+
+    @classmethod
+    def scan_pseudos_from_directory(cls, dirpath):
+        """Scan the headers of the UPF files in the given directory, without parsing the files into `UpfData` nodes.
+
+        Only the `PP_HEADER` section of each file is read, which makes this a cheap alternative to
+        `parse_pseudos_from_directory` to list the contents of a directory.
+
+        :param dirpath: absolute path to a directory containing pseudo potentials in UPF format.
+        :return: dictionary of filename onto its `UpfHeader`
+        :raises ValueError: if `dirpath` is not a directory or contains anything other than files with .UPF format
+        :raises ValueError: if `dirpath` contains multiple pseudo potentials for the same element
+        """
+        from aiida_sssp.common import scan_upf_header
+        headers = {}
+
+        for filepath in cls._list_directory(dirpath):
+            try:
+                headers[os.path.basename(filepath)] = scan_upf_header(filepath)
+            except ValueError as exception:
+                raise ValueError('failed to parse `{}`: {}'.format(filepath, exception))
+
+        if len(headers) != len(set(header.element for header in headers.values())):
+            raise ValueError('directory `{}` contains pseudo potentials with duplicate elements'.format(dirpath))
+
+        return headers
@@ -1,12 +1,27 @@
 # -*- coding: utf-8 -*-
 """Subclass of `Group` designed to represent a family of `UpfData` nodes."""
+import itertools
 import os
+import threading
 
 from aiida.common import exceptions
 from aiida.common.lang import type_check
 from aiida.orm import Group, QueryBuilder
 from aiida.plugins import DataFactory
 
+from aiida_sssp.common import LruCache
+
+from .aio import AsyncMixin
+from .bundle import BundleMixin
+from .diff import DiffMixin
+from .directories import DirectoryMixin
+from .handles import HandlesMixin
+from .integrity import IntegrityMixin
+from .search import SearchMixin
+from .snapshot import SnapshotMixin
+from .staging import StagingMixin
+from .structures import StructuresMixin
+
 __all__ = ('SsspFamily',)
 
 UpfData = DataFactory('upf')
@@ -14,16 +29,43 @@ SsspParameters = DataFactory('sssp.parameters')
 StructureData = DataFactory('structure')
 
 
-class SsspFamily(Group):
+class SsspFamily(  # pylint: disable=too-many-ancestors,too-many-instance-attributes
+    DirectoryMixin, DiffMixin, StructuresMixin, SnapshotMixin, AsyncMixin, HandlesMixin, StagingMixin, IntegrityMixin,
+    BundleMixin, SearchMixin, Group
+):
     """Group to represent a pseudo potential family.
 
     Each instance can only contain `UpfData` nodes and can only contain one for each element.
+
+    The pseudos, parameters and snapshot that are loaded lazily are cached on the instance in plain dictionaries that
+    are never mutated once published: any update replaces the cached object as a whole. Reading a cache is therefore
+    lock-free and a lock of the instance is only acquired to fill or invalidate the caches. Only these in-memory caches
+    are thread-safe: filling a cache queries the database, which should happen on the thread that loaded the family.
+    To share an instance between threads, first load the data that the threads need, for example by accessing the
+    `pseudos` and `parameters` properties, after which lookups of pseudos and cutoffs through element symbols do not
+    touch the database. The loaded `UpfData` nodes themselves, except for their identifiers, are not thread-safe.
+
+    The coroutines of the asynchronous API, such as `get_pseudos_async`, follow the same rule: the queries that they
+    run on other threads only project plain values and any ORM entity is constructed on the thread of the event loop.
     """
 
+    KEY_ELEMENT_INDEX = 'element_index'
+    KEY_PARAMETERS_UUID = 'parameters_uuid'
+
     _node_types = (UpfData,)
     _pseudos = None
+    _pseudos_all = None
     _parameters_node = None
     _parameters = None
+    _parameters_uuid = None
+    _element_parameters = None
+    _cutoffs_cache = LruCache(maxsize=1024)
+    _symbols_cache = LruCache(maxsize=65536)
+
+    def initialize(self):
+        """Initialize the instance attributes, both when it is constructed and when it is loaded from the database."""
+        super().initialize()
+        self._lock = threading.RLock()
 
     def __repr__(self):
         """Represent the instance for debugging purposes."""
@@ -44,7 +86,7 @@ class SsspFamily(Group):
         type_check(pseudos, list)
         type_check(parameters, SsspParameters)
 
-        metadata = parameters.get_metadata()
+        records = parameters.records
 
         for pseudo in pseudos:
 
@@ -52,51 +94,70 @@ class SsspFamily(Group):
             element = pseudo.element
 
             try:
-                values = metadata[element]
+                record = records[element]
             except KeyError:
                 raise ValueError('{} does not contain the element `{}`'.format(parameters, element))
 
-            if values['filename'] != pseudo.filename:
-                args = [parameters, 'filename', element, values['filename'], pseudo.filename]
+            if record.filename != pseudo.filename:
+                args = [parameters, 'filename', element, record.filename, pseudo.filename]
                 raise ValueError('{} inconsistent `{}` for element `{}`: {} != {}'.format(*args))
 
-            if values['md5'] != pseudo.md5sum:
-                args = [parameters, 'md5', element, values['md5'], pseudo.md5sum]
+            if record.md5 != pseudo.md5sum:
+                args = [parameters, 'md5', element, record.md5, pseudo.md5sum]
                 raise ValueError('{} inconsistent `{}` for element `{}`: {} != {}'.format(*args))
 
     @classmethod
-    def parse_pseudos_from_directory(cls, dirpath):
+    def parse_pseudos_from_directory(cls, dirpath, deduplicate=False):
         """Parse the UPF files in the given directory into a list of `UpfData` nodes.
 
         :param dirpath: absolute path to a directory containing pseudo potentials in UPF format.
+        :param deduplicate: if True, files for which a `UpfData` with the same filename and md5 checksum is already
+            stored are not parsed, but the stored node is returned instead. See `find_pseudos` for details.
         :return: list of `UpfData` nodes
         :raises ValueError: if `dirpath` is not a directory or contains anything other than files with .UPF format
         :raises ValueError: if `dirpath` contains multiple pseudo potentials for the same element
         """
-        from aiida.common.exceptions import ParsingError
+        from aiida.common.files import md5_file
+
+        filepaths = cls._list_directory(dirpath)
+        existing = {}
         pseudos = []
 
-        if not os.path.isdir(dirpath):
-            raise ValueError('`{}` is not a directory'.format(dirpath))
+        if deduplicate:
+            existing = cls.find_pseudos({os.path.basename(filepath): md5_file(filepath) for filepath in filepaths})
 
-        for filename in os.listdir(dirpath):
-            filepath = os.path.join(dirpath, filename)
+        for filepath in filepaths:
+            upf = existing.get(os.path.basename(filepath), None)
 
-            if not os.path.isfile(filepath):
-                raise ValueError('dirpath `{}` contains at least one entry that is not a file'.format(dirpath))
+            if upf is None:
+                upf = cls._parse_upf(filepath)
 
-            try:
-                pseudos.append(UpfData(filepath))
-            except ParsingError as exception:
-                raise ValueError('failed to parse `{}`: {}'.format(filepath, exception))
+            pseudos.append(upf)
 
         if len(pseudos) != len(set(pseudo.element for pseudo in pseudos)):
             raise ValueError('directory `{}` contains pseudo potentials with duplicate elements'.format(dirpath))
 
         return pseudos
 
+    @staticmethod
+    def _parse_upf(filepath):
+        """Parse the given UPF file into a new `UpfData` node.
+
+        :param filepath: absolute filepath of the UPF file.
+        :return: unstored `UpfData` node
+        :raises ValueError: if the file cannot be parsed
+        """
+        from aiida.common.exceptions import ParsingError
+
+        try:
+            return UpfData(filepath)
+        except ParsingError as exception:
+            raise ValueError('failed to parse `{}`: {}'.format(filepath, exception))
+
     @classmethod
-    def create_from_folder(cls, dirpath, label, description=None, filepath_parameters=None):
+    def create_from_folder(  # pylint: disable=too-many-arguments
+        cls, dirpath, label, description=None, filepath_parameters=None, incremental=False, deduplicate=False
+    ):
         """Create a new `SsspFamily` from the pseudo potentials contained in a directory.
 
         .. note:: the directory pointed to by `dirpath` should only contain UPF files. If it contains any folders or any
@@ -106,6 +167,12 @@ class SsspFamily(Group):
         :param label: the label to give to the `SsspFamily`, should not already exist
         :param description: optional description to give to the family.
         :param filepath_parameters: a filelike object or filepath to a file containing metadata for `SsspParameters`.
+        :param incremental: if True, only parse the files that are new or changed since the last incremental call for
+            the same directory and reuse the `UpfData` nodes of all other files. See
+            `parse_pseudos_from_directory_incremental` for details.
+        :param deduplicate: if True, reuse the stored `UpfData` nodes that have the same filename and md5 checksum as a
+            file in the directory instead of creating a new node for it. Ignored if `incremental` is True, which already
+            reuses nodes by itself.
         :return: new stored instance of `SsspFamily`
         :raises ValueError: if a `SsspFamily` already exists with the given name
         """
@@ -118,22 +185,160 @@ class SsspFamily(Group):
         else:
             raise ValueError('the SsspFamily `{}` already exists'.format(label))
 
-        pseudos = cls.parse_pseudos_from_directory(dirpath)
+        if description is not None:
+            family.description = description
+
+        metadata = SsspParameters.load_metadata(filepath_parameters) if filepath_parameters is not None else None
+        parsed = cls._parse_folder(dirpath, family.uuid, metadata, incremental, deduplicate)
+        cls._store_family(family, *parsed)
+
+        return family
+
+    @classmethod
+    def create_from_folders(cls, folders, max_workers=None):
+        """Create a new `SsspFamily` for each of the given directories.
+
+        Only the checks that do not construct nodes run concurrently on a pool of threads: the headers of the UPF files
+        are scanned and the optional metadata is loaded and matched against the md5 checksums of the files. These only
+        read files and never access the database. Parsing the UPF files into nodes and storing them is serial: it runs
+        in the calling thread, as soon as the checks of a directory have passed, because `UpfData` parses its file again
+        when the file is set and when the node is stored. Errors are collected per directory instead of aborting the
+        entire batch.
+
+        :param folders: iterable of tuples `(dirpath, label)` or `(dirpath, label, filepath_parameters)`, with the same
+            meaning as the arguments of `create_from_folder`.
+        :param max_workers: maximum number of threads, by default determined by `concurrent.futures`.
+        :return: tuple of two dictionaries, one of label onto the newly created `SsspFamily` and one of directory onto
+            the exception that prevented its family from being created.
+        """
+        # pylint: disable=too-many-locals
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        folders = [tuple(folder) + (None,) * (3 - len(folder)) for folder in folders]
+        labels = [label for _, label, _ in folders]
+        existing = set()
+
+        if labels:
+            builder = QueryBuilder().append(SsspFamily, filters={'label': {'in': labels}}, project='label')
+            existing = set(builder.all(flat=True))
+
+        families = {}
+        errors = {}
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            for dirpath, label, filepath_parameters in folders:
+                if label in existing:
+                    errors[dirpath] = ValueError('the SsspFamily `{}` already exists'.format(label))
+                    continue
+
+                existing.add(label)
+                futures[executor.submit(cls._scan_folder, dirpath, filepath_parameters)] = (dirpath, label)
+
+            for future in as_completed(futures):
+                dirpath, label = futures[future]
 
-        if filepath_parameters is not None:
-            parameters = SsspParameters.create_from_file(filepath_parameters, family.uuid)
+                try:
+                    family = SsspFamily(label=label)
+                    parsed = cls._parse_folder(dirpath, family.uuid, future.result(), prevalidate=False)
+                    cls._store_family(family, *parsed)
+                except Exception as exception:  # pylint: disable=broad-except
+                    errors[dirpath] = exception
+                else:
+                    families[label] = family
+
+        return families, errors
+
+    @classmethod
+    def _scan_folder(cls, dirpath, filepath_parameters=None):
+        """Validate the files in a directory and load the optional metadata, without constructing any nodes.
+
+        This only reads files and so, unlike parsing the files into nodes, can be run on a thread other than the one
+        that accesses the database.
+
+        :param dirpath: absolute path to the folder containing the UPF files.
+        :param filepath_parameters: a filelike object or filepath to a file containing metadata for `SsspParameters`.
+        :return: the metadata as returned by `SsspParameters.load_metadata` or `None` if no file is specified.
+        :raises ValueError: if the directory or metadata is invalid or the files do not match the metadata.
+        """
+        cls.scan_pseudos_from_directory(dirpath)
+
+        if filepath_parameters is None:
+            return None
+
+        metadata = SsspParameters.load_metadata(filepath_parameters)
+        cls.prevalidate_directory(dirpath, metadata, max_workers=1)
+
+        return metadata
+
+    @classmethod
+    def _parse_folder(cls, dirpath, uuid, metadata=None, incremental=False, deduplicate=False, prevalidate=True):
+        """Parse the pseudo potentials in a directory and construct the optional parameters without storing anything.
+
+        :param dirpath: absolute path to the folder containing the UPF files.
+        :param uuid: the UUID of the family for which the directory is parsed.
+        :param metadata: optional metadata for the `SsspParameters`, as returned by `SsspParameters.load_metadata`.
+        :param incremental: whether to reuse the nodes of unchanged files.
+        :param deduplicate: whether to reuse stored nodes with the same filename and md5 checksum as a file.
+        :param prevalidate: if True, `incremental` is False and metadata is specified, the files are first checked with
+            `prevalidate_directory` before any of them is parsed.
+        :return: tuple of the list of `UpfData`, the validated `SsspParameters` or `None` and the `DirectoryManifest` or
+            `None` if `incremental` is False.
+        :raises ValueError: if the directory cannot be parsed or the parameters are not compatible with its pseudos.
+        """
+        # pylint: disable=too-many-arguments
+        manifest = None
+        parameters = None
+
+        if metadata is not None:
+            parameters = SsspParameters(metadata, uuid)
+
+        if incremental:
+            pseudos, manifest = cls.parse_pseudos_from_directory_incremental(dirpath)
+        else:
+            # Fail fast on files that do not match the metadata, before spending time on parsing all of them.
+            if parameters is not None and prevalidate:
+                cls.prevalidate_directory(dirpath, parameters)
+            pseudos = cls.parse_pseudos_from_directory(dirpath, deduplicate=deduplicate)
+
+        if parameters is not None:
             cls.validate_parameters(pseudos, parameters)
-            parameters.store()
 
-        if description is not None:
-            family.description = description
+        return pseudos, parameters, manifest
 
-        # Only store the `Group` and the `UpfData` nodes now, such that we don't have to worry about the clean up in
-        # the case that an exception is raised during creating them.
+    @classmethod
+    def _store_family(cls, family, pseudos, parameters=None, manifest=None):
+        """Store a new family with its pseudos and optional parameters, as returned by `_parse_folder`.
+
+        Storing a node or a group commits immediately, so this cannot be done in a single transaction. Instead, the
+        nodes are stored before the family, such that a failure while storing them does not leave a family behind, and
+        the family is deleted again if its pseudos cannot be added to it. Any nodes stored before a failure remain in
+        the database, where they are reused by a subsequent attempt with `deduplicate`.
+
+        :param family: the unstored `SsspFamily`.
+        :param pseudos: list of `UpfData` nodes, which can be either stored or unstored.
+        :param parameters: optional unstored `SsspParameters`.
+        :param manifest: optional `DirectoryManifest` that is saved once everything is stored.
+        """
+        extras = {cls.KEY_ELEMENT_INDEX: {}}
+
+        if parameters is not None:
+            parameters.store()
+            extras[cls.KEY_PARAMETERS_UUID] = parameters.uuid
+
+        pseudos = [upf.store() for upf in pseudos]
         family.store()
-        family.add_nodes([upf.store() for upf in pseudos])
 
-        return family
+        try:
+            family.set_extra_many(extras)
+            family.add_nodes(pseudos)
+        except Exception:
+            Group.objects.delete(family.pk)
+            raise
+
+        if manifest is not None:
+            manifest.save()
 
     def add_nodes(self, nodes):
         """Add a node or a set of nodes to the family.
@@ -150,17 +355,111 @@ class SsspFamily(Group):
         if any([not isinstance(node, self._node_types) for node in nodes]):
             raise TypeError('only nodes of type `{}` can be added'.format(self._node_types))
 
-        pseudos = {}
+        with self._lock:
+            pseudos = {}
+            elements = set(self.elements)
 
-        # Check for duplicates before adding any pseudo to the internal cache
-        for upf in nodes:
-            if upf.element in self.elements:
-                raise ValueError('element `{}` already present in this family'.format(upf.element))
-            pseudos[upf.element] = upf
+            # Check for duplicates before adding any pseudo to the database or the internal cache
+            for upf in nodes:
+                if upf.element in elements or upf.element in pseudos:
+                    raise ValueError('element `{}` already present in this family'.format(upf.element))
+                pseudos[upf.element] = upf
+
+            super().add_nodes(nodes)
+
+            index = self.element_index
+
+            if index is None:
+                index = self._build_element_index()
+            else:
+                index.update({element: upf.uuid for element, upf in pseudos.items()})
+
+            self.set_extra(self.KEY_ELEMENT_INDEX, index)
+
+            # Only publish the pseudos once they are part of the family in the database
+            if self._pseudos is not None:
+                self._pseudos = dict(self._pseudos, **pseudos)
+
+            if self._pseudos_all is not None:
+                self._pseudos_all = dict(self._pseudos_all, **pseudos)
+
+            self._snapshot = None
+
+    def remove_nodes(self, nodes):
+        """Remove a node or a set of nodes from the family.
+
+        :param nodes: a single `Node` or a list of `Nodes` of type `SsspFamily._node_types`
+        """
+        if not isinstance(nodes, (list, tuple)):
+            nodes = [nodes]
+
+        uuids = {node.uuid for node in nodes}
+
+        with self._lock:
+            super().remove_nodes(nodes)
+
+            index = self.element_index
+
+            if index is not None:
+                index = {element: uuid for element, uuid in index.items() if uuid not in uuids}
+                self.set_extra(self.KEY_ELEMENT_INDEX, index)
+
+            if self._pseudos is not None:
+                self._pseudos = {element: upf for element, upf in self._pseudos.items() if upf.uuid not in uuids}
+
+            if self._pseudos_all is not None:
+                pseudos = self._pseudos_all.items()
+                self._pseudos_all = {element: upf for element, upf in pseudos if upf.uuid not in uuids}
+
+            self._snapshot = None
+
+    def _build_element_index(self):
+        """Construct the index of element symbols onto `UpfData` UUIDs from the group membership in the database.
+
+        :return: dictionary of element symbol mapping the UUID of the corresponding `UpfData`
+        """
+        builder = QueryBuilder().append(
+            SsspFamily, filters={'id': self.pk}, tag='group').append(
+            self._node_types, with_group='group', project=['attributes.element', 'uuid'])  # yapf:disable
+
+        return {element: uuid for element, uuid in builder.iterall()}
+
+    def rebuild_index(self):
+        """Rebuild the element index and parameters reference that are stored in the extras of this family.
+
+        This is necessary for families that were created with a version of `aiida-sssp` that did not maintain the index
+        yet and can be used to recover if the index got out of sync for whatever reason.
 
-        self.pseudos.update(pseudos)
+        :return: dictionary of element symbol mapping the UUID of the corresponding `UpfData`
+        """
+        with self._lock:
+            index = self._build_element_index()
+            self.set_extra(self.KEY_ELEMENT_INDEX, index)
+            self._pseudos = None
+            self._pseudos_all = None
+
+            try:
+                parameters = self._query_parameters_node()
+            except exceptions.NotExistent:
+                pass
+            else:
+                self.set_extra(self.KEY_PARAMETERS_UUID, parameters.uuid)
+                self._parameters_node = None
+                self._parameters = None
+                self._parameters_uuid = None
+
+            self._cutoffs_cache.discard(lambda key: key[0] == self.uuid)
+            self._snapshot = None
 
-        super().add_nodes(nodes)
+        return index
+
+    @property
+    def element_index(self):
+        """Return the index of element symbols onto the UUIDs of the `UpfData` nodes, stored in the family extras.
+
+        :return: dictionary of element symbol mapping UUID or `None` if the family has not been indexed
+        """
+        return self.get_extra(self.KEY_ELEMENT_INDEX, None)
 
     @property
     def pseudos(self):
@@ -168,10 +467,16 @@ class SsspFamily(Group):
 
         :return: dictionary of element symbol mapping `UpfData`
         """
-        if self._pseudos is None:
-            self._pseudos = {upf.element: upf for upf in self.nodes}
+        pseudos = self._pseudos_all
 
-        return self._pseudos
+        if pseudos is None:
+            with self._lock:
+                if self._pseudos_all is None:
+                    self._pseudos_all = {upf.element: upf for upf in self.nodes}
+                    self._pseudos = self._pseudos_all
+                pseudos = self._pseudos_all
+
+        return pseudos
 
     @property
     def elements(self):
@@ -179,8 +484,74 @@ class SsspFamily(Group):
 
         :return: list of element symbols
         """
+        index = self.element_index
+
+        if index is not None:
+            return list(index.keys())
+
         return list(self.pseudos.keys())
 
+    def _load_pseudos(self, elements):
+        """Return the `UpfData` nodes for the given elements, loading all those that are not yet cached in one query.
+
+        If the family has an element index, the nodes are loaded directly through their UUID, or their PK if the
+        snapshot of the family is loaded. Otherwise they are looked up through the group membership and the `element`
+        attribute.
+
+        :param elements: iterable of element symbols
+        :return: dictionary of element symbol mapping `UpfData`
+        :raises ValueError: if the family does not contain a `UpfData` for any of the given elements
+        """
+        elements = set(elements)
+        pseudos = self._pseudos or {}
+        missing = elements - set(pseudos)
+
+        if missing:
+            with self._lock:
+                # Another thread may have loaded the missing pseudos while this one was waiting for the lock
+                pseudos = self._pseudos or {}
+                missing = elements - set(pseudos)
+
+                if missing:
+                    loaded = self._query_pseudos(missing)
+                    pseudos = dict(pseudos, **loaded)
+                    self._pseudos = pseudos
+
+        self._check_elements(elements, pseudos)
+
+        return {element: pseudos[element] for element in elements}
+
+    def _query_pseudos(self, elements):
+        """Query for the `UpfData` nodes of this family for the given elements.
+
+        :param elements: set of element symbols
+        :return: dictionary of element symbol mapping `UpfData`, which omits the elements that are not in this family
+        :raises RuntimeError: if the family contains more than one `UpfData` for any of the given elements
+        """
+        index = self.element_index
+        snapshot = self._snapshot
+
+        if index is None:
+            filters = {'attributes.element': {'in': list(elements)}}
+            builder = QueryBuilder().append(
+                SsspFamily, filters={'id': self.pk}, tag='group').append(
+                self._node_types, filters=filters, with_group='group')  # yapf:disable
+        elif snapshot:
+            pks = [snapshot['pseudos'][element][0] for element in elements if element in snapshot['pseudos']]
+            builder = QueryBuilder().append(self._node_types, filters={'id': {'in': pks}})
+        else:
+            uuids = [index[element] for element in elements if element in index]
+            builder = QueryBuilder().append(self._node_types, filters={'uuid': {'in': uuids}})
+
+        pseudos = {}
+
+        for [upf] in builder.iterall():
+            if upf.element in pseudos:
+                raise RuntimeError('family `{}` contains multiple pseudos for `{}`'.format(self.label, upf.element))
+            pseudos[upf.element] = upf
+
+        return pseudos
+
     def get_pseudo(self, element):
         """Return the `UpfData` for the given element.
 
@@ -188,49 +559,115 @@ class SsspFamily(Group):
         :return: `UpfData` instance if it exists
         :raises ValueError: if the family does not contain a `UpfData` for the given element
         """
-        try:
-            pseudo = self.pseudos[element]
-        except KeyError:
-            builder = QueryBuilder().append(
-                SsspFamily, filters={'id': self.pk}, tag='group').append(
-                self._node_types, filters={'attributes.element': element}, with_group='group')  # yapf:disable
-
-            try:
-                pseudo = builder.one()[0]
-            except exceptions.MultipleObjectsError:
-                raise RuntimeError('family `{}` contains multiple pseudos for `{}`'.format(self.label, element))
-            except exceptions.NotExistent:
-                raise ValueError('family `{}` does not contain pseudo for element `{}`'.format(self.label, element))
-            else:
-                self.pseudos[element] = pseudo
-
-        return pseudo
+        return self._load_pseudos([element])[element]
 
-    def get_pseudos(self, structure):
+    def get_pseudos(self, structure, lazy=False):
         """Return the mapping of kind names on `UpfData` for the given structure.
 
-        :param structure: the `StructureData` for which to return the corresponding `UpfData` mapping.
+        :param structure: the structure for which to return the corresponding `UpfData` mapping. Besides a
+            `StructureData`, an ASE `Atoms`, a pymatgen structure or a sequence of element symbols is accepted, whose
+            pseudos are resolved directly from their chemical symbols without creating a `StructureData`. See
+            `SsspFamily._get_kinds` for how their kind names are determined.
+        :param lazy: if True, return a `PseudoHandle` instead of the `UpfData` for each kind. The handles are filled
+            from a single projection query and only load their `UpfData` when its `node` is accessed.
         :return: dictionary of kind name mapping `UpfData`
+        :raises TypeError: if the type of the structure is not supported.
         :raises ValueError: if the family does not contain a `UpfData` for any of the elements of the given structure.
         """
-        type_check(structure, StructureData)
-        return {kind.name: self.get_pseudo(kind.symbol) for kind in structure.kinds}
+        kinds = self._get_kinds(structure)
+        elements = {symbol for _, symbol in kinds}
+        pseudos = self._load_handles(elements) if lazy else self._load_pseudos(elements)
+        return {name: pseudos[symbol] for name, symbol in kinds}
+
+    def _check_elements(self, elements, available):
+        """Check that the pseudos of all the given elements are available.
+
+        :param elements: iterable of element symbols
+        :param available: collection of the element symbols whose pseudo is available
+        :raises ValueError: if the family does not contain a `UpfData` for any of the given elements
+        """
+        missing = set(elements).difference(available)
+
+        if missing:
+            element = sorted(missing)[0]
+            raise ValueError('family `{}` does not contain pseudo for element `{}`'.format(self.label, element))
+
+    def _query_parameters_node(self):
+        """Query for the `SsspParameters` node whose `family_uuid` attribute matches the UUID of this family.
+
+        .. note:: this query filters on an attribute and so scales with the total number of `SsspParameters` nodes in
+            the database. It is only used for families that do not yet store a reference to their parameters node.
+
+        :return: the associated `SsspParameters` node
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
+        from aiida_sssp.data import SsspParameters
+
+        filters = {'attributes.{}'.format(SsspParameters.KEY_FAMILY_UUID): self.uuid}
+        return QueryBuilder().append(SsspParameters, filters=filters).one()[0]
 
     def get_parameters_node(self):
         """Return the associated `SsspParameters` node if it exists.
 
+        The node is loaded through the UUID that is stored in the extras of the family. For families that do not have
+        this reference, the node is looked up through its `family_uuid` attribute and the reference is stored.
+
         :return: the associated `SsspParameters` node containing information like recommended cutoffs
         :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
         """
+        node = self._parameters_node
+
+        if node is None:
+            with self._lock:
+                if self._parameters_node is None:
+                    node = self._resolve_parameters_node()
+                    self._parameters = node.attributes
+                    self._parameters_node = node
+                node = self._parameters_node
+
+        return node
+
+    @staticmethod
+    def _query_parameters_uuid(family_uuid, reference=None):
+        """Return the UUID of the `SsspParameters` node of a family through a projection that does not load the node.
+
+        Only plain values are passed to and returned from this method, such that it can be called on a thread other
+        than the one that loaded the family.
+
+        :param family_uuid: the UUID of the family
+        :param reference: optional UUID of the parameters node referenced in the extras of the family, which is used if
+            the node still exists. Otherwise, the node is looked up through its `family_uuid` attribute.
+        :return: the UUID of the associated `SsspParameters` node
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
+        if reference is not None:
+            builder = QueryBuilder().append(SsspParameters, filters={'uuid': reference}, project='uuid')
+            if builder.count():
+                return reference
+
+        filters = {'attributes.{}'.format(SsspParameters.KEY_FAMILY_UUID): family_uuid}
+        return QueryBuilder().append(SsspParameters, filters=filters, project='uuid').one()[0]
+
+    def _resolve_parameters_node(self):
+        """Load the associated `SsspParameters` node without caching it on this instance.
+
+        :return: the associated `SsspParameters` node
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
         from aiida_sssp.data import SsspParameters
 
-        if self._parameters_node is None:
-            filters = {'attributes.{}'.format(SsspParameters.KEY_FAMILY_UUID): self.uuid}
-            builder = QueryBuilder().append(SsspParameters, filters=filters)
-            self._parameters_node = builder.one()[0]
-            self._parameters = self._parameters_node.attributes
+        uuid = self.get_extra(self.KEY_PARAMETERS_UUID, None)
+
+        if uuid is not None:
+            try:
+                return QueryBuilder().append(SsspParameters, filters={'uuid': uuid}).one()[0]
+            except exceptions.NotExistent:
+                pass
 
-        return self._parameters_node
+        node = self._query_parameters_node()
+        self.set_extra(self.KEY_PARAMETERS_UUID, node.uuid)
+
+        return node
 
     @property
     def parameters(self):
@@ -239,10 +676,99 @@ class SsspFamily(Group):
         :return: a dictionary with all attributes of the associated `SsspParameters` node
         :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
         """
-        if self._parameters is None:
-            self.get_parameters_node()
+        parameters = self._parameters
+
+        if parameters is None:
+            with self._lock:
+                self.get_parameters_node()
+                parameters = self._parameters
+
+        return parameters
+
+    def _get_parameters_uuid(self):
+        """Return the UUID of the associated `SsspParameters` node, reading the reference from the extras only once.
+
+        :return: the UUID of the loaded parameters node or else of the reference in the extras, `None` if not set
+        """
+        node = self._parameters_node
+
+        if node is not None:
+            return node.uuid
+
+        uuid = self._parameters_uuid
+
+        if uuid is None:
+            uuid = self._parameters_uuid = self.get_extra(self.KEY_PARAMETERS_UUID, None)
+
+        return uuid
+
+    def get_element_parameters(self, elements):
+        """Return the parameters for the given elements.
+
+        If the parameters of the family have not already been loaded, they are taken from the snapshot of the family in
+        the local cache, see `save_snapshot`. Without snapshot, only the parameters of the requested elements are
+        retrieved from the database, through a projection on the associated `SsspParameters` node, and are cached on
+        the instance such that each element is only retrieved once.
+
+        :param elements: iterable of elements
+        :return: dictionary of element mapping its parameters
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        :raises KeyError: if the parameters do not contain any of the elements
+        """
+        elements = set(elements)
+        parameters = self._parameters
+        metadata = None
+
+        if parameters is None:
+            snapshot = self._get_snapshot()
+
+            if self._is_snapshot_current(snapshot):
+                parameters = snapshot['parameters']
+            else:
+                metadata = self._query_element_parameters(elements)
+
+        if metadata is None:
+            if parameters is None:
+                parameters = self.parameters
+            metadata = {element: parameters[element] for element in elements if element in parameters}
+
+        for element in sorted(elements):
+            if element not in metadata:
+                raise KeyError('family `{}` does not contain the element `{}`'.format(self.label, element))
+
+        return metadata
+
+    def _query_element_parameters(self, elements):
+        """Return the parameters of the given elements through a projection on the associated `SsspParameters` node.
+
+        The projected parameters are cached on the instance per UUID of the parameters node and element.
+
+        :param elements: set of elements
+        :return: dictionary of element mapping its parameters, which omits the elements that are not defined, or `None`
+            if the family does not reference its parameters node or the reference is stale.
+        """
+        uuid = self._get_parameters_uuid()
+
+        if uuid is None:
+            return None
 
-        return self._parameters
+        rows = self._element_parameters or {}
+        missing = {element for element in elements if (uuid, element) not in rows}
+
+        if missing:
+            try:
+                queried = SsspParameters.query_metadata(uuid, missing)
+            except exceptions.NotExistent:
+                # The reference is stale, so fall back on `get_parameters_node` which will resolve and update it.
+                self._parameters_uuid = None
+                return None
+
+            with self._lock:
+                rows = dict(self._element_parameters or {})
+                rows.update({(uuid, element): queried.get(element, None) for element in missing})
+                self._element_parameters = rows
+
+        return {element: rows[(uuid, element)] for element in elements if rows[(uuid, element)] is not None}
 
     def get_parameter(self, element, parameter):
         """Return a specific parameter for a given element.
@@ -251,13 +777,10 @@ class SsspFamily(Group):
         :param parameter: the key of the parameter
         :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
         """
-        try:
-            element = self.parameters[element]
-        except KeyError:
-            raise KeyError('family `{}` does not contain the element `{}`'.format(self.label, element))
+        values = self.get_element_parameters([element])[element]
 
         try:
-            return element[parameter]
+            return values[parameter]
         except KeyError:
             raise KeyError('parameter `{}` is not available for element `{}`'.format(parameter, element))
 
@@ -266,30 +789,143 @@ class SsspFamily(Group):
 
         .. note:: at least one and only one of arguments `elements` or `structure` should be passed.
 
+        .. note:: the result is cached on the family, its associated parameters and the set of elements, which means
+            that structures with the same chemical composition will only compute the cutoffs once. The cache statistics
+            are returned by `SsspFamily.get_cache_info`.
+
         :param elements: single or tuple of elements
-        :param structure: a `StructureData` node
+        :param structure: a `StructureData` node, ASE `Atoms`, pymatgen structure or sequence of element symbols
         :return: tuple of recommended wavefunction and density cutoff
         :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
         """
+        symbols = self._get_cutoffs_symbols(elements, structure)
+        cutoffs = self._cutoffs_cache.get((self.uuid, self._get_parameters_uuid(), symbols))
+
+        if cutoffs is None:
+            cutoffs = self._compute_cutoffs(symbols)
+            # The key is only determined now, since computing the cutoffs can resolve the parameters node of the family
+            self._cutoffs_cache.set((self.uuid, self._get_parameters_uuid(), symbols), cutoffs)
+
+        return cutoffs
+
+    @classmethod
+    def _get_cutoffs_symbols(cls, elements, structure):
+        """Return the set of elements for which to compute the cutoffs, as defined by the arguments of `get_cutoffs`.
+
+        :param elements: single or tuple of elements
+        :param structure: a `StructureData` node, ASE `Atoms`, pymatgen structure or sequence of element symbols
+        :return: frozenset of element symbols
+        """
         if (elements is None and structure is None) or (elements is not None and structure is not None):
             raise ValueError('at least one and only one of `elements` or `structure` should be defined')
 
         type_check(elements, (tuple, str), allow_none=True)
-        type_check(structure, StructureData, allow_none=True)
+
+        if isinstance(structure, StructureData):
+            return cls._get_symbols_set(structure)
 
         if structure is not None:
-            symbols = structure.get_symbols_set()
-        elif isinstance(elements, tuple):
-            symbols = elements
-        else:
-            symbols = (elements,)
+            return frozenset(symbol for _, symbol in cls._get_kinds(structure))
+
+        if isinstance(elements, tuple):
+            return frozenset(elements)
+
+        return frozenset((elements,))
+
+    def _compute_cutoffs(self, symbols):
+        """Return the tuple of recommended wavefunction and density cutoff for the given set of elements.
+
+        :param symbols: set of elements
+        :return: tuple of recommended wavefunction and density cutoff
+        """
+        node = self._parameters_node
+
+        if node is not None:
+            records = node.records
+            missing = symbols - set(records)
+
+            if missing:
+                element = sorted(missing)[0]
+                raise KeyError('family `{}` does not contain the element `{}`'.format(self.label, element))
+
+            cutoffs = [records[element] for element in symbols]
+            return (max(record.cutoff_wfc for record in cutoffs), max(record.cutoff_rho for record in cutoffs))
+
+        parameters = self.get_element_parameters(symbols).values()
+
+        return (max(values['cutoff_wfc'] for values in parameters), max(values['cutoff_rho'] for values in parameters))
+
+    @staticmethod
+    def _get_kinds(structure):
+        """Return the kind names and element symbols of the sites of the given structure.
+
+        Besides `StructureData`, ASE `Atoms`, pymatgen `Structure` and `Molecule` objects and lists or tuples of element
+        symbols are supported. The former two are recognized by their interface, such that neither library needs to be
+        installed. The kind names follow the conventions of the `StructureData` constructors: the tag of an atom, if not
+        zero, is appended to its symbol for ASE, the `kind_name` site property is used if defined for pymatgen and the
+        symbols themselves are the kind names of a sequence of symbols.
+
+        :param structure: a `StructureData`, ASE `Atoms`, pymatgen structure or sequence of element symbols
+        :return: list of tuples of kind name and element symbol
+        :raises TypeError: if the type of the structure is not supported.
+        :raises ValueError: if the pymatgen structure contains sites with partial occupancies.
+        """
+        if isinstance(structure, StructureData):
+            return [(kind.name, kind.symbol) for kind in structure.kinds]
+
+        if hasattr(structure, 'get_chemical_symbols'):
+            symbols = structure.get_chemical_symbols()
+            tags = structure.get_tags() if hasattr(structure, 'get_tags') else itertools.repeat(0)
+            return [(symbol + str(tag) if tag else symbol, symbol) for symbol, tag in zip(symbols, tags)]
+
+        if hasattr(structure, 'sites') and hasattr(structure, 'is_ordered'):
+            if not structure.is_ordered:
+                raise ValueError('pymatgen structures with partial occupancies are not supported')
+
+            kinds = []
+
+            for site in structure.sites:
+                symbol = site.specie.symbol
+                kinds.append((site.properties.get('kind_name', symbol), symbol))
 
-        cutoffs_wfc = []
-        cutoffs_rho = []
+            return kinds
 
-        for element in symbols:
-            values = self.parameters[element]
-            cutoffs_wfc.append(values['cutoff_wfc'])
-            cutoffs_rho.append(values['cutoff_rho'])
+        if isinstance(structure, (list, tuple)) and all(isinstance(symbol, str) for symbol in structure):
+            return [(symbol, symbol) for symbol in structure]
 
-        return (max(cutoffs_wfc), max(cutoffs_rho))
+        raise TypeError('unsupported structure type `{}`'.format(type(structure)))
+
+    @classmethod
+    def _get_symbols_set(cls, structure):
+        """Return the set of elements of the given structure.
+
+        The result for stored structures, which are immutable, is cached on their UUID.
+
+        :param structure: a `StructureData` node
+        :return: frozenset of element symbols
+        """
+        if not structure.is_stored:
+            return frozenset(structure.get_symbols_set())
+
+        symbols = cls._symbols_cache.get(structure.uuid)
+
+        if symbols is None:
+            symbols = frozenset(structure.get_symbols_set())
+            cls._symbols_cache.set(structure.uuid, symbols)
+
+        return symbols
+
+    @classmethod
+    def get_cache_info(cls):
+        """Return the statistics of the caches used by `get_cutoffs`.
+
+        :return: dictionary with the `CacheInfo` of the `cutoffs` cache, keyed on the family, its parameters and the set
+            of elements, and the `symbols` cache, keyed on the UUID of stored structures.
+        """
+        return {'cutoffs': cls._cutoffs_cache.info(), 'symbols': cls._symbols_cache.info()}
+
+    @classmethod
+    def clear_caches(cls):
+        """Clear the caches used by `get_cutoffs` and reset their statistics."""
+        cls._cutoffs_cache.clear()
+        cls._symbols_cache.clear()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to look up its pseudos through lightweight handles that load their node on access."""
+from aiida.orm import QueryBuilder
+
+__all__ = ('PseudoHandle', 'HandlesMixin')
+
+
+class PseudoHandle:
+    """Lightweight reference to a stored `UpfData` that only loads the node itself when it is accessed.
+
+    The identifiers and the attributes that are commonly needed are available directly, such that a handle can be used
+    in place of the node for most lookups. Use the `node` property where the actual `UpfData` is required, for example
+    as input for a process builder.
+    """
+
+    __slots__ = ('pk', 'uuid', 'element', 'filename', 'md5', '_node')
+
+    def __init__(self, pk, uuid, element, filename, md5, node=None):  # pylint: disable=too-many-arguments
+        """Construct a new handle.
+
+        :param pk: the PK of the `UpfData`.
+        :param uuid: the UUID of the `UpfData`.
+        :param element: the element of the `UpfData`.
+        :param filename: the filename of the `UpfData`.
+        :param md5: the md5 checksum of the `UpfData`.
+        :param node: optional `UpfData` node if it is already loaded.
+        """
+        self.pk = pk  # pylint: disable=invalid-name
+        self.uuid = uuid
+        self.element = element
+        self.filename = filename
+        self.md5 = md5
+        self._node = node
+
+    @classmethod
+    def from_node(cls, node):
+        """Construct a handle for an already loaded `UpfData` node.
+
+        :param node: a stored `UpfData` node.
+        :return: `PseudoHandle`
+        """
+        return cls(node.pk, node.uuid, node.element, node.filename, node.md5sum, node)
+
+    def __repr__(self):
+        """Represent the instance for debugging purposes."""
+        return '{}<{}:{}>'.format(self.__class__.__name__, self.element, self.pk)
+
+    def __eq__(self, other):
+        """Return whether the other handle refers to the same node."""
+        return isinstance(other, PseudoHandle) and other.uuid == self.uuid
+
+    def __hash__(self):
+        """Return the hash of the referenced node."""
+        return hash(self.uuid)
+
+    @property
+    def md5sum(self):
+        """Return the md5 checksum of the `UpfData`, with the same name as the attribute of the node."""
+        return self.md5
+
+    @property
+    def is_loaded(self):
+        """Return whether the `UpfData` node has been loaded."""
+        return self._node is not None
+
+    @property
+    def node(self):
+        """Return the `UpfData` node, loading it on first access.
+
+        :return: the `UpfData` node
+        """
+        if self._node is None:
+            from aiida.orm import load_node
+            self._node = load_node(self.pk)
+
+        return self._node
+
+
+class HandlesMixin:  # pylint: disable=too-few-public-methods
+    """Mixin to return a `PseudoHandle` instead of a `UpfData` for the pseudos of a family.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    _node_types = ()
+    _pseudos = None
+
+    def _check_elements(self, elements, available):
+        """Check that the pseudos of all the given elements are available."""
+        raise NotImplementedError
+
+    def _load_handles(self, elements):
+        """Return a `PseudoHandle` for each of the given elements without loading any `UpfData` that is not yet loaded.
+
+        The handles of the elements whose `UpfData` is not yet loaded are filled from a single projection query on the
+        group membership, which neither reads nor writes the snapshot of the family.
+
+        :param elements: iterable of element symbols
+        :return: dictionary of element symbol mapping `PseudoHandle`
+        :raises ValueError: if the family does not contain a `UpfData` for any of the given elements
+        """
+        elements = set(elements)
+        loaded = self._pseudos or {}
+        handles = {element: PseudoHandle.from_node(loaded[element]) for element in elements if element in loaded}
+        missing = elements - set(handles)
+
+        if missing:
+            handles.update(self._query_handles(self.pk, missing))
+            self._check_elements(elements, handles)
+
+        return handles
+
+    @classmethod
+    def _query_handles(cls, pk, elements):
+        """Query a `PseudoHandle` for the given elements of a family through a single projection on its membership.
+
+        Only plain values are passed to and returned from this method, such that it can be called on a thread other
+        than the one that loaded the family: the handles that are returned do not reference any `UpfData` node.
+
+        :param pk: the PK of the family
+        :param elements: iterable of element symbols
+        :return: dictionary of element symbol mapping `PseudoHandle`, omitting the elements that are not in the family
+        """
+        filters = {'attributes.element': {'in': list(elements)}}
+        projections = ['id', 'uuid', 'attributes.element', 'attributes.filename', 'attributes.md5']
+        builder = QueryBuilder().append(
+            cls, filters={'id': pk}, tag='group').append(
+            cls._node_types, filters=filters, with_group='group', project=projections)  # yapf:disable
+
+        return {values[2]: PseudoHandle(*values) for values in builder.iterall()}
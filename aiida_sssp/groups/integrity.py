@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to verify the integrity of the files of its pseudos."""
+import collections
+import os
+
+from aiida.common import exceptions
+from aiida.plugins import DataFactory
+
+__all__ = ('IntegrityMixin',)
+
+UpfData = DataFactory('upf')
+
+Mismatch = collections.namedtuple('Mismatch', ('element', 'key', 'expected', 'actual'))
+Mismatch.__doc__ = """Discrepancy between the pseudos of an `SsspFamily` and the metadata of its parameters."""
+
+
+class IntegrityMixin:
+    """Mixin to verify the files of the pseudos of a family against the metadata of its parameters and to repair them.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    @property
+    def pseudos(self):
+        """Return the dictionary of element mapping the `UpfData` of each pseudo of the family."""
+        raise NotImplementedError
+
+    def get_parameters_node(self):
+        """Return the associated `SsspParameters` node."""
+        raise NotImplementedError
+
+    def add_nodes(self, nodes):
+        """Add the given `UpfData` nodes to the family."""
+        raise NotImplementedError
+
+    def remove_nodes(self, nodes):
+        """Remove the given `UpfData` nodes from the family."""
+        raise NotImplementedError
+
+    def _get_records(self):
+        """Return the metadata records against which the pseudos of this family should be verified.
+
+        :return: the `records` of the associated `SsspParameters` or, if the family does not have associated parameters,
+            a mapping of element onto `ElementMetadata` constructed from the attributes of the pseudos themselves.
+        """
+        from aiida_sssp.data import ElementMetadata
+
+        try:
+            return self.get_parameters_node().records
+        except exceptions.NotExistent:
+            return {
+                element: ElementMetadata(upf.filename, upf.md5sum, None, None) for element, upf in self.pseudos.items()
+            }
+
+    def verify(self, executor=None):
+        """Verify that the stored files of the pseudos match the filenames and md5 checksums of the parameters.
+
+        The content of every file is streamed from the repository through md5 on a pool of threads. If the family does
+        not have associated parameters, the checksums are compared to the `md5` attribute of the nodes instead.
+
+        :param executor: optional `concurrent.futures.Executor` to compute the checksums, by default a new thread pool
+        :return: list of `Mismatch` named tuples, where `key` is one of `element`, `filename` or `md5`. For elements
+            missing from either the pseudos or the parameters, `actual` and `expected` are `None`, respectively.
+        """
+        # pylint: disable=too-many-locals
+        from concurrent.futures import ThreadPoolExecutor
+        from aiida.common.files import md5_from_filelike
+
+        def compute_md5(upf, filename):
+            with upf.open(filename, mode='rb') as handle:
+                return md5_from_filelike(handle)
+
+        pseudos = self.pseudos
+        records = self._get_records()
+        mismatches = [Mismatch(element, 'element', element, None) for element in sorted(set(records) - set(pseudos))]
+        mismatches += [Mismatch(element, 'element', None, element) for element in sorted(set(pseudos) - set(records))]
+
+        elements = sorted(set(records) & set(pseudos))
+        filenames = [pseudos[element].filename for element in elements]
+
+        if executor is None:
+            with ThreadPoolExecutor() as pool:
+                checksums = list(pool.map(compute_md5, [pseudos[element] for element in elements], filenames))
+        else:
+            checksums = list(executor.map(compute_md5, [pseudos[element] for element in elements], filenames))
+
+        for element, filename, md5 in zip(elements, filenames, checksums):
+            record = records[element]
+
+            if record.filename != filename:
+                mismatches.append(Mismatch(element, 'filename', record.filename, filename))
+
+            if record.md5 != md5:
+                mismatches.append(Mismatch(element, 'md5', record.md5, md5))
+
+        return mismatches
+
+    def repair(self, dirpath, elements=None):
+        """Replace the pseudos of the given elements by freshly parsed ones from the UPF files in a directory.
+
+        The file for each element is looked up in `dirpath` through the filename of its metadata and should match its
+        md5 checksum. All files are parsed, validated and stored before the family is modified and all other pseudos
+        are left untouched. If the replacements cannot be added, the original pseudos are restored.
+
+        :param dirpath: absolute path to a directory containing the UPF files, for example an unpacked SSSP archive.
+        :param elements: optional iterable of elements to replace, by default all elements for which `verify` reports
+            a mismatch and that are defined in the metadata.
+        :return: sorted list of the elements whose pseudo was replaced
+        :raises ValueError: if a file is missing, cannot be parsed or does not match the metadata of its element
+        """
+        from aiida.common.exceptions import ParsingError
+
+        records = self._get_records()
+
+        if elements is None:
+            elements = {mismatch.element for mismatch in self.verify() if mismatch.expected is not None}
+
+        replacements = {}
+
+        for element in sorted(elements):
+            try:
+                record = records[element]
+            except KeyError:
+                raise ValueError('family `{}` does not define metadata for element `{}`'.format(self.label, element))
+
+            filepath = os.path.join(dirpath, record.filename)
+
+            try:
+                upf = UpfData(filepath)
+            except (OSError, ParsingError) as exception:
+                raise ValueError('failed to parse `{}`: {}'.format(filepath, exception))
+
+            if upf.element != element or upf.md5sum != record.md5:
+                raise ValueError('`{}` does not match the metadata of element `{}`'.format(filepath, element))
+
+            replacements[element] = upf
+
+        if not replacements:
+            return []
+
+        stored = [upf.store() for upf in replacements.values()]
+        existing = self.pseudos
+        corrupt = [existing[element] for element in replacements if element in existing]
+
+        if corrupt:
+            self.remove_nodes(corrupt)
+
+        try:
+            self.add_nodes(stored)
+        except Exception:
+            if corrupt:
+                self.add_nodes(corrupt)
+            raise
+
+        return sorted(replacements)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to search the database for stored pseudos and the families that contain them."""
+from aiida.common.lang import type_check
+from aiida.orm import QueryBuilder
+from aiida.plugins import DataFactory
+
+__all__ = ('SearchMixin',)
+
+UpfData = DataFactory('upf')
+
+
+class SearchMixin:
+    """Mixin with class methods that look up stored `UpfData` nodes through their attributes."""
+
+    @classmethod
+    def find_pseudos(cls, checksums):
+        """Return the stored `UpfData` nodes that have the given filenames and md5 checksums.
+
+        All nodes are retrieved with a single query. If multiple nodes match the same filename and md5 checksum, the one
+        that was stored first is returned.
+
+        :param checksums: dictionary of filename onto md5 checksum
+        :return: dictionary of filename onto stored `UpfData`, filenames without a matching node are omitted
+        """
+        if not checksums:
+            return {}
+
+        pseudos = {}
+        filters = {'attributes.md5': {'in': sorted(set(checksums.values()))}}
+        builder = QueryBuilder().append(UpfData, filters=filters).order_by({UpfData: {'id': 'asc'}})
+
+        for [upf] in builder.iterall():
+            if checksums.get(upf.filename, None) == upf.md5sum:
+                pseudos.setdefault(upf.filename, upf)
+
+        return pseudos
+
+    @classmethod
+    def find_families(cls, pseudo):
+        """Return the families that contain the given pseudo or any pseudo with the given md5 checksum.
+
+        The families are retrieved with a single query that joins the group membership on the pseudos.
+
+        :param pseudo: a stored `UpfData` node or a md5 checksum.
+        :return: list of `SsspFamily` sorted by label
+        """
+        type_check(pseudo, (UpfData, str))
+
+        if isinstance(pseudo, UpfData):
+            filters = {'id': pseudo.pk}
+        else:
+            filters = {'attributes.md5': pseudo}
+
+        builder = QueryBuilder().append(UpfData, filters=filters, tag='pseudo')
+        builder.append(cls, with_node='pseudo', project='*', tag='family')
+        builder.order_by({'family': {'label': 'asc'}}).distinct()
+
+        return builder.all(flat=True)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to persist snapshots of its lookup tables in the local cache."""
+import os
+
+from aiida.common import exceptions
+from aiida.orm import QueryBuilder
+
+__all__ = ('SnapshotMixin',)
+
+
+class SnapshotMixin:
+    """Mixin to save and load a snapshot of the pseudos and parameters of a family, from which lookups can be answered.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below and that sets a
+    reentrant lock as the `_lock` attribute of each instance, which guards the `_snapshot` cache.
+    """
+
+    KEY_PARAMETERS_UUID = None
+
+    _node_types = ()
+    _parameters_node = None
+    _snapshot = None
+
+    @property
+    def element_index(self):
+        """Return the mapping of element onto the UUID of its pseudo or `None` if the family is not indexed."""
+        raise NotImplementedError
+
+    def _resolve_parameters_node(self):
+        """Load the associated `SsspParameters` node without caching it on the instance."""
+        raise NotImplementedError
+
+    def _get_parameters_uuid(self):
+        """Return the UUID of the associated `SsspParameters` node or `None` if it is not referenced."""
+        raise NotImplementedError
+
+    def _get_snapshot_stamp(self):
+        """Return the stamp that identifies the current state of the lookup tables of this family.
+
+        :return: md5 checksum of the element index and parameters reference, or `None` if the family is not indexed.
+        """
+        import hashlib
+        import json
+
+        index = self.element_index
+
+        if index is None:
+            return None
+
+        content = json.dumps([index, self.get_extra(self.KEY_PARAMETERS_UUID, None)], sort_keys=True)
+
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    def _get_snapshot_filepath(self):
+        """Return the filepath of the snapshot of this family in the local cache, which is namespaced per profile.
+
+        :return: absolute filepath, which may not exist.
+        """
+        from aiida.manage.configuration import get_profile
+        from aiida_sssp.common import get_cache_directory
+
+        return os.path.join(get_cache_directory('snapshots', get_profile().name), '{}.json'.format(self.uuid))
+
+    def save_snapshot(self):
+        """Write a snapshot of the lookup tables of this family to the local cache.
+
+        The snapshot contains the PK, filename and md5 checksum of the pseudo of each element and the metadata of the
+        associated `SsspParameters`, including the recommended cutoffs. It is stamped with the element index and the
+        parameters reference of the family, such that it is ignored as soon as the family is modified.
+
+        :return: the snapshot, which is a dictionary with the `pseudos`, mapping each element onto a list of PK,
+            filename and md5, the `parameters`, mapping each element onto its metadata, and the `parameters_uuid` of
+            the node they were taken from. The latter two are `None` if the family does not have associated parameters.
+            Returns `None` if the family is not stored or not indexed.
+        """
+        from aiida_sssp.common import write_snapshot
+
+        if not self.is_stored or self.element_index is None:
+            return None
+
+        # Hold the lock, such that the snapshot cannot be published after a concurrent modification invalidated it
+        with self._lock:
+            try:
+                node = self._parameters_node or self._resolve_parameters_node()
+            except exceptions.NotExistent:
+                parameters, parameters_uuid = None, None
+            else:
+                parameters, parameters_uuid = node.get_metadata(), node.uuid
+
+            # Only determine the stamp now, since resolving the parameters can update the reference in the extras
+            stamp = self._get_snapshot_stamp()
+            filters = {'uuid': {'in': list(self.element_index.values())}}
+            projections = ['attributes.element', 'id', 'attributes.filename', 'attributes.md5']
+            builder = QueryBuilder().append(self._node_types, filters=filters, project=projections)
+
+            snapshot = {
+                'pseudos': {element: [pk, filename, md5] for element, pk, filename, md5 in builder.iterall()},
+                'parameters': parameters,
+                'parameters_uuid': parameters_uuid,
+            }
+            write_snapshot(self._get_snapshot_filepath(), stamp, snapshot)
+            self._snapshot = snapshot
+
+        return snapshot
+
+    def load_snapshot(self):
+        """Return the snapshot of the lookup tables of this family from the local cache, if it is still valid.
+
+        :return: the snapshot as returned by `save_snapshot` or `None` if there is no valid snapshot.
+        """
+        from aiida_sssp.common import read_snapshot
+
+        stamp = self._get_snapshot_stamp() if self.is_stored else None
+
+        if stamp is None:
+            return None
+
+        return read_snapshot(self._get_snapshot_filepath(), stamp)
+
+    def _get_snapshot(self):
+        """Return the snapshot of the lookup tables of this family, loading it from the local cache if necessary.
+
+        The snapshot is never created here, which is left to an explicit call of `save_snapshot`, such that lookups
+        never write to the local cache. The outcome of loading the snapshot, including its absence, is cached on the
+        instance until the family is modified.
+
+        :return: the snapshot as returned by `save_snapshot` or `None` if there is no valid snapshot.
+        """
+        snapshot = self._snapshot
+
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self.load_snapshot() or {}
+                snapshot = self._snapshot
+
+        return snapshot or None
+
+    def _is_snapshot_current(self, snapshot):
+        """Return whether the parameters of the snapshot were taken from the parameters node of this instance.
+
+        :param snapshot: the snapshot as returned by `save_snapshot` or `None`.
+        :return: boolean, False if there is no snapshot or it does not contain parameters.
+        """
+        if snapshot is None or snapshot['parameters'] is None:
+            return False
+
+        return snapshot.get('parameters_uuid', None) == self._get_parameters_uuid()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to write the files of its pseudos to the local file system."""
+import os
+
+__all__ = ('StagingMixin',)
+
+
+class StagingMixin:
+    """Mixin to materialize the files of the pseudos of a family and to stage them in a directory.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    @property
+    def pseudos(self):
+        """Return the dictionary of element mapping the `UpfData` of each pseudo of the family."""
+        raise NotImplementedError
+
+    def _load_pseudos(self, elements):
+        """Return the dictionary of element mapping the `UpfData` of the given elements."""
+        raise NotImplementedError
+
+    def get_pseudos(self, structure, lazy=False):
+        """Return the dictionary of kind name mapping the `UpfData` of the kinds of the given structure."""
+        raise NotImplementedError
+
+    def materialize(self, elements=None, dirpath=None):
+        """Write the files of the pseudos of this family to a local content addressed store.
+
+        Each file is stored under its md5 checksum, so it is only written once, regardless of how many families contain
+        it or how many times this method is called.
+
+        :param elements: optional iterable of elements to materialize, by default all elements of the family
+        :param dirpath: optional absolute path of the store, by default the `pseudos` directory of the local cache
+        :return: dictionary of element mapping the absolute filepath of its file in the store
+        :raises ValueError: if the content of a stored pseudo no longer matches its md5 checksum
+        """
+        from aiida_sssp.common import get_cache_directory, store_content_addressed
+
+        if dirpath is None:
+            dirpath = get_cache_directory('pseudos')
+
+        pseudos = self.pseudos if elements is None else self._load_pseudos(elements)
+        filepaths = {}
+
+        for element, upf in pseudos.items():
+            with upf.open(mode='rb') as handle:
+                filepaths[element] = store_content_addressed(handle, upf.md5sum, dirpath)
+
+        return filepaths
+
+    def stage_pseudos(self, structure, dirpath, method='hardlink', dirpath_store=None):
+        """Make the pseudos for the given structure available in a directory without copying them where possible.
+
+        The pseudos are first materialized in the local content addressed store, after which each file is linked into
+        `dirpath` under its original filename. If linking fails, for example because the target is on a different file
+        system, the file is copied instead.
+
+        :param structure: the `StructureData` for which to stage the pseudos.
+        :param dirpath: absolute path of the directory in which to stage the files.
+        :param method: one of `hardlink`, `symlink` or `copy`.
+        :param dirpath_store: optional absolute path of the store, by default the `pseudos` directory of the local cache
+        :return: dictionary of element mapping the absolute filepath of the staged file
+        :raises ValueError: if the family does not contain a `UpfData` for any of the elements of the given structure.
+        """
+        from aiida_sssp.common import link_or_copy
+
+        pseudos = {upf.element: upf for upf in self.get_pseudos(structure).values()}
+        sources = self.materialize(pseudos.keys(), dirpath_store)
+        targets = {}
+
+        for element, upf in pseudos.items():
+            targets[element] = os.path.join(dirpath, upf.filename)
+            link_or_copy(sources[element], targets[element], method)
+
+        return targets
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Mixin of `SsspFamily` to process all the structures in a group at once."""
+from aiida.common.lang import type_check
+from aiida.orm import Group, QueryBuilder
+from aiida.plugins import DataFactory
+
+from .snapshot import SnapshotMixin
+
+__all__ = ('StructuresMixin',)
+
+StructureData = DataFactory('structure')
+
+
+class StructuresMixin(SnapshotMixin):
+    """Mixin to check and compute the data of a family for the structures in a group, without loading the structures.
+
+    The mixin is meant for a `Group` subclass that provides the attributes that are declared below.
+    """
+
+    @property
+    def elements(self):
+        """Return the list of elements of the `UpfData` nodes contained in this family."""
+        raise NotImplementedError
+
+    @property
+    def parameters(self):
+        """Return the attributes of the associated `SsspParameters` node if it exists."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _iterate_structure_symbols(group, batch_size=1000):
+        """Iterate over the `StructureData` nodes in the given group, yielding their PK and set of element symbols.
+
+        Only the PK and the `kinds` attribute of the structures are projected and the results are streamed in batches,
+        such that no `StructureData` node is ever constructed.
+
+        :param group: the `Group` containing the structures, any other nodes in the group are ignored.
+        :param batch_size: the number of rows that are fetched from the database at once.
+        :return: generator of tuples of PK and frozenset of element symbols
+        """
+        builder = QueryBuilder().append(
+            Group, filters={'id': group.pk}, tag='group').append(
+            StructureData, with_group='group', project=['id', 'attributes.kinds'])  # yapf:disable
+
+        for pk, kinds in builder.iterall(batch_size=batch_size):
+            yield pk, frozenset(symbol for kind in kinds or [] for symbol in kind['symbols'])
+
+    def check_coverage(self, group, batch_size=1000):
+        """Return the structures of the given group that contain elements for which this family has no pseudo.
+
+        The element symbols of all structures are streamed from the database with a projection query and structures
+        with the same set of elements are only checked once.
+
+        :param group: the `Group` containing the structures, any other nodes in the group are ignored.
+        :param batch_size: the number of rows that are fetched from the database at once.
+        :return: dictionary of PK of each structure that is not covered onto the sorted list of its missing elements
+        """
+        type_check(group, Group)
+
+        elements = frozenset(self.elements)
+        missing = {}
+        uncovered = {}
+
+        for pk, symbols in self._iterate_structure_symbols(group, batch_size):
+            try:
+                difference = missing[symbols]
+            except KeyError:
+                difference = missing[symbols] = sorted(symbols - elements)
+
+            if difference:
+                uncovered[pk] = difference
+
+        return uncovered
+
+    def get_cutoffs_for_group(self, group, batch_size=1000):
+        """Return the recommended cutoffs for each of the structures in the given group.
+
+        The element symbols of the structures are streamed from the database with a projection query in batches. The
+        cutoffs of each batch are computed at once as the maximum over a mask of the elements of each structure.
+
+        :param group: the `Group` containing the structures, any other nodes in the group are ignored.
+        :param batch_size: the number of rows that are fetched from the database and processed at once.
+        :return: tuple of a one-dimensional array with the PKs of the structures and a two-dimensional array with the
+            recommended wavefunction and density cutoff of each structure. The cutoffs are NaN for structures that
+            contain an element for which the family does not define cutoffs.
+        :raises: `aiida.common.exceptions.NotExistent` if the family does not have associated parameters
+        """
+        # pylint: disable=too-many-locals
+        import numpy
+
+        type_check(group, Group)
+
+        snapshot = self._get_snapshot()
+
+        if self._is_snapshot_current(snapshot):
+            parameters = snapshot['parameters']
+        else:
+            parameters = self.parameters
+
+        elements = sorted(element for element, values in parameters.items() if isinstance(values, dict))
+        columns = {element: column for column, element in enumerate(elements)}
+        table = numpy.zeros((len(elements), 2))
+
+        for column, element in enumerate(elements):
+            table[column] = (parameters[element]['cutoff_wfc'], parameters[element]['cutoff_rho'])
+
+        def compute(symbols):
+            # The last column of the mask flags elements that are not defined.
+            mask = numpy.zeros((len(symbols), len(elements) + 1), dtype=bool)
+
+            for row, structure_symbols in enumerate(symbols):
+                mask[row, [columns.get(symbol, len(elements)) for symbol in structure_symbols]] = True
+
+            maxima = [
+                numpy.where(mask[:, :-1], table[:, column], -numpy.inf).max(axis=1, initial=-numpy.inf)
+                for column in (0, 1)
+            ]
+            cutoffs = numpy.stack(maxima, axis=1)
+            cutoffs[mask[:, -1] | ~mask.any(axis=1)] = numpy.nan
+
+            return cutoffs
+
+        pks = []
+        symbols = []
+        batches = [numpy.empty((0, 2))]
+
+        for pk, structure_symbols in self._iterate_structure_symbols(group, batch_size):
+            pks.append(pk)
+            symbols.append(structure_symbols)
+
+            if len(symbols) == batch_size:
+                batches.append(compute(symbols))
+                symbols = []
+
+        if symbols:
+            batches.append(compute(symbols))
+
+        return numpy.array(pks, dtype=numpy.int64), numpy.concatenate(batches)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the commands `aiida-sssp export` and `aiida-sssp import`."""
+from aiida_sssp.cli import cmd_export, cmd_import
+from aiida_sssp.groups import SsspFamily
+
+
+def test_export_import(clear_db, run_cli_command, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp export` and `aiida-sssp import` commands."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP/1.0', filepath_parameters=sssp_parameter_filepath)
+    filepath = str(tmp_path / 'bundle.zip')
+
+    result = run_cli_command(cmd_export, [family.label, filepath])
+    assert 'exported `SSSP/1.0`' in result.output
+
+    result = run_cli_command(cmd_export, [family.label, filepath], raises=SystemExit)
+    assert 'use `--force` to overwrite it' in result.output
+
+    run_cli_command(cmd_export, [family.label, filepath, '--force'])
+
+    result = run_cli_command(cmd_import, [filepath], raises=SystemExit)
+    assert 'already exists' in result.output
+
+    result = run_cli_command(cmd_import, [filepath, '--label', 'SSSP/copy'])
+    assert 'imported `SSSP/copy` containing 3 pseudo potentials' in result.output
+    assert SsspFamily.objects.get(label='SSSP/copy').element_index == family.element_index
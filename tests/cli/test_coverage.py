@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp coverage`."""
+from aiida import orm
+
+from aiida_sssp.cli import cmd_coverage
+
+
+def test_coverage(clear_db, run_cli_command, create_sssp_family, create_structure):
+    """Test the `aiida-sssp coverage` command."""
+    family = create_sssp_family()
+    group = orm.Group('structures').store()
+    group.add_nodes([create_structure(site_kind_names=['Ar', 'He']).store()])
+
+    result = run_cli_command(cmd_coverage, [family.label, '--group', group.label])
+    assert 'all structures of `structures` are covered by `{}`'.format(family.label) in result.output
+
+    structure = create_structure(site_kind_names=['Kr', 'Br', 'He']).store()
+    group.add_nodes([structure])
+
+    result = run_cli_command(cmd_coverage, [family.label, '--group', group.label, '--raw'], raises=SystemExit)
+    assert '{}  Br, Kr'.format(structure.pk) in result.output_lines
+    assert '1 structures of `structures` are not covered by `{}`'.format(family.label) in result.output
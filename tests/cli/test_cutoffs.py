@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp cutoffs`."""
+import numpy
+
+from aiida import orm
+
+from aiida_sssp.cli import cmd_cutoffs
+
+
+def test_cutoffs(clear_db, run_cli_command, tmp_path, create_sssp_family, create_sssp_parameters, create_structure):
+    """Test the `aiida-sssp cutoffs` command."""
+    family = create_sssp_family()
+    group = orm.Group('structures').store()
+    structure = create_structure(site_kind_names=['Ar', 'He']).store()
+    group.add_nodes([structure])
+
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label], raises=SystemExit)
+    assert 'does not have an associated `SsspParameters` node' in result.output
+
+    create_sssp_parameters(uuid=family.uuid).store()
+
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label])
+    assert result.output_lines == ['pk,cutoff_wfc,cutoff_rho', '{},20.0,80.0'.format(structure.pk)]
+
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label, '--format', 'npy'], raises=SystemExit)
+    assert 'the `npy` format requires an output file' in result.output
+
+    filepath = str(tmp_path / 'cutoffs.npy')
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label, '--output', filepath])
+    assert 'wrote the cutoffs of 1 structures' in result.output
+    assert numpy.load(filepath).tolist() == [[structure.pk, 20.0, 80.0]]
+
+    filepath = str(tmp_path / 'cutoffs.csv')
+    group.add_nodes([create_structure(site_kind_names=['Br']).store()])
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label, '--output', filepath])
+    assert '1 structures contain elements that are not defined' in result.output
+
+    with open(filepath) as handle:
+        assert handle.readline() == 'pk,cutoff_wfc,cutoff_rho\n'
+        assert len(handle.readlines()) == 2
+
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label])
+    assert '1 structures contain elements that are not defined' in result.output
+    assert len([line for line in result.output_lines if line.startswith('{},'.format(structure.pk))]) == 1
+
+    # The NPY format is written to the output file as given, even without the `.npy` extension
+    filepath = str(tmp_path / 'cutoffs.dat')
+    result = run_cli_command(cmd_cutoffs, [family.label, '--group', group.label, '--output', filepath, '-f', 'npy'])
+    assert 'to `{}`'.format(filepath) in result.output
+    assert numpy.load(filepath).shape == (2, 3)
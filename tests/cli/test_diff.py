@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp diff`."""
+import os
+import shutil
+
+from aiida_sssp.cli import cmd_diff
+from aiida_sssp.groups import SsspFamily
+
+
+def test_diff(clear_db, run_cli_command, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp diff` command."""
+    family_a = SsspFamily.create_from_folder(filepath_pseudos, 'A', filepath_parameters=sssp_parameter_filepath)
+
+    result = run_cli_command(cmd_diff, [family_a.label, family_a.label])
+    assert '`A` and `A` are identical' in result.output
+
+    dirpath = str(tmp_path / 'pseudos')
+    shutil.copytree(filepath_pseudos, dirpath)
+    os.remove(os.path.join(dirpath, 'Ne.upf'))
+
+    with open(os.path.join(dirpath, 'He.upf'), 'a') as handle:
+        handle.write('\n')
+
+    family_b = SsspFamily.create_from_folder(dirpath, 'B')
+
+    result = run_cli_command(cmd_diff, [family_a.label, family_b.label, '--raw'])
+    assert [line.split()[:2] for line in result.output_lines] == [['He', 'changed'], ['Ne', 'removed']]
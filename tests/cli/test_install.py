@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=unused-argument
 """Tests for the command `aiida-sssp install`."""
+import os
+import shutil
+import tarfile
+
 from aiida import orm
-from aiida_sssp.cli import cmd_install
+from aiida_sssp.cli import cmd_install, cmd_install_folder
+from aiida_sssp.cli.utils import write_mirror_index
 
 
-def test_install(clear_db, run_cli_command):
+def test_install(clear_db, run_cli_command, tmp_path, monkeypatch):
     """Test the `aiida-sssp install` command."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path))
     from aiida_sssp import __version__
     from aiida_sssp.data import SsspParameters
     from aiida_sssp.groups import SsspFamily
@@ -26,3 +32,139 @@ def test_install(clear_db, run_cli_command):
 
     result = run_cli_command(cmd_install, raises=SystemExit)
     assert 'is already installed' in result.output
+
+    # The downloaded files should have been cached, together with their cache entries
+    filenames = os.listdir(str(tmp_path / 'downloads'))
+    assert len(filenames) == 4
+
+    for suffix in ('SSSP_1.1_PBE_efficiency.json', 'SSSP_1.1_PBE_efficiency.tar.gz'):
+        assert len([filename for filename in filenames if filename.endswith(suffix)]) == 1
+
+
+def test_install_archive(clear_db, run_cli_command, tmp_path, monkeypatch, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp install --archive` option."""
+    from aiida.common.files import md5_file
+    from aiida_sssp.groups import SsspFamily
+
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path / 'cache'))
+
+    filepath_archive = str(tmp_path / 'archive.tar.gz')
+
+    with tarfile.open(filepath_archive, 'w:gz') as tar:
+        tar.add(filepath_pseudos, arcname='.')
+
+    result = run_cli_command(cmd_install, ['--metadata', sssp_parameter_filepath], raises=SystemExit)
+    assert 'the `--metadata` option can only be used in combination with `--archive`' in result.output
+
+    options = ['--archive', filepath_archive, '--metadata', sssp_parameter_filepath, '-v', '1.0']
+    result = run_cli_command(cmd_install, options)
+    assert 'installed `SSSP/1.0/PBE/efficiency` containing 3 pseudo potentials' in result.output
+    assert 'MB/s' in result.output
+
+    family = orm.QueryBuilder().append(SsspFamily).one()[0]
+    assert 'Archive pseudos md5: {}'.format(md5_file(filepath_archive)) in family.description
+    assert 'Pseudo metadata md5: {}'.format(md5_file(sssp_parameter_filepath)) in family.description
+    assert family.get_parameters_node().family_uuid == family.uuid
+
+    # The snapshot of the family should have been written
+    assert family.load_snapshot() is not None
+
+
+def test_install_dry_run(clear_db, run_cli_command, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp install --dry-run` option."""
+    from aiida_sssp.groups import SsspFamily
+
+    filepath_archive = str(tmp_path / 'archive.tar.gz')
+
+    with tarfile.open(filepath_archive, 'w:gz') as tar:
+        tar.add(filepath_pseudos, arcname='.')
+
+    options = ['--archive', filepath_archive, '--metadata', sssp_parameter_filepath, '--deduplicate']
+    result = run_cli_command(cmd_install, options + ['--dry-run'])
+    assert 'download size: 0.00 MB (local archive)' in result.output
+    assert 'pseudos: 3 (3 new, 0 reused)' in result.output
+    assert 'database rows added: 8' in result.output
+    assert 'nothing was written to the profile' in result.output
+    assert orm.QueryBuilder().append(orm.Node).count() == 0
+    assert orm.QueryBuilder().append(SsspFamily).count() == 0
+
+    run_cli_command(cmd_install, options)
+    assert orm.QueryBuilder().append(orm.UpfData).count() == 3
+
+    result = run_cli_command(cmd_install, options + ['-v', '1.0', '--dry-run'])
+    assert 'pseudos: 3 (0 new, 3 reused)' in result.output
+    assert 'repository bytes added: 0.00 MB' in result.output
+
+    run_cli_command(cmd_install, options + ['-v', '1.0'])
+    assert orm.QueryBuilder().append(SsspFamily).count() == 2
+    assert orm.QueryBuilder().append(orm.UpfData).count() == 3
+
+
+def test_install_mirror(clear_db, run_cli_command, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp install --mirror` option."""
+    from aiida.common.files import md5_file
+
+    dirpath = str(tmp_path)
+    archive = os.path.join(dirpath, 'SSSP_1.0_PBE_efficiency.tar.gz')
+    metadata = os.path.join(dirpath, 'SSSP_1.0_PBE_efficiency.json')
+    shutil.copyfile(sssp_parameter_filepath, metadata)
+
+    with tarfile.open(archive, 'w:gz') as tar:
+        tar.add(filepath_pseudos, arcname='.')
+
+    configuration = {
+        'version': '1.0',
+        'functional': 'PBE',
+        'protocol': 'efficiency',
+        'archive': os.path.basename(archive),
+        'metadata': os.path.basename(metadata),
+    }
+    files = {os.path.basename(filepath): md5_file(filepath) for filepath in (archive, metadata)}
+    write_mirror_index(dirpath, files, [configuration])
+
+    result = run_cli_command(cmd_install, ['--mirror', dirpath, '--archive', archive], raises=SystemExit)
+    assert 'the `--mirror` and `--archive` options are mutually exclusive' in result.output
+
+    result = run_cli_command(cmd_install, ['--mirror', dirpath, '-v', '1.1'], raises=SystemExit)
+    assert 'SSSP 1.1 PBE efficiency is not available in the mirror' in result.output
+
+    result = run_cli_command(cmd_install, ['--mirror', dirpath, '-v', '1.0'])
+    assert 'installed `SSSP/1.0/PBE/efficiency` containing 3 pseudo potentials' in result.output
+
+    with open(metadata, 'a') as handle:
+        handle.write('corrupt')
+
+    result = run_cli_command(cmd_install, ['--mirror', dirpath, '-v', '1.0', '-p', 'precision'], raises=SystemExit)
+    assert 'not available in the mirror' in result.output
+
+    configuration['protocol'] = 'precision'
+    write_mirror_index(dirpath, files, [configuration])
+
+    result = run_cli_command(cmd_install, ['--mirror', dirpath, '-v', '1.0', '-p', 'precision'], raises=SystemExit)
+    assert 'is missing or corrupt' in result.output
+
+
+def test_install_folder(clear_db, run_cli_command, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp install-folder` command."""
+    from aiida_sssp.groups import SsspFamily
+
+    dirpath_a = str(tmp_path / 'family_a')
+    dirpath_b = str(tmp_path / 'family_b')
+    shutil.copytree(filepath_pseudos, dirpath_a)
+    shutil.copytree(filepath_pseudos, dirpath_b)
+    shutil.copy(sssp_parameter_filepath, dirpath_b + '.json')
+
+    result = run_cli_command(cmd_install_folder, ['--prefix', 'test/', dirpath_a, dirpath_b])
+    assert 'installed `test/family_a` containing 3 pseudo potentials' in result.output
+    assert 'installed `test/family_b` containing 3 pseudo potentials' in result.output
+
+    family = SsspFamily.objects.get(label='test/family_b')
+    assert family.get_parameters_node().family_uuid == family.uuid
+
+    # Installing again should fail for every directory but still report all of them
+    os.makedirs(str(tmp_path / 'family_c'))
+    options = ['--prefix', 'test/', dirpath_a, str(tmp_path / 'family_c')]
+    result = run_cli_command(cmd_install_folder, options, raises=SystemExit)
+    assert 'failed to install `test/family_a`' in result.output
+    assert 'installed `test/family_c` containing 0 pseudo potentials' in result.output
+    assert 'failed to install 1 of 2 families' in result.output
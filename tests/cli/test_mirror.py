@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument,redefined-outer-name
+"""Tests for the command `aiida-sssp mirror`."""
+import http.server
+import json
+import os
+import shutil
+import socketserver
+import tarfile
+import threading
+
+import pytest
+
+from aiida_sssp.cli import cmd_mirror
+from aiida_sssp.cli.install import URL_MAPPING
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """HTTP server that handles each request in a separate thread."""
+
+    daemon_threads = True
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Serve the files of a temporary directory over HTTP as a stand-in for the SSSP archive.
+
+    :return: tuple of the served directory, the base URL and the list of paths of all GET requests.
+    """
+    dirpath = str(tmp_path / 'server')
+    os.makedirs(dirpath)
+    requests = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        """Handler that serves the files of `dirpath` and records the requests."""
+
+        def translate_path(self, path):
+            return os.path.join(dirpath, path.split('?', 1)[0].lstrip('/'))
+
+        def do_GET(self):
+            requests.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield dirpath, 'http://127.0.0.1:{}/'.format(server.server_address[1]), requests
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def populate_server(http_server, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Populate the served directory with an archive and metadata file for every entry of `URL_MAPPING`."""
+    dirpath, _, _ = http_server
+    filepath_archive = str(tmp_path / 'archive.tar.gz')
+
+    with tarfile.open(filepath_archive, 'w:gz') as tar:
+        tar.add(filepath_pseudos, arcname='.')
+
+    for name in URL_MAPPING.values():
+        shutil.copyfile(filepath_archive, os.path.join(dirpath, name + '.tar.gz'))
+        shutil.copyfile(sssp_parameter_filepath, os.path.join(dirpath, name + '.json'))
+
+    return http_server
+
+
+def test_mirror(run_cli_command, tmp_path, populate_server):
+    """Test the `aiida-sssp mirror` command."""
+    _, url_base, requests = populate_server
+    dirpath = str(tmp_path / 'mirror')
+    options = [dirpath, '--url-base', url_base, '--max-workers', '3']
+
+    result = run_cli_command(cmd_mirror, options)
+    assert 'mirrored {} configurations'.format(len(URL_MAPPING)) in result.output
+    assert len(requests) == 2 * len(URL_MAPPING)
+
+    with open(os.path.join(dirpath, 'index.json')) as handle:
+        index = json.load(handle)
+
+    assert len(index['files']) == 2 * len(URL_MAPPING)
+    assert len(index['configurations']) == len(URL_MAPPING)
+    assert index['url_base'] == url_base
+
+    # Files that are present and valid should not be downloaded again
+    del requests[:]
+    result = run_cli_command(cmd_mirror, options)
+    assert 'is already up to date' in result.output
+    assert requests == []
+
+    # Corrupt files should be downloaded again
+    name = URL_MAPPING[('1.1', 'PBE', 'efficiency')]
+
+    with open(os.path.join(dirpath, name + '.json'), 'a') as handle:
+        handle.write('corrupt')
+
+    run_cli_command(cmd_mirror, options)
+    assert requests == ['/{}.json'.format(name)]
+
+
+def test_mirror_failure(run_cli_command, tmp_path, populate_server):
+    """Test the `aiida-sssp mirror` command when some of the files cannot be downloaded."""
+    dirpath_server, url_base, _ = populate_server
+    dirpath = str(tmp_path / 'mirror')
+    name = URL_MAPPING[('1.1', 'PBE', 'efficiency')]
+    os.remove(os.path.join(dirpath_server, name + '.tar.gz'))
+
+    result = run_cli_command(cmd_mirror, [dirpath, '--url-base', url_base], raises=SystemExit)
+    assert 'failed to download `{}.tar.gz`'.format(name) in result.output
+    assert 'failed to mirror 1 of {} files'.format(2 * len(URL_MAPPING)) in result.output
+
+    with open(os.path.join(dirpath, 'index.json')) as handle:
+        index = json.load(handle)
+
+    assert len(index['configurations']) == len(URL_MAPPING) - 1
+    assert name + '.json' in index['files']
+    assert not os.path.exists(os.path.join(dirpath, name + '.tar.gz'))
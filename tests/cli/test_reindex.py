@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp reindex`."""
+from aiida import orm
+
+from aiida_sssp.cli import cmd_reindex
+from aiida_sssp.groups import SsspFamily
+
+
+def test_reindex(clear_db, run_cli_command, create_sssp_family):
+    """Test the `aiida-sssp reindex` command."""
+    result = run_cli_command(cmd_reindex)
+    assert 'SSSP has not yet been installed' in result.output
+
+    family = create_sssp_family()
+    expected = family.element_index
+    family.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+
+    result = run_cli_command(cmd_reindex, [family.label])
+    assert 'rebuilt the index of `{}` containing 3 pseudo potentials'.format(family.label) in result.output
+    assert orm.load_group(family.pk).element_index == expected
+    assert orm.load_group(family.pk).load_snapshot() is not None
+
+    result = run_cli_command(cmd_reindex)
+    assert family.label in result.output
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp repair`."""
+import io
+import tarfile
+import tempfile
+
+from aiida import orm
+
+from aiida_sssp.cli import cmd_repair
+from aiida_sssp.groups import SsspFamily
+
+
+def test_repair(clear_db, run_cli_command, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `aiida-sssp repair` command."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+
+    result = run_cli_command(cmd_repair, [family.label])
+    assert '`{}` does not contain any corrupt pseudo potentials'.format(family.label) in result.output
+
+    corrupt = family.get_pseudo('Ne')
+    # pylint: disable=protected-access
+    corrupt._repository.put_object_from_filelike(io.StringIO('corrupt'), corrupt.filename, force=True)
+
+    # The label does not correspond to an official SSSP configuration so the archive has to be specified explicitly
+    result = run_cli_command(cmd_repair, [family.label], raises=SystemExit)
+    assert 'is not an official SSSP configuration: use `--archive`' in result.output
+
+    with tempfile.NamedTemporaryFile(suffix='.tar.gz') as filepath_archive:
+
+        with tarfile.open(filepath_archive.name, 'w:gz') as tar:
+            tar.add(filepath_pseudos, arcname='.')
+
+        result = run_cli_command(cmd_repair, ['--archive', filepath_archive.name, family.label])
+
+    assert 'repaired 1 pseudo potentials of `{}`'.format(family.label) in result.output
+    assert orm.load_group(family.pk).verify() == []
@@ -9,7 +9,8 @@ import tempfile
 
 import pytest
 
-from aiida_sssp.cli.utils import attempt, create_family_from_archive
+from aiida_sssp.cli import utils
+from aiida_sssp.cli.utils import attempt, create_family_from_archive, estimate_family_from_archive
 
 
 class ArchiveType(enum.IntEnum):
@@ -85,6 +86,180 @@ def test_create_family_from_archive(clear_db, get_pseudo_archive, sssp_parameter
     assert isinstance(family.get_parameters_node(), SsspParameters)
 
 
+@pytest.mark.parametrize(
+    'get_pseudo_archive', (
+        (ArchiveType.VALID, None, None),
+        (ArchiveType.INVALID_ARCHIVE_FORMAT, OSError, 'failed to unpack the archive'),
+        (ArchiveType.INVALID_ARCHIVE_SUBFOLDER, OSError, 'contains at least one entry that is not a file'),
+        (ArchiveType.INVALID_UPF_FILE, OSError, 'failed to parse'),
+    ),
+    indirect=True
+)
+def test_estimate_family_from_archive(clear_db, get_pseudo_archive, sssp_parameter_filepath):
+    """Test the `estimate_family_from_archive` utility function."""
+    from aiida import orm
+    from aiida_sssp.groups import SsspFamily
+
+    filepath_archive, exception, message = get_pseudo_archive
+
+    if exception is not None:
+        with pytest.raises(exception) as exception:
+            estimate_family_from_archive(filepath_archive)
+        assert message in str(exception.value)
+        return
+
+    estimate = estimate_family_from_archive(filepath_archive, sssp_parameter_filepath, deduplicate=True)
+    assert estimate['pseudos'] == 3
+    assert estimate['new'] == 3
+    assert estimate['reused'] == 0
+    assert estimate['repository_bytes'] > 0
+    assert estimate['database_rows'] == 3 + 1 + 3 + 1
+    assert orm.QueryBuilder().append(orm.Node).count() == 0
+    assert orm.QueryBuilder().append(SsspFamily).count() == 0
+
+    create_family_from_archive('SSSP', filepath_archive, sssp_parameter_filepath)
+
+    estimate = estimate_family_from_archive(filepath_archive, sssp_parameter_filepath, deduplicate=True)
+    assert estimate['new'] == 0
+    assert estimate['reused'] == 3
+    assert estimate['repository_bytes'] == 0
+    assert estimate['database_rows'] == 1 + 3 + 1
+
+    estimate = estimate_family_from_archive(filepath_archive, sssp_parameter_filepath)
+    assert estimate['new'] == 3
+    assert estimate['reused'] == 0
+
+
+def test_get_cached_download(monkeypatch, tmp_path):
+    """Test that `get_cached_download` revalidates cached files against their checksum and the server."""
+    import requests
+
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path))
+
+    downloads = []
+    validators = {'etag': '"1"', 'last_modified': None}
+
+    def download(url, filepath):
+        downloads.append(url)
+
+        with open(filepath, 'w') as handle:
+            handle.write(url + validators['etag'])
+
+    monkeypatch.setattr(utils, 'download', download)
+    monkeypatch.setattr(utils, '_get_validators', lambda url: dict(validators))
+
+    url = 'https://example.com/a/archive.tar.gz'
+    filepath = utils.get_cached_download(url)
+    assert utils.get_cached_download(url) == filepath
+    assert len(downloads) == 1
+
+    # A file with the same name at another URL should have its own cache entry
+    assert utils.get_cached_download('https://example.com/b/archive.tar.gz') != filepath
+    assert len(downloads) == 2
+
+    # A cached file that no longer matches its checksum should be downloaded again
+    with open(filepath, 'a') as handle:
+        handle.write('corrupt')
+
+    assert utils.get_cached_download(url) == filepath
+    assert len(downloads) == 3
+
+    # A change of the content on the server should be downloaded again
+    validators['etag'] = '"2"'
+    assert utils.get_cached_download(url) == filepath
+    assert len(downloads) == 4
+
+    # Content that does not match the expected checksum should be rejected
+    with pytest.raises(ValueError, match=r'does not match the md5 checksum'):
+        utils.get_cached_download(url, md5='0' * 32)
+
+    assert not os.path.isfile(filepath)
+    assert utils.get_cached_download(url) == filepath
+    assert len(downloads) == 6
+
+    # If the server cannot be reached, the cached file should be used
+    def unreachable(url):
+        raise requests.exceptions.ConnectionError()
+
+    monkeypatch.setattr(utils, '_get_validators', unreachable)
+    assert utils.get_cached_download(url) == filepath
+    assert len(downloads) == 6
+
+
+def test_get_download_size(monkeypatch, tmp_path):
+    """Test that `get_download_size` only considers a cached file that `get_cached_download` would reuse."""
+    import requests
+
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path))
+
+    validators = {'etag': '"1"', 'last_modified': None}
+
+    class Response:
+        """Response to a `HEAD` request that reports the size of the content."""
+
+        headers = {'Content-Length': '1024'}
+
+        @staticmethod
+        def raise_for_status():
+            """Do not raise, since the request succeeded."""
+
+    def download(url, filepath):
+        with open(filepath, 'w') as handle:
+            handle.write(url)
+
+    monkeypatch.setattr(utils, 'download', download)
+    monkeypatch.setattr(utils, '_get_validators', lambda url: dict(validators))
+    monkeypatch.setattr(requests, 'head', lambda url, **kwargs: Response())
+
+    url = 'https://example.com/archive.tar.gz'
+    assert utils.get_download_size(url) == (1024, False)
+
+    filepath = utils.get_cached_download(url)
+    assert utils.get_download_size(url) == (0, True)
+
+    # A change of the content on the server invalidates the cached file
+    validators['etag'] = '"2"'
+    assert utils.get_download_size(url) == (1024, False)
+
+    # As does a cached file that no longer matches its checksum
+    validators['etag'] = '"1"'
+    with open(filepath, 'a') as handle:
+        handle.write('corrupt')
+
+    assert utils.get_download_size(url) == (1024, False)
+
+
+def test_get_cached_download_async(monkeypatch, tmp_path, event_loop):
+    """Test that `get_cached_download_async` shares a single download between concurrent requests for the same URL."""
+    import asyncio
+
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path))
+
+    downloads = []
+
+    def download(url, filepath):
+        downloads.append(url)
+
+        with open(filepath, 'w') as handle:
+            handle.write(url)
+
+    monkeypatch.setattr(utils, 'download', download)
+    monkeypatch.setattr(utils, '_get_validators', lambda url: {'etag': None, 'last_modified': None})
+
+    async def download_all():
+        return await asyncio.gather(*[utils.get_cached_download_async(url) for url in urls * 4])
+
+    urls = ['https://example.com/a.tar.gz', 'https://example.com/b.tar.gz']
+    filepaths = event_loop.run_until_complete(download_all())
+
+    assert sorted(downloads) == urls
+    assert filepaths == [utils.get_cached_download(url) for url in urls * 4]
+
+    for url, filepath in zip(urls, filepaths):
+        with open(filepath) as handle:
+            assert handle.read() == url
+
+
 def test_attempt_sucess(capsys):
     """Test the `attempt` utility function."""
     message = 'some message'
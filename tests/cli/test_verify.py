@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp verify`."""
+import copy
+
+from aiida_sssp.cli import cmd_verify
+from aiida_sssp.groups import SsspFamily
+
+
+def test_verify(clear_db, run_cli_command, create_sssp_family, create_sssp_parameters):
+    """Test the `aiida-sssp verify` command."""
+    result = run_cli_command(cmd_verify, raises=SystemExit)
+    assert 'specify at least one SSSP_FAMILY or use `--all`' in result.output
+
+    family = create_sssp_family()
+    create_sssp_parameters(uuid=family.uuid).store()
+
+    result = run_cli_command(cmd_verify, [family.label])
+    assert '`{}`: all 3 pseudo potentials are intact'.format(family.label) in result.output
+
+    result = run_cli_command(cmd_verify, ['--all', '--max-workers', '2'])
+    assert family.label in result.output
+
+
+def test_verify_mismatch(
+    clear_db, run_cli_command, create_sssp_family, create_sssp_parameters, sssp_parameter_metadata
+):
+    """Test the `aiida-sssp verify` command for a family whose pseudos do not match its parameters."""
+    intact = create_sssp_family(label='SSSP/1.0/PBE/efficiency')
+    family = create_sssp_family(label='SSSP/1.1/PBE/efficiency')
+
+    metadata = copy.deepcopy(sssp_parameter_metadata)
+    metadata['Ar']['md5'] = '0' * 32
+    parameters = create_sssp_parameters(parameters=metadata, uuid=family.uuid).store()
+    family.set_extra(SsspFamily.KEY_PARAMETERS_UUID, parameters.uuid)
+
+    result = run_cli_command(cmd_verify, ['--all'], raises=SystemExit)
+    assert '`{}`: all 3 pseudo potentials are intact'.format(intact.label) in result.output
+    assert '`{}`: 1 mismatches'.format(family.label) in result.output
+    assert 'Ar: inconsistent `md5`' in result.output
+    assert 'verification failed for 1 of 2 families' in result.output
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=unused-argument
+"""Tests for the command `aiida-sssp which`."""
+from aiida_sssp.cli import cmd_which
+from aiida_sssp.groups import SsspFamily
+
+
+def test_which(clear_db, run_cli_command, filepath_pseudos, create_structure):
+    """Test the `aiida-sssp which` command."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP/1.0')
+    upf = family.get_pseudo('He')
+
+    result = run_cli_command(cmd_which, [str(upf.pk), '--raw'])
+    assert result.output_lines == ['{}  SSSP/1.0'.format(family.pk)]
+
+    result = run_cli_command(cmd_which, [upf.md5sum.upper(), '--raw'])
+    assert result.output_lines == ['{}  SSSP/1.0'.format(family.pk)]
+
+    result = run_cli_command(cmd_which, ['0' * 32])
+    assert 'no SSSP family contains the pseudo' in result.output
+
+    result = run_cli_command(cmd_which, ['999999'], raises=SystemExit)
+    assert 'is neither a md5 checksum nor a node identifier' in result.output
+
+    structure = create_structure('He').store()
+    result = run_cli_command(cmd_which, [str(structure.pk)], raises=SystemExit)
+    assert 'is not a `UpfData` node' in result.output
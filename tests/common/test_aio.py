@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `aiida_sssp.common.aio` module."""
+import asyncio
+import threading
+
+import pytest
+
+from aiida_sssp.common import get_executor, run_coalesced
+
+
+def test_get_executor():
+    """Test that `get_executor` returns a single shared executor."""
+    assert get_executor() is get_executor()
+
+
+def test_run_coalesced(event_loop):
+    """Test that `run_coalesced` shares a single call between concurrent identical requests."""
+    calls = []
+    release = threading.Event()
+
+    def func(value):
+        calls.append(value)
+        release.wait()
+        return value * 2
+
+    async def run():
+        requests = [run_coalesced(('key', value), func, value) for value in (1, 1, 1, 2)]
+        futures = [asyncio.ensure_future(request) for request in requests]
+
+        # Give the requests the chance to be scheduled before the calls are released
+        await asyncio.sleep(0.1)
+        release.set()
+
+        return await asyncio.gather(*futures)
+
+    assert event_loop.run_until_complete(run()) == [2, 2, 2, 4]
+    assert sorted(calls) == [1, 2]
+
+    # Once the call has completed, a new request schedules a new call
+    assert event_loop.run_until_complete(run_coalesced(('key', 1), func, 1)) == 2
+    assert sorted(calls) == [1, 1, 2]
+
+
+def test_run_coalesced_exception(event_loop):
+    """Test that an exception of a shared call is raised for all requests."""
+    release = threading.Event()
+
+    def func():
+        release.wait()
+        raise ValueError('failure')
+
+    async def run():
+        futures = [asyncio.ensure_future(run_coalesced('key', func)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        release.set()
+
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    results = event_loop.run_until_complete(run())
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_run_coalesced_cancel(event_loop):
+    """Test that cancelling one request does not cancel the call that is shared with other requests."""
+    release = threading.Event()
+
+    def func():
+        release.wait()
+        return 'result'
+
+    async def run():
+        cancelled = asyncio.ensure_future(run_coalesced('key', func))
+        waiting = asyncio.ensure_future(run_coalesced('key', func))
+        await asyncio.sleep(0.1)
+
+        cancelled.cancel()
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        return await waiting
+
+    assert event_loop.run_until_complete(run()) == 'result'
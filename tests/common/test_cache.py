@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `aiida_sssp.common.cache` module."""
+import pytest
+
+from aiida_sssp.common import CacheInfo, LruCache
+
+
+def test_construct():
+    """Test the construction of `LruCache`."""
+    with pytest.raises(ValueError):
+        LruCache(maxsize=0)
+
+    cache = LruCache(maxsize=2)
+    assert len(cache) == 0
+    assert cache.info() == CacheInfo(0, 0, 2, 0)
+
+
+def test_get_set():
+    """Test the `LruCache.get` and `LruCache.set` methods and the statistics they record."""
+    cache = LruCache(maxsize=2)
+
+    assert cache.get('a') is None
+    assert cache.get('a', 'default') == 'default'
+    assert cache.info() == CacheInfo(0, 2, 2, 0)
+
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert 'a' in cache
+    assert cache.info() == CacheInfo(1, 2, 2, 1)
+
+
+def test_eviction():
+    """Test that the least recently used entry is evicted once the cache is full."""
+    cache = LruCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    # Accessing `a` makes `b` the least recently used entry
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+
+def test_discard_clear():
+    """Test the `LruCache.discard` and `LruCache.clear` methods."""
+    cache = LruCache(maxsize=4)
+    cache.set(('x', 1), 1)
+    cache.set(('x', 2), 2)
+    cache.set(('y', 1), 3)
+    cache.get(('x', 1))
+
+    cache.discard(lambda key: key[0] == 'x')
+    assert len(cache) == 1
+    assert ('y', 1) in cache
+
+    cache.clear()
+    assert cache.info() == CacheInfo(0, 0, 4, 0)
+
+
+def test_concurrency():
+    """Test that `LruCache` remains consistent when it is shared between threads that read, insert and discard."""
+    import concurrent.futures
+    import sys
+    import threading
+
+    # Switch between threads as often as possible to maximize the contention
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    cache = LruCache(maxsize=256)
+    barrier = threading.Barrier(8)
+
+    def work(seed):
+        barrier.wait()
+
+        for index in range(5000):
+            key = (seed * index) % 512
+            value = cache.get(key)
+
+            if value is not None:
+                assert value == key * 2
+            else:
+                cache.set(key, key * 2)
+
+            if index % 50 == 0:
+                cache.discard(lambda key: key % 7 == 0)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            for future in [executor.submit(work, seed) for seed in range(1, 9)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert len(cache) <= 256
+    assert all(cache.get(key) == key * 2 for key in list(cache._data))  # pylint: disable=protected-access
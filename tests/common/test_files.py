@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `aiida_sssp.common.files` module."""
+import hashlib
+import io
+import os
+
+import pytest
+
+from aiida_sssp.common import get_cache_directory, link_or_copy, store_content_addressed
+
+
+def test_get_cache_directory(tmp_path, monkeypatch):
+    """Test the `get_cache_directory` function."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path))
+
+    assert get_cache_directory() == str(tmp_path)
+
+    dirpath = get_cache_directory('some', 'sub')
+    assert dirpath == os.path.join(str(tmp_path), 'some', 'sub')
+    assert os.path.isdir(dirpath)
+
+
+def test_store_content_addressed(tmp_path):
+    """Test the `store_content_addressed` function."""
+    content = b'content'
+    md5 = hashlib.md5(content).hexdigest()
+
+    filepath = store_content_addressed(io.BytesIO(content), md5, str(tmp_path))
+    assert filepath == os.path.join(str(tmp_path), md5[:2], md5)
+
+    with open(filepath, 'rb') as handle:
+        assert handle.read() == content
+
+    # Content that is already stored should not be read again
+    assert store_content_addressed(io.BytesIO(b'other'), md5, str(tmp_path)) == filepath
+
+    with pytest.raises(ValueError):
+        store_content_addressed(io.BytesIO(b'other'), '0' * 32, str(tmp_path))
+
+    assert os.listdir(os.path.join(str(tmp_path), '00')) == []
+
+
+@pytest.mark.parametrize('method', ('hardlink', 'symlink', 'copy'))
+def test_link_or_copy(tmp_path, method):
+    """Test the `link_or_copy` function."""
+    source = os.path.join(str(tmp_path), 'source')
+    target = os.path.join(str(tmp_path), 'target')
+
+    with open(source, 'w') as handle:
+        handle.write('content')
+
+    assert link_or_copy(source, target, method) == method
+
+    with open(target) as handle:
+        assert handle.read() == 'content'
+
+    # An existing target should be replaced
+    assert link_or_copy(source, target, method) == method
+
+    with pytest.raises(ValueError):
+        link_or_copy(source, target, 'invalid')
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `aiida_sssp.common.manifest` module."""
+import os
+
+from aiida_sssp.common import DirectoryManifest
+
+
+def test_manifest(tmp_path, monkeypatch):
+    """Test the `DirectoryManifest` class."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path / 'cache'))
+    dirpath = tmp_path / 'pseudos'
+    dirpath.mkdir()
+    filepath = dirpath / 'He.upf'
+    filepath.write_text('content')
+
+    manifest = DirectoryManifest(str(dirpath), namespace='profile')
+    assert manifest.entries == {}
+    assert manifest.filepath.startswith(os.path.join(str(tmp_path / 'cache'), 'manifests', 'profile'))
+
+    stat = os.stat(str(filepath))
+    md5 = manifest.get_md5('He.upf', stat)
+    assert manifest.get_uuid('He.upf', md5) is None
+
+    manifest.update('He.upf', stat, md5, 'some-uuid')
+    manifest.update('Ne.upf', stat, md5, 'other-uuid')
+    manifest.prune(['He.upf'])
+    manifest.save()
+
+    # A new instance for the same directory and namespace should load the saved entries
+    manifest = DirectoryManifest(str(dirpath), namespace='profile')
+    assert list(manifest.entries) == ['He.upf']
+    assert manifest.get_md5('He.upf', stat) == md5
+    assert manifest.get_uuid('He.upf', md5) == 'some-uuid'
+    assert manifest.get_uuid('He.upf', 'changed') is None
+
+    # A different namespace should not share the manifest
+    assert DirectoryManifest(str(dirpath), namespace='other').entries == {}
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Tests for the `aiida_sssp.common.upf` module."""
+import io
+import os
+
+import pytest
+
+from aiida_sssp.common import UpfHeader, scan_upf_header
+
+UPF_V1 = """<PP_INFO>
+  Generated by hand
+</PP_INFO>
+<PP_HEADER>
+   0                   Version Number
+  Si                   Element
+   US                  Ultrasoft pseudopotential
+    T                  Nonlinear Core Correction
+ SLA PW PBX PBC    PBE  Exchange-Correlation functional
+    4.00000000000      Z valence
+</PP_HEADER>
+<PP_MESH>
+"""
+
+UPF_V2 = """<UPF version="2.0.1">
+    <PP_INFO>
+    </PP_INFO>
+    <PP_HEADER
+        element="Si"
+        pseudo_type="US"
+        functional="PBE"
+        z_valence="4.000000000000000E+000"
+    />
+    <PP_MESH>
+"""
+
+
+def test_scan_upf_header_v1():
+    """Test the `scan_upf_header` function for the version 1 format."""
+    header = scan_upf_header(io.StringIO(UPF_V1))
+    assert header == UpfHeader('1', 'Si', 'US', 'SLA PW PBX PBC    PBE', 4.0)
+
+
+def test_scan_upf_header_v2():
+    """Test the `scan_upf_header` function for the version 2 format."""
+    header = scan_upf_header(io.BytesIO(UPF_V2.encode('utf-8')))
+    assert header == UpfHeader('2.0.1', 'Si', 'US', 'PBE', 4.0)
+
+
+def test_scan_upf_header_element_case():
+    """Test that `scan_upf_header` normalizes the case of the element like `UpfData` does."""
+    header = scan_upf_header(io.StringIO(UPF_V2.replace('element="Si"', 'element="SI"')))
+    assert header.element == 'Si'
+
+
+def test_scan_upf_header_filepath(filepath_pseudos):
+    """Test the `scan_upf_header` function for a filepath."""
+    header = scan_upf_header(os.path.join(filepath_pseudos, 'He.upf'))
+    assert header == UpfHeader('2.0.1', 'He', 'NC', None, None)
+
+
+def test_scan_upf_header_partial():
+    """Test that `scan_upf_header` stops reading at the end of the header."""
+    handle = io.StringIO(UPF_V2 + '<PP_R>' + '0.0 ' * 100000)
+    scan_upf_header(handle)
+    assert handle.tell() < len(UPF_V2) + 1024
+
+
+def test_scan_upf_header_invalid():
+    """Test the `scan_upf_header` function for invalid content."""
+    with pytest.raises(ValueError, match=r'does not contain a `PP_HEADER` section'):
+        scan_upf_header(io.StringIO('<UPF version="2.0.1">\n</UPF>\n'))
+
+    with pytest.raises(ValueError, match=r'does not define an element'):
+        scan_upf_header(io.StringIO('<UPF version="2.0.1">\n<PP_HEADER\n pseudo_type="NC"\n/>\n'))
@@ -10,6 +10,22 @@ import pytest
 pytest_plugins = ['aiida.manage.tests.pytest_fixtures']  # pylint: disable=invalid-name
 
 
+@pytest.fixture(autouse=True)
+def isolate_cache_directory(tmp_path_factory, monkeypatch):
+    """Point the local cache of `aiida-sssp` to a temporary directory, such that tests never touch the user cache."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path_factory.mktemp('cache')))
+
+
+@pytest.fixture
+def event_loop():
+    """Return a new event loop that is closed after the test."""
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
 @pytest.fixture
 def clear_db(clear_database_before_test):
     """Alias for the `clear_database_before_test` fixture from `aiida-core`."""
@@ -109,6 +109,22 @@ def test_create_from_file(clear_db, sssp_parameter_metadata, uuid):
             assert parameters.family_uuid == str(uuid)
 
 
+def test_load_metadata(sssp_parameter_metadata):
+    """Test the `SsspParameters.load_metadata` class method."""
+    with tempfile.NamedTemporaryFile(mode='w') as handle:
+        json.dump(sssp_parameter_metadata, handle)
+        handle.flush()
+
+        assert SsspParameters.load_metadata(handle.name) == sssp_parameter_metadata
+
+    with tempfile.NamedTemporaryFile(mode='w') as handle:
+        json.dump({'Ar': {'filename': 'Ar.upf'}}, handle)
+        handle.flush()
+
+        with pytest.raises(ValueError, match=r'entry for element `Ar` is missing the `md5` key'):
+            SsspParameters.load_metadata(handle.name)
+
+
 def test_family_uuid(clear_db, create_sssp_parameters, uuid):
     """Test the `SsspParameters.family_uuid` property."""
     node = create_sssp_parameters(uuid=uuid)
@@ -141,3 +157,48 @@ def test_get_metadata(clear_db, create_sssp_parameters):
 
     for element, cutoffs in SSSP_PARAMETERS.items():
         assert node.get_metadata(element) == cutoffs
+
+
+def test_query_metadata(clear_db, create_sssp_parameters):
+    """Test the `SsspParameters.query_metadata` class method."""
+    node = create_sssp_parameters(parameters=SSSP_PARAMETERS).store()
+
+    with pytest.raises(exceptions.NotExistent):
+        SsspParameters.query_metadata('non-existent', ['Ar'])
+
+    assert SsspParameters.query_metadata(node.uuid, []) == {}
+    assert SsspParameters.query_metadata(node.uuid, ['Ar']) == {'Ar': SSSP_PARAMETERS['Ar']}
+    assert SsspParameters.query_metadata(node.uuid, ['Ar', 'He', 'Ar']) == {
+        'Ar': SSSP_PARAMETERS['Ar'],
+        'He': SSSP_PARAMETERS['He'],
+    }
+
+    # Elements that are not defined, as well as the `family_uuid` attribute, should simply be omitted
+    assert SsspParameters.query_metadata(node.uuid, ['Br', SsspParameters.KEY_FAMILY_UUID]) == {}
+
+
+def test_records(clear_db, create_sssp_parameters):
+    """Test the `SsspParameters.records` property."""
+    from aiida.orm import load_node
+    from aiida_sssp.common import LruCache
+    from aiida_sssp.data import ElementMetadata, parameters
+
+    node = create_sssp_parameters(parameters=SSSP_PARAMETERS)
+    records = node.records
+
+    assert sorted(records) == sorted(SSSP_PARAMETERS)
+
+    for element, values in SSSP_PARAMETERS.items():
+        assert isinstance(records[element], ElementMetadata)
+        assert records[element]._asdict() == values
+
+    with pytest.raises(TypeError):
+        records['Ar'] = None
+
+    # The records of stored nodes should be shared between all instances of the same node
+    node.store()
+    assert node.records is load_node(node.pk).records
+
+    # The shared records are held in a bounded cache
+    assert isinstance(parameters._RECORDS, LruCache)  # pylint: disable=protected-access
+    assert node.uuid in parameters._RECORDS  # pylint: disable=protected-access
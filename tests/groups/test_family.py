@@ -3,9 +3,13 @@
 """Tests for the `SsspFamily` class."""
 import copy
 import distutils.dir_util
+import io
+import json
 import os
 import shutil
 import tempfile
+import uuid
+import zipfile
 
 import pytest
 
@@ -73,6 +77,62 @@ def test_add_nodes(clear_db, get_upf_data):
     assert family.count() == 3
 
 
+def test_add_nodes_element_index(clear_db, get_upf_data):
+    """Test that `SsspFamily.add_nodes` maintains the element index in the extras."""
+    upf_he = get_upf_data(element='He').store()
+    upf_ne = get_upf_data(element='Ne').store()
+    family = SsspFamily(label='SSSP').store()
+    assert family.element_index is None
+
+    family.add_nodes(upf_he)
+    assert family.element_index == {'He': upf_he.uuid}
+
+    family.add_nodes([upf_ne])
+    assert family.element_index == {'He': upf_he.uuid, 'Ne': upf_ne.uuid}
+    assert orm.load_group(family.pk).element_index == family.element_index
+
+
+def test_remove_nodes(clear_db, get_upf_data):
+    """Test the `SsspFamily.remove_nodes` method."""
+    upf_he = get_upf_data(element='He').store()
+    upf_ne = get_upf_data(element='Ne').store()
+    family = SsspFamily(label='SSSP').store()
+    family.add_nodes([upf_he, upf_ne])
+    assert family.get_pseudo('He').uuid == upf_he.uuid
+
+    family.remove_nodes(upf_he)
+    assert family.count() == 1
+    assert family.elements == ['Ne']
+    assert family.element_index == {'Ne': upf_ne.uuid}
+
+    with pytest.raises(ValueError):
+        family.get_pseudo('He')
+
+
+def test_rebuild_index(clear_db, create_sssp_family):
+    """Test the `SsspFamily.rebuild_index` method."""
+    family = create_sssp_family()
+    expected = {upf.element: upf.uuid for upf in family.nodes}
+    assert family.element_index == expected
+
+    family.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+    assert family.element_index is None
+    assert sorted(family.elements) == sorted(expected)
+
+    assert family.rebuild_index() == expected
+    assert family.element_index == expected
+    assert family.get_extra(SsspFamily.KEY_PARAMETERS_UUID, None) is None
+
+
+def test_rebuild_index_parameters(clear_db, create_sssp_family, create_sssp_parameters):
+    """Test that `SsspFamily.rebuild_index` also stores the reference to the associated `SsspParameters`."""
+    family = create_sssp_family()
+    parameters = create_sssp_parameters(uuid=family.uuid).store()
+
+    family.rebuild_index()
+    assert family.get_extra(SsspFamily.KEY_PARAMETERS_UUID) == parameters.uuid
+
+
 def test_elements(clear_db, get_upf_data):
     """Test the `SsspFamily.elements` property."""
     upf_he = get_upf_data(element='He').store()
@@ -103,6 +163,15 @@ def test_get_pseudo(clear_db, get_upf_data):
     assert isinstance(upf, orm.UpfData)
     assert upf.element == element
 
+    # Legacy families without an element index should still resolve through the group membership
+    family = orm.load_group(family.pk)
+    family.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+    upf = family.get_pseudo(element)
+    assert upf.uuid == upf_he.uuid
+
+    with pytest.raises(ValueError):
+        family.get_pseudo('X')
+
 
 def test_validate_parameters(clear_db, create_sssp_family, create_sssp_parameters):
     """Test the `SsspFamily.validate_parameters` class method."""
@@ -204,6 +273,29 @@ def test_create_from_folder_invalid(clear_db, filepath_pseudos):
         assert orm.UpfData.objects.count() == 0
 
 
+def test_scan_pseudos_from_directory(tmp_path, filepath_pseudos):
+    """Test the `SsspFamily.scan_pseudos_from_directory` class method."""
+    headers = SsspFamily.scan_pseudos_from_directory(filepath_pseudos)
+    assert {filename: header.element for filename, header in headers.items()} == {
+        'Ar.upf': 'Ar',
+        'He.upf': 'He',
+        'Ne.upf': 'Ne',
+    }
+
+    dirpath = str(tmp_path / 'pseudos')
+    shutil.copytree(filepath_pseudos, dirpath)
+    shutil.copyfile(os.path.join(dirpath, 'He.upf'), os.path.join(dirpath, 'He_copy.upf'))
+
+    with pytest.raises(ValueError, match=r'contains pseudo potentials with duplicate elements'):
+        SsspFamily.scan_pseudos_from_directory(dirpath)
+
+    with open(os.path.join(dirpath, 'He_copy.upf'), 'w') as handle:
+        handle.write('invalid')
+
+    with pytest.raises(ValueError, match=r'failed to parse'):
+        SsspFamily.scan_pseudos_from_directory(dirpath)
+
+
 def test_create_from_folder_with_parameters(clear_db, filepath_pseudos, sssp_parameter_filepath):
     """Test the `SsspFamily.create_from_folder` class method when passing a file with pseudo metadata."""
     with pytest.raises(TypeError):
@@ -216,6 +308,7 @@ def test_create_from_folder_with_parameters(clear_db, filepath_pseudos, sssp_par
 
     parameters = family.get_parameters_node()
     assert parameters.family_uuid == family.uuid
+    assert family.get_extra(SsspFamily.KEY_PARAMETERS_UUID) == parameters.uuid
 
     # Test from filelike object
     with open(sssp_parameter_filepath) as handle:
@@ -227,6 +320,137 @@ def test_create_from_folder_with_parameters(clear_db, filepath_pseudos, sssp_par
         assert parameters.family_uuid == family.uuid
 
 
+def test_prevalidate_directory(clear_db, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `SsspFamily.prevalidate_directory` class method."""
+    dirpath = str(tmp_path / 'pseudos')
+    shutil.copytree(filepath_pseudos, dirpath)
+    parameters = SsspParameters.create_from_file(sssp_parameter_filepath, str(uuid.uuid4()))
+
+    with pytest.raises(TypeError):
+        SsspFamily.prevalidate_directory(dirpath, [])
+
+    SsspFamily.prevalidate_directory(dirpath, parameters)
+    SsspFamily.prevalidate_directory(dirpath, parameters, max_workers=1)
+
+    # The metadata can also be validated without constructing a node
+    SsspFamily.prevalidate_directory(dirpath, SsspParameters.load_metadata(sssp_parameter_filepath))
+
+    with open(os.path.join(dirpath, 'He.upf'), 'a') as handle:
+        handle.write('\n')
+
+    with pytest.raises(ValueError, match=r'inconsistent `md5` for element `He`'):
+        SsspFamily.prevalidate_directory(dirpath, parameters)
+
+    # A corrupt file should be caught before any of the files is parsed
+    with pytest.raises(ValueError, match=r'inconsistent `md5` for element `He`'):
+        SsspFamily.create_from_folder(dirpath, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+
+    assert SsspFamily.objects.count() == 0
+    assert orm.UpfData.objects.count() == 0
+
+    with open(os.path.join(dirpath, 'unknown.upf'), 'w') as handle:
+        handle.write('content')
+
+    with pytest.raises(ValueError, match=r'does not contain the file `unknown.upf`'):
+        SsspFamily.prevalidate_directory(dirpath, parameters)
+
+    os.remove(os.path.join(dirpath, 'unknown.upf'))
+    shutil.copyfile(os.path.join(filepath_pseudos, 'Ne.upf'), os.path.join(dirpath, 'He.upf'))
+
+    with pytest.raises(ValueError, match=r'inconsistent `element` for file `He.upf`'):
+        SsspFamily.prevalidate_directory(dirpath, parameters)
+
+
+def test_create_from_folder_deduplicate(clear_db, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `SsspFamily.create_from_folder` class method with `deduplicate=True`."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP/1', filepath_parameters=sssp_parameter_filepath)
+    original = {upf.element: upf.uuid for upf in family.nodes}
+
+    family = SsspFamily.create_from_folder(
+        filepath_pseudos, 'SSSP/2', filepath_parameters=sssp_parameter_filepath, deduplicate=True
+    )
+    assert {upf.element: upf.uuid for upf in family.nodes} == original
+    assert orm.QueryBuilder().append(orm.UpfData).count() == 3
+
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP/3')
+    assert not set(upf.uuid for upf in family.nodes).intersection(original.values())
+
+
+def test_find_pseudos(clear_db, get_upf_data):
+    """Test the `SsspFamily.find_pseudos` class method."""
+    upf_he = get_upf_data(element='He').store()
+    get_upf_data(element='He').store()
+
+    assert SsspFamily.find_pseudos({}) == {}
+    assert SsspFamily.find_pseudos({upf_he.filename: '0' * 32}) == {}
+    assert SsspFamily.find_pseudos({'other.upf': upf_he.md5sum}) == {}
+
+    pseudos = SsspFamily.find_pseudos({upf_he.filename: upf_he.md5sum})
+    assert list(pseudos.keys()) == [upf_he.filename]
+    assert pseudos[upf_he.filename].pk == upf_he.pk
+
+
+def test_create_from_folder_incremental(clear_db, tmp_path, monkeypatch, filepath_pseudos):
+    """Test the `SsspFamily.create_from_folder` class method with `incremental=True`."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path / 'cache'))
+    dirpath = str(tmp_path / 'pseudos')
+    shutil.copytree(filepath_pseudos, dirpath)
+
+    family = SsspFamily.create_from_folder(dirpath, 'SSSP/1', incremental=True)
+    assert sorted(family.elements) == ['Ar', 'He', 'Ne']
+    original = {upf.element: upf.uuid for upf in family.nodes}
+
+    # Without changes, the new family should reuse all the nodes
+    family = SsspFamily.create_from_folder(dirpath, 'SSSP/2', incremental=True)
+    assert {upf.element: upf.uuid for upf in family.nodes} == original
+
+    # Changing the content of a single file should only create a new node for that file
+    with open(os.path.join(dirpath, 'He.upf'), 'a') as handle:
+        handle.write('\n')
+
+    family = SsspFamily.create_from_folder(dirpath, 'SSSP/3', incremental=True)
+    uuids = {upf.element: upf.uuid for upf in family.nodes}
+    assert uuids['Ar'] == original['Ar']
+    assert uuids['Ne'] == original['Ne']
+    assert uuids['He'] != original['He']
+    assert orm.QueryBuilder().append(orm.UpfData).count() == 4
+
+    # A non-incremental creation should never reuse nodes
+    family = SsspFamily.create_from_folder(dirpath, 'SSSP/4')
+    assert not set(upf.uuid for upf in family.nodes).intersection(uuids.values())
+
+
+def test_create_from_folders(clear_db, tmp_path, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `SsspFamily.create_from_folders` class method."""
+    dirpath_invalid = str(tmp_path / 'invalid')
+    shutil.copytree(filepath_pseudos, dirpath_invalid)
+    os.makedirs(os.path.join(dirpath_invalid, 'subfolder'))
+    SsspFamily(label='SSSP/existing').store()
+
+    # A group of another type with the same label should not prevent the family from being created
+    orm.Group(label='SSSP/1').store()
+
+    folders = [
+        (filepath_pseudos, 'SSSP/1'),
+        (filepath_pseudos, 'SSSP/2', sssp_parameter_filepath),
+        (dirpath_invalid, 'SSSP/3'),
+        (str(tmp_path / 'non-existing'), 'SSSP/4'),
+        (str(tmp_path / 'existing'), 'SSSP/existing'),
+    ]
+
+    families, errors = SsspFamily.create_from_folders(folders, max_workers=2)
+
+    assert sorted(families) == ['SSSP/1', 'SSSP/2']
+    assert sorted(families['SSSP/1'].elements) == ['Ar', 'He', 'Ne']
+    assert isinstance(families['SSSP/2'].get_parameters_node(), SsspParameters)
+
+    assert sorted(errors) == sorted([dirpath_invalid, str(tmp_path / 'non-existing'), str(tmp_path / 'existing')])
+    assert 'contains at least one entry that is not a file' in str(errors[dirpath_invalid])
+    assert 'is not a directory' in str(errors[str(tmp_path / 'non-existing')])
+    assert 'already exists' in str(errors[str(tmp_path / 'existing')])
+    assert SsspFamily.objects.count() == 3
+
+
 def test_get_parameters_node(clear_db, create_sssp_family, create_sssp_parameters):
     """Test the `SsspFamily.get_parameters_node` method."""
     family = create_sssp_family()
@@ -239,6 +463,15 @@ def test_get_parameters_node(clear_db, create_sssp_family, create_sssp_parameter
     assert isinstance(family.get_parameters_node(), SsspParameters)
     assert family.get_parameters_node().uuid == parameters.uuid
 
+    # The legacy lookup through the `family_uuid` attribute should have stored the reference in the extras
+    assert family.get_extra(SsspFamily.KEY_PARAMETERS_UUID) == parameters.uuid
+
+    # A reference to a parameters node that no longer exists should fall back to the legacy lookup
+    family = orm.load_group(family.pk)
+    family.set_extra(SsspFamily.KEY_PARAMETERS_UUID, str(uuid.uuid4()))
+    assert family.get_parameters_node().uuid == parameters.uuid
+    assert family.get_extra(SsspFamily.KEY_PARAMETERS_UUID) == parameters.uuid
+
 
 def test_parameters(clear_db, create_sssp_family, create_sssp_parameters):
     """Test the `SsspFamily.parameters` property."""
@@ -276,6 +509,42 @@ def test_get_parameter(clear_db, create_sssp_family, create_sssp_parameters, sss
     assert family.get_parameter(element, key_cutoff_rho) == parameters.get_attribute(element)[key_cutoff_rho]
 
 
+def test_get_element_parameters(
+    clear_db, monkeypatch, filepath_pseudos, sssp_parameter_filepath, sssp_parameter_metadata
+):
+    """Test the `SsspFamily.get_element_parameters` method."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    family = orm.load_group(family.pk)
+
+    assert family.get_element_parameters(['Ar']) == {'Ar': sssp_parameter_metadata['Ar']}
+    assert family.get_element_parameters(['Ar', 'Ne']) == {
+        'Ar': sssp_parameter_metadata['Ar'],
+        'Ne': sssp_parameter_metadata['Ne'],
+    }
+
+    # The parameters should have been retrieved through a projection, without loading the parameters node
+    assert family._parameters is None  # pylint: disable=protected-access
+
+    # Elements that were already retrieved should be served from the instance without querying again
+    def query_metadata(*_, **__):
+        raise AssertionError('the parameters should not be queried again')
+
+    monkeypatch.setattr(SsspParameters, 'query_metadata', query_metadata)
+    assert family.get_element_parameters(['Ne', 'Ar']) == {
+        'Ar': sssp_parameter_metadata['Ar'],
+        'Ne': sssp_parameter_metadata['Ne'],
+    }
+    monkeypatch.undo()
+
+    with pytest.raises(KeyError) as exception:
+        family.get_element_parameters(['Ar', 'Br'])
+    assert 'family `{}` does not contain the element `Br`'.format(family.label) in str(exception.value)
+
+    # Once the parameters are loaded, they should be used directly
+    family.get_parameters_node()
+    assert family.get_element_parameters(['He']) == {'He': sssp_parameter_metadata['He']}
+
+
 def test_get_cutoffs(clear_db, create_sssp_family, create_sssp_parameters, create_structure):
     """Test the `SsspFamily.get_cutoffs` method."""
     family = create_sssp_family()
@@ -310,6 +579,75 @@ def test_get_cutoffs(clear_db, create_sssp_family, create_sssp_parameters, creat
     assert family.get_cutoffs(structure=structure) == (expected['cutoff_wfc'], expected['cutoff_rho'])
 
 
+def test_get_cutoffs_cache(clear_db, create_sssp_family, create_sssp_parameters, create_structure):
+    """Test that `SsspFamily.get_cutoffs` caches its results on the set of elements."""
+    SsspFamily.clear_caches()
+    family = create_sssp_family()
+    create_sssp_parameters(uuid=family.uuid).store()
+
+    structure = create_structure(site_kind_names=['Ar', 'He']).store()
+    expected = family.get_cutoffs(structure=structure)
+    assert SsspFamily.get_cache_info()['cutoffs'].misses == 1
+    assert SsspFamily.get_cache_info()['symbols'].misses == 1
+
+    # Same structure, same elements in different order and a different structure with the same elements
+    assert family.get_cutoffs(structure=structure) == expected
+    assert family.get_cutoffs(elements=('He', 'Ar')) == expected
+    assert family.get_cutoffs(structure=create_structure(site_kind_names=['He', 'Ar1', 'Ar2'])) == expected
+
+    info = SsspFamily.get_cache_info()
+    assert info['cutoffs'].hits == 3
+    assert info['cutoffs'].misses == 1
+    assert info['symbols'].hits == 1
+
+    # Changing the parameters of the family should invalidate the cache
+    parameters = {
+        'Ar': {
+            'cutoff_wfc': 100.,
+            'cutoff_rho': 800.,
+            'filename': 'Ar.upf',
+            'md5': '62a1754735fbb79bac662092d68a8bb9'
+        },
+        'He': {
+            'cutoff_wfc': 20.,
+            'cutoff_rho': 80.,
+            'filename': 'He.upf',
+            'md5': '5e00510a01c97f7faa8d22f18dd6c41f'
+        },
+    }
+    parameters = create_sssp_parameters(parameters=parameters, uuid=family.uuid).store()
+    family.set_extra(SsspFamily.KEY_PARAMETERS_UUID, parameters.uuid)
+    family = orm.load_group(family.pk)
+    assert family.get_cutoffs(structure=structure) == (100., 800.)
+
+    SsspFamily.clear_caches()
+    assert SsspFamily.get_cache_info()['cutoffs'].currsize == 0
+
+
+def test_get_cutoffs_cache_repointed(clear_db, create_sssp_family, create_sssp_parameters):
+    """Test that an instance whose parameters are repointed does not cache stale cutoffs for the new parameters."""
+    SsspFamily.clear_caches()
+    family = create_sssp_family()
+    original = create_sssp_parameters(uuid=family.uuid).store()
+    expected = (original.get_attribute('Ar')['cutoff_wfc'], original.get_attribute('Ar')['cutoff_rho'])
+
+    family.get_parameters_node()
+
+    parameters = copy.deepcopy(original.get_metadata())
+    parameters['Ar'].update({'cutoff_wfc': 100., 'cutoff_rho': 800.})
+    parameters = create_sssp_parameters(parameters=parameters, uuid=family.uuid).store()
+
+    # The instance still holds the original parameters, so it should compute and cache the original cutoffs ...
+    family.set_extra(SsspFamily.KEY_PARAMETERS_UUID, parameters.uuid)
+    assert family.get_cutoffs(elements='Ar') == expected
+
+    # ... which should not be returned for the new parameters by an instance that loads those
+    assert orm.load_group(family.pk).get_cutoffs(elements='Ar') == (100., 800.)
+
+    SsspFamily.clear_caches()
+    assert SsspFamily.get_cache_info()['cutoffs'].currsize == 0
+
+
 def test_get_pseudos(clear_db, create_sssp_family, create_sssp_parameters, create_structure):
     """Test the `SsspFamily.get_pseudos` method."""
     family = create_sssp_family()
@@ -331,3 +669,562 @@ def test_get_pseudos(clear_db, create_sssp_family, create_sssp_parameters, creat
     }
     structure = create_structure(site_kind_names=['Ar1', 'Ar2'])
     assert family.get_pseudos(structure) == expected
+
+
+def test_concurrency(clear_db, monkeypatch, filepath_pseudos, sssp_parameter_filepath):
+    """Test that a single `SsspFamily` instance can be shared between threads once its data has been loaded."""
+    import concurrent.futures
+    import threading
+
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    pseudos = {element: upf.pk for element, upf in family.pseudos.items()}
+    compositions = [('Ar',), ('Ar', 'He'), ('He', 'Ne')]
+    cutoffs = [family.get_cutoffs(elements=composition) for composition in compositions]
+
+    SsspFamily.clear_caches()
+    family = orm.load_group(family.pk)
+
+    # Load all data on this thread, after which the threads should only read the in-memory caches of the instance
+    assert sorted(family.pseudos) == sorted(pseudos)
+    parameters = family.parameters
+
+    for composition in compositions:
+        family.get_cutoffs(elements=composition)
+
+    def raise_database_access(*_, **__):
+        raise AssertionError('the database should not be accessed from the threads')
+
+    for module in ('family', 'handles', 'snapshot'):
+        monkeypatch.setattr('aiida_sssp.groups.{}.QueryBuilder'.format(module), raise_database_access)
+
+    monkeypatch.setattr(SsspFamily, 'get_extra', raise_database_access)
+
+    barrier = threading.Barrier(8)
+
+    def work(seed):
+        barrier.wait()
+
+        for index in range(50):
+            choice = (seed + index) % len(compositions)
+            composition = compositions[choice]
+            resolved = {kind: upf.pk for kind, upf in family.get_pseudos(composition).items()}
+            assert resolved == {element: pseudos[element] for element in composition}
+            assert family.get_cutoffs(elements=composition) == cutoffs[choice]
+            assert family.get_pseudo('Ne').pk == pseudos['Ne']
+            assert family.parameters is parameters
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(work, seed) for seed in range(8)]:
+            future.result()
+
+
+def test_async(clear_db, event_loop, filepath_pseudos, sssp_parameter_filepath, create_structure):
+    """Test the `SsspFamily.get_pseudos_async`, `get_parameters_node_async` and `get_cutoffs_async` methods."""
+    import asyncio
+
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    structures = [create_structure(site_kind_names=names) for names in (['Ar1', 'Ar2'], ['Ar', 'He'], ['He', 'Ne'])]
+    expected = [family.get_pseudos(structure) for structure in structures]
+    cutoffs = [family.get_cutoffs(structure=structure) for structure in structures]
+    parameters = family.get_parameters_node()
+
+    family = orm.load_group(family.pk)
+
+    async def resolve(structure):
+        return await asyncio.gather(
+            family.get_pseudos_async(structure),
+            family.get_pseudos_async(structure, lazy=True),
+            family.get_cutoffs_async(structure=structure),
+            family.get_parameters_node_async(),
+        )
+
+    async def resolve_all():
+        return await asyncio.gather(*[resolve(structure) for structure in structures * 4])
+
+    results = event_loop.run_until_complete(resolve_all())
+
+    for index, (pseudos, handles, result, node) in enumerate(results):
+        assert pseudos == expected[index % 3]
+        uuids = {kind: upf.uuid for kind, upf in expected[index % 3].items()}
+        assert {kind: handle.uuid for kind, handle in handles.items()} == uuids
+        assert result == cutoffs[index % 3]
+        assert node.uuid == parameters.uuid
+
+    # All pseudos are now cached on the instance, so they are returned without involving the executor
+    assert event_loop.run_until_complete(family.get_pseudos_async(['Ne'])) == {'Ne': family.get_pseudo('Ne')}
+
+    with pytest.raises(ValueError):
+        event_loop.run_until_complete(family.get_pseudos_async(['Br']))
+
+
+def test_async_threads(clear_db, event_loop, monkeypatch, filepath_pseudos, sssp_parameter_filepath, create_structure):
+    """Test that the coroutines of `SsspFamily` do not construct any ORM entity on the threads of the executor."""
+    import asyncio
+    import threading
+
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    structure = create_structure(site_kind_names=['Ar', 'He'])
+    expected = family.get_pseudos(structure)
+    cutoffs = family.get_cutoffs(structure=structure)
+
+    SsspFamily.clear_caches()
+    family = orm.load_group(family.pk)
+
+    threads = []
+    initialize = orm.Entity.initialize
+
+    def initialize_recorded(self):
+        threads.append(threading.current_thread())
+        initialize(self)
+
+    monkeypatch.setattr(orm.Entity, 'initialize', initialize_recorded)
+
+    async def resolve():
+        return await asyncio.gather(
+            family.get_pseudos_async(structure),
+            family.get_pseudos_async(structure, lazy=True),
+            family.get_cutoffs_async(structure=structure),
+            family.get_parameters_node_async(),
+        )
+
+    pseudos, handles, result, node = event_loop.run_until_complete(resolve())
+
+    assert threads
+    assert set(threads) == {threading.current_thread()}
+    assert {kind: upf.uuid for kind, upf in pseudos.items()} == {kind: upf.uuid for kind, upf in expected.items()}
+    assert {kind: handle.uuid for kind, handle in handles.items()} == {kind: upf.uuid for kind, upf in expected.items()}
+    assert not any(handle.is_loaded for handle in handles.values())
+    assert result == cutoffs
+    assert node.uuid == family.get_extra(SsspFamily.KEY_PARAMETERS_UUID)
+
+
+def test_get_pseudos_symbols(clear_db, create_sssp_family, create_sssp_parameters):
+    """Test the `SsspFamily.get_pseudos` and `get_cutoffs` methods for structures that are not a `StructureData`."""
+    from ase import Atoms
+
+    family = create_sssp_family()
+    parameters = create_sssp_parameters(uuid=family.uuid).store().attributes
+    pseudos = {upf.element: upf for upf in family.nodes}
+    expected = (parameters['Ne']['cutoff_wfc'], parameters['Ne']['cutoff_rho'])
+
+    for structure in (['Ar', 'Ne', 'Ar'], ('Ar', 'Ne')):
+        assert family.get_pseudos(structure) == {'Ar': pseudos['Ar'], 'Ne': pseudos['Ne']}
+        assert family.get_cutoffs(structure=structure) == expected
+
+    atoms = Atoms('Ar2Ne', tags=[1, 2, 0])
+    assert family.get_pseudos(atoms) == {'Ar1': pseudos['Ar'], 'Ar2': pseudos['Ar'], 'Ne': pseudos['Ne']}
+    assert family.get_cutoffs(structure=atoms) == expected
+
+    for structure in ('Ar', ['Ar', 1], {'Ar'}):
+        with pytest.raises(TypeError):
+            family.get_pseudos(structure)
+
+    with pytest.raises(ValueError):
+        family.get_pseudos(['Br'])
+
+    assert orm.QueryBuilder().append(orm.StructureData).count() == 0
+
+
+def test_get_pseudos_pymatgen(clear_db, create_sssp_family):
+    """Test the `SsspFamily.get_pseudos` method for pymatgen structures."""
+    pymatgen = pytest.importorskip('pymatgen')
+
+    family = create_sssp_family()
+    pseudos = {upf.element: upf for upf in family.nodes}
+    lattice = pymatgen.Lattice.cubic(5.)
+
+    structure = pymatgen.Structure(lattice, ['Ar', 'He'], [[0, 0, 0], [0.5, 0.5, 0.5]])
+    structure.add_site_property('kind_name', ['Ar1', 'He'])
+    assert family.get_pseudos(structure) == {'Ar1': pseudos['Ar'], 'He': pseudos['He']}
+
+    structure = pymatgen.Structure(lattice, [{'Ar': 0.5, 'He': 0.5}], [[0, 0, 0]])
+
+    with pytest.raises(ValueError, match='partial occupancies'):
+        family.get_pseudos(structure)
+
+
+def test_get_pseudos_lazy(clear_db, create_sssp_family, create_structure):
+    """Test the `SsspFamily.get_pseudos` method with `lazy=True`."""
+    from aiida_sssp.groups import PseudoHandle
+
+    family = create_sssp_family()
+    pseudos = {upf.element: upf for upf in family.nodes}
+    structure = create_structure(site_kind_names=['Ar1', 'Ar2', 'He'])
+
+    def assert_handles(family):
+        handles = family.get_pseudos(structure, lazy=True)
+        assert sorted(handles.keys()) == ['Ar1', 'Ar2', 'He']
+        assert handles['Ar1'] == handles['Ar2']
+
+        for kind_name, handle in handles.items():
+            upf = pseudos[kind_name[:2]]
+            assert isinstance(handle, PseudoHandle)
+            assert (handle.pk, handle.uuid, handle.element) == (upf.pk, upf.uuid, upf.element)
+            assert (handle.filename, handle.md5sum) == (upf.filename, upf.md5sum)
+
+        return handles
+
+    # Through a projection on the group membership, which should not create a snapshot
+    handles = assert_handles(orm.load_group(family.pk))
+    assert family.load_snapshot() is None
+    assert not handles['He'].is_loaded
+    assert handles['He'].node.uuid == pseudos['He'].uuid
+    assert handles['He'].is_loaded
+
+    # Families without element index should be supported as well
+    family.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+    assert not assert_handles(orm.load_group(family.pk))['He'].is_loaded
+
+    # Nodes that were already loaded should be reused
+    family = orm.load_group(family.pk)
+    family.get_pseudo('He')
+    assert family.get_pseudos(structure, lazy=True)['He'].is_loaded
+
+    with pytest.raises(ValueError, match=r'does not contain pseudo for element `Br`'):
+        family.get_pseudos(create_structure(site_kind_names=['Br']), lazy=True)
+
+    with pytest.raises(AttributeError):
+        handles['He'].other = None
+
+
+def test_stage_pseudos(clear_db, tmp_path, monkeypatch, create_sssp_family, create_structure):
+    """Test the `SsspFamily.materialize` and `SsspFamily.stage_pseudos` methods."""
+    monkeypatch.setenv('AIIDA_SSSP_CACHE_DIR', str(tmp_path / 'cache'))
+    family = create_sssp_family()
+    structure = create_structure(site_kind_names=['Ar1', 'Ar2', 'He'])
+
+    store = family.materialize()
+    assert sorted(store) == sorted(family.elements)
+
+    for element, filepath in store.items():
+        assert os.path.basename(filepath) == family.get_pseudo(element).md5sum
+
+    for method in ['hardlink', 'symlink', 'copy']:
+        dirpath = tmp_path / method
+        dirpath.mkdir()
+
+        staged = family.stage_pseudos(structure, str(dirpath), method=method)
+        assert sorted(staged) == ['Ar', 'He']
+        assert sorted(os.listdir(str(dirpath))) == ['Ar.upf', 'He.upf']
+
+        for element, filepath in staged.items():
+            with open(filepath) as handle:
+                assert handle.read() == family.get_pseudo(element).get_content()
+
+        if method == 'hardlink':
+            assert os.path.samefile(staged['Ar'], store['Ar'])
+
+
+def test_verify(clear_db, create_sssp_family, create_sssp_parameters, sssp_parameter_metadata):
+    """Test the `SsspFamily.verify` method."""
+    family = create_sssp_family()
+
+    # Without parameters the content is verified against the `md5` attribute of the nodes
+    assert family.verify() == []
+
+    create_sssp_parameters(uuid=family.uuid).store()
+    assert orm.load_group(family.pk).verify() == []
+
+    metadata = copy.deepcopy(sssp_parameter_metadata)
+    metadata['Ar']['md5'] = '0' * 32
+    metadata['He']['filename'] = 'He.UPF'
+    metadata['Xe'] = copy.deepcopy(metadata['Ne'])
+    metadata.pop('Ne')
+    parameters = create_sssp_parameters(parameters=metadata, uuid=family.uuid).store()
+    family.set_extra(SsspFamily.KEY_PARAMETERS_UUID, parameters.uuid)
+
+    mismatches = orm.load_group(family.pk).verify()
+    assert sorted(mismatches) == sorted([
+        ('Xe', 'element', 'Xe', None),
+        ('Ne', 'element', None, 'Ne'),
+        ('Ar', 'md5', '0' * 32, sssp_parameter_metadata['Ar']['md5']),
+        ('He', 'filename', 'He.UPF', 'He.upf'),
+    ])
+
+
+def test_repair(clear_db, monkeypatch, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `SsspFamily.repair` method."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    assert family.repair(filepath_pseudos) == []
+
+    corrupt = family.get_pseudo('Ar')
+    intact = family.get_pseudo('He')
+    # pylint: disable=protected-access
+    corrupt._repository.put_object_from_filelike(io.StringIO('corrupt'), corrupt.filename, force=True)
+    assert [mismatch.element for mismatch in family.verify()] == ['Ar']
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        with pytest.raises(ValueError) as exception:
+            family.repair(dirpath)
+        assert 'failed to parse' in str(exception.value)
+
+    # If the replacements cannot be added, the original pseudos should be restored
+    add_nodes = SsspFamily.add_nodes
+
+    def add_nodes_failing(self, nodes):
+        if any(node.uuid != corrupt.uuid for node in nodes):
+            raise RuntimeError('failure')
+        add_nodes(self, nodes)
+
+    monkeypatch.setattr(SsspFamily, 'add_nodes', add_nodes_failing)
+
+    with pytest.raises(RuntimeError):
+        family.repair(filepath_pseudos)
+
+    monkeypatch.undo()
+    assert orm.load_group(family.pk).get_pseudo('Ar').uuid == corrupt.uuid
+
+    assert family.repair(filepath_pseudos) == ['Ar']
+
+    family = orm.load_group(family.pk)
+    assert family.verify() == []
+    assert family.count() == 3
+    assert family.get_pseudo('Ar').uuid != corrupt.uuid
+    assert family.get_pseudo('He').uuid == intact.uuid
+
+
+def test_export_import_bundle(clear_db, tmp_path, monkeypatch, filepath_pseudos, sssp_parameter_filepath):
+    """Test the `SsspFamily.export_bundle` and `SsspFamily.import_bundle` methods."""
+    family = SsspFamily.create_from_folder(
+        filepath_pseudos, 'SSSP/1.0', description='description', filepath_parameters=sssp_parameter_filepath
+    )
+    filepath = str(tmp_path / 'bundle.zip')
+    family.export_bundle(filepath)
+
+    with zipfile.ZipFile(filepath) as bundle:
+        names = sorted(bundle.namelist())
+
+    assert names == ['manifest.json', 'parameters.json', 'pseudos/Ar.upf', 'pseudos/He.upf', 'pseudos/Ne.upf']
+
+    with pytest.raises(ValueError, match=r'already exists'):
+        SsspFamily.import_bundle(filepath)
+
+    imported = SsspFamily.import_bundle(filepath, label='SSSP/copy')
+    assert imported.label == 'SSSP/copy'
+    assert imported.description == 'description'
+    assert imported.element_index == family.element_index
+    assert imported.get_parameters_node().family_uuid == imported.uuid
+    assert imported.get_parameters_node().get_metadata() == family.get_parameters_node().get_metadata()
+    assert orm.QueryBuilder().append(orm.UpfData).count() == 3
+
+    # Corrupt one of the pseudos in the bundle
+    filepath_corrupt = str(tmp_path / 'corrupt.zip')
+
+    with zipfile.ZipFile(filepath) as bundle, zipfile.ZipFile(filepath_corrupt, 'w') as corrupt:
+        for name in bundle.namelist():
+            content = bundle.read(name)
+            corrupt.writestr(name, content + b'\n' if name == 'pseudos/He.upf' else content)
+
+    with pytest.raises(ValueError, match=r'the pseudo `He.upf` for element `He` is corrupt'):
+        SsspFamily.import_bundle(filepath_corrupt, label='SSSP/corrupt')
+
+    with open(filepath_corrupt, 'w') as handle:
+        handle.write('invalid')
+
+    with pytest.raises(ValueError, match=r'is invalid'):
+        SsspFamily.import_bundle(filepath_corrupt, label='SSSP/corrupt')
+
+    assert SsspFamily.objects.count() == 2
+
+    # A failure while adding the pseudos should not leave a family behind
+    def add_nodes(self, nodes):
+        raise RuntimeError('failure')
+
+    monkeypatch.setattr(SsspFamily, 'add_nodes', add_nodes)
+
+    with pytest.raises(RuntimeError):
+        SsspFamily.import_bundle(filepath, label='SSSP/failed')
+
+    monkeypatch.undo()
+    assert SsspFamily.objects.count() == 2
+    assert not orm.QueryBuilder().append(SsspFamily, filters={'label': 'SSSP/failed'}).count()
+
+
+def test_snapshot(clear_db, filepath_pseudos, sssp_parameter_filepath, sssp_parameter_metadata, get_upf_data):
+    """Test the snapshot of the lookup tables of a family."""
+    family = SsspFamily.create_from_folder(filepath_pseudos, 'SSSP', filepath_parameters=sssp_parameter_filepath)
+    assert family.load_snapshot() is None
+
+    snapshot = family.save_snapshot()
+    assert snapshot['parameters'] == sssp_parameter_metadata
+    assert snapshot['pseudos'] == {upf.element: [upf.pk, upf.filename, upf.md5sum] for upf in family.nodes}
+
+    # A new instance should load the snapshot and resolve parameters and pseudos without loading the parameters
+    family = orm.load_group(family.pk)
+    assert family.load_snapshot() == snapshot
+    assert family.get_element_parameters(['Ar']) == {'Ar': sssp_parameter_metadata['Ar']}
+    assert family.get_cutoffs(elements=('Ar', 'He')) == (20.0, 80.0)
+    assert family.get_pseudo('He').pk == snapshot['pseudos']['He'][0]
+    assert family._parameters_node is None  # pylint: disable=protected-access
+
+    # Modifying the family should invalidate the snapshot
+    family.remove_nodes([family.get_pseudo('He')])
+    assert family.load_snapshot() is None
+
+    # Lookups should not create a snapshot, which is only written explicitly
+    family = orm.load_group(family.pk)
+    family.add_nodes([get_upf_data(element='He').store()])
+    assert family.get_element_parameters(['He']) == {'He': sssp_parameter_metadata['He']}
+    assert family.get_cutoffs(elements=('Ar', 'He')) == (20.0, 80.0)
+    assert family.get_pseudos(['He'], lazy=True)['He'].pk == family.get_pseudo('He').pk
+    assert family.load_snapshot() is None
+
+    family.save_snapshot()
+    assert family.load_snapshot()['pseudos']['He'][0] == family.get_pseudo('He').pk
+
+    # A family without index does not have a snapshot
+    family.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+    assert family.save_snapshot() is None
+    assert family.load_snapshot() is None
+
+
+@pytest.fixture
+def create_modified_family(tmp_path, filepath_pseudos, sssp_parameter_metadata):
+    """Return a function that creates a family without `Ne`, with a modified `He` pseudo and a higher `He` cutoff."""
+    from aiida.common.files import md5_file
+
+    def _create_modified_family(label):
+        dirpath = str(tmp_path / label)
+        shutil.copytree(filepath_pseudos, dirpath)
+        os.remove(os.path.join(dirpath, 'Ne.upf'))
+
+        with open(os.path.join(dirpath, 'He.upf'), 'a') as handle:
+            handle.write('\n')
+
+        metadata = copy.deepcopy(sssp_parameter_metadata)
+        metadata.pop('Ne')
+        metadata['He']['md5'] = md5_file(os.path.join(dirpath, 'He.upf'))
+        metadata['He']['cutoff_wfc'] += 10.
+
+        filepath_parameters = str(tmp_path / '{}.json'.format(label))
+
+        with open(filepath_parameters, 'w') as handle:
+            json.dump(metadata, handle)
+
+        return SsspFamily.create_from_folder(dirpath, label, filepath_parameters=filepath_parameters)
+
+    return _create_modified_family
+
+
+def test_diff(clear_db, filepath_pseudos, sssp_parameter_filepath, create_modified_family):
+    """Test the `SsspFamily.diff` method."""
+    family_a = SsspFamily.create_from_folder(filepath_pseudos, 'A', filepath_parameters=sssp_parameter_filepath)
+    family_b = create_modified_family('B')
+
+    with pytest.raises(TypeError):
+        family_a.diff('B')
+
+    assert family_a.diff(family_a) == ([], [], [], {})
+    assert set(family_a.get_lookup_table()) == set(family_a.elements)
+
+    expected = family_a.diff(family_b)
+    assert expected.added == []
+    assert expected.removed == ['Ne']
+    assert expected.changed == ['He']
+    assert expected.cutoffs == {'He': (10., 0.)}
+
+    diff = family_b.diff(family_a)
+    assert diff.added == ['Ne']
+    assert diff.removed == []
+    assert diff.cutoffs == {'He': (-10., 0.)}
+
+    # Families without element index should be supported as well, without loading their parameters node
+    family_a.delete_extra(SsspFamily.KEY_ELEMENT_INDEX)
+    family_a = orm.load_group(family_a.pk)
+    assert family_a.diff(family_b) == expected
+    assert family_a._parameters_node is None  # pylint: disable=protected-access
+
+    # As should families that no longer reference their parameters node
+    family_a.delete_extra(SsspFamily.KEY_PARAMETERS_UUID)
+    assert orm.load_group(family_a.pk).diff(family_b) == expected
+
+
+def test_diff_many(clear_db, filepath_pseudos, sssp_parameter_filepath, create_modified_family):
+    """Test the `SsspFamily.diff_many` class method."""
+    family_a = SsspFamily.create_from_folder(filepath_pseudos, 'A', filepath_parameters=sssp_parameter_filepath)
+    family_b = create_modified_family('B')
+    family_c = SsspFamily.create_from_folder(filepath_pseudos, 'C')
+
+    diffs = SsspFamily.diff_many([family_a, family_b, family_c])
+    assert sorted(diffs.keys()) == [('A', 'B'), ('A', 'C'), ('B', 'C')]
+    assert diffs[('A', 'B')] == family_a.diff(family_b)
+
+    # Family `C` does not define cutoffs, so only the pseudos are compared
+    assert diffs[('A', 'C')] == ([], [], [], {})
+    assert diffs[('B', 'C')] == (['Ne'], [], ['He'], {})
+
+
+def test_find_families(clear_db, filepath_pseudos, get_upf_data):
+    """Test the `SsspFamily.find_families` class method."""
+    family_b = SsspFamily.create_from_folder(filepath_pseudos, 'B')
+    family_a = SsspFamily.create_from_folder(filepath_pseudos, 'A', deduplicate=True)
+    upf = family_a.get_pseudo('He')
+
+    with pytest.raises(TypeError):
+        SsspFamily.find_families(1)
+
+    assert [family.pk for family in SsspFamily.find_families(upf)] == [family_a.pk, family_b.pk]
+    assert [family.label for family in SsspFamily.find_families(upf.md5sum)] == ['A', 'B']
+    assert SsspFamily.find_families('0' * 32) == []
+    assert SsspFamily.find_families(get_upf_data(element='He').store()) == []
+
+    # Looking up by md5 should include families with a different node with the same content
+    family_c = SsspFamily.create_from_folder(filepath_pseudos, 'C')
+    assert [family.label for family in SsspFamily.find_families(upf.md5sum)] == ['A', 'B', 'C']
+    assert [family.label for family in SsspFamily.find_families(upf)] == ['A', 'B']
+    assert family_c.get_pseudo('He').pk != upf.pk
+
+
+def test_check_coverage(clear_db, create_sssp_family, create_structure):
+    """Test the `SsspFamily.check_coverage` method."""
+    family = create_sssp_family()
+    group = orm.Group('structures').store()
+
+    with pytest.raises(TypeError):
+        family.check_coverage('structures')
+
+    assert family.check_coverage(group) == {}
+
+    covered = [create_structure(site_kind_names=names).store() for names in (['Ar'], ['He', 'Ne'], ['Ar1', 'Ar2'])]
+    uncovered = {
+        create_structure(site_kind_names=['Ar', 'Br']).store().pk: ['Br'],
+        create_structure(site_kind_names=['Kr', 'Br']).store().pk: ['Br', 'Kr'],
+        create_structure(site_kind_names=['Br', 'Ar']).store().pk: ['Br'],
+    }
+    group.add_nodes(covered + [orm.load_node(pk) for pk in uncovered] + [family.get_pseudo('He')])
+
+    assert family.check_coverage(group) == uncovered
+    assert family.check_coverage(group, batch_size=1) == uncovered
+
+
+def test_get_cutoffs_for_group(clear_db, create_sssp_family, create_sssp_parameters, create_structure):
+    """Test the `SsspFamily.get_cutoffs_for_group` method."""
+    import numpy
+
+    family = create_sssp_family()
+    group = orm.Group('structures').store()
+
+    with pytest.raises(exceptions.NotExistent):
+        family.get_cutoffs_for_group(group)
+
+    create_sssp_parameters(uuid=family.uuid).store()
+    family = orm.load_group(family.pk)
+
+    pks, cutoffs = family.get_cutoffs_for_group(group)
+    assert pks.shape == (0,)
+    assert cutoffs.shape == (0, 2)
+
+    structures = [
+        create_structure(site_kind_names=names).store() for names in (['Ar', 'He'], ['Ne'], ['Ar1', 'Ar2'], ['Br'])
+    ]
+    group.add_nodes(structures)
+
+    for batch_size in (1, 3, 1000):
+        pks, cutoffs = family.get_cutoffs_for_group(group, batch_size=batch_size)
+        results = dict(zip(pks.tolist(), cutoffs.tolist()))
+
+        assert sorted(results) == sorted(structure.pk for structure in structures)
+        assert results[structures[0].pk] == list(family.get_cutoffs(structure=structures[0]))
+        assert results[structures[1].pk] == list(family.get_cutoffs(structure=structures[1]))
+        assert results[structures[2].pk] == list(family.get_cutoffs(elements='Ar'))
+        assert numpy.isnan(results[structures[3].pk]).all()